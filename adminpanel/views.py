@@ -9,8 +9,9 @@ from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden
 from django.shortcuts import render
 
-from orders.models import Order, OrderStatus
-from orders.permissions import is_staff_role, has_perm
+from orders.models import OrderStatus
+from orders.permissions import is_staff_role, has_perm, permission_snapshot
+from orders.rollups import status_counts
 
 
 @login_required
@@ -19,19 +20,12 @@ def dashboard(request):
     if not is_staff_role(request.user):
         return HttpResponseForbidden("Forbidden")
 
-    stats = {
-        "new": Order.objects.filter(status=OrderStatus.NEW).count(),
-        "review": Order.objects.filter(status=OrderStatus.REVIEW).count(),
-        "quoted": Order.objects.filter(status=OrderStatus.QUOTED).count(),
-        "confirmed": Order.objects.filter(status=OrderStatus.CONFIRMED).count(),
-        "production": Order.objects.filter(status=OrderStatus.PRODUCTION).count(),
-        "ready": Order.objects.filter(status=OrderStatus.READY).count(),
-    }
+    counts = status_counts()
+    stats = [{"status": value, "label": label, "count": counts[value]} for value, label in OrderStatus.choices]
+    snapshot = permission_snapshot(request.user)
     perms = {
-        "view_all_orders": has_perm(request.user, "view_all_orders"),
-        "change_order_status": has_perm(request.user, "change_order_status"),
-        "set_pricing": has_perm(request.user, "set_pricing"),
-        "view_financial_reports": has_perm(request.user, "view_financial_reports"),
+        code: snapshot.has(code)
+        for code in ("view_all_orders", "change_order_status", "set_pricing", "view_financial_reports")
     }
     return render(request, "adminpanel/dashboard.html", {"stats": stats, "perms": perms})
 
@@ -0,0 +1,101 @@
+"""
+Cache backends that are safe to share between worker processes.
+
+Django's FileBasedCache and DatabaseCache implement incr() as get()+set(), so
+two gunicorn workers can read the same count and both write count+1. Rate
+limiting (django_ratelimit uses add()+incr()) then under-counts. These
+subclasses make add()/incr() atomic across processes without any external
+service, and keep the key's original expiry on incr() (the base
+implementation resets it to the default timeout).
+"""
+
+import os
+import pickle
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from hashlib import md5
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connections, models, router, transaction
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock; fall back to Django's behavior
+    fcntl = None
+
+LOCK_STRIPES = 64
+
+
+class LockingFileBasedCache(FileBasedCache):
+    """FileBasedCache with flock-guarded add()/incr() (atomic on one host)."""
+
+    @contextmanager
+    def _locked(self, key, version=None):
+        if fcntl is None:
+            yield
+            return
+        key = self.make_and_validate_key(key, version=version)
+        stripe = int(md5(key.encode(), usedforsecurity=False).hexdigest(), 16) % LOCK_STRIPES
+        lock_dir = os.path.join(self._dir, "locks")
+        os.makedirs(lock_dir, 0o700, exist_ok=True)
+        with open(os.path.join(lock_dir, f"{stripe}.lock"), "a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked(key, version):
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self._locked(key, version):
+            fname = self._key_to_file(key, version)
+            try:
+                with open(fname, "rb") as f:
+                    expiry = pickle.load(f)
+                    value = pickle.loads(zlib.decompress(f.read()))
+            except FileNotFoundError:
+                expiry, value = 0, None
+            if value is None or (expiry is not None and expiry < time.time()):
+                raise ValueError("Key '%s' not found" % key)
+            value += delta
+            timeout = None if expiry is None else max(1, int(expiry - time.time()))
+            self.set(key, value, timeout, version)
+            return value
+
+
+class AtomicDatabaseCache(DatabaseCache):
+    """DatabaseCache whose incr() locks the cache row before reading it."""
+
+    def incr(self, key, delta=1, version=None):
+        db = router.db_for_write(self.cache_model_class)
+        connection = connections[db]
+        table = connection.ops.quote_name(self._table)
+        cache_key = self.make_and_validate_key(key, version=version)
+
+        with transaction.atomic(using=db):
+            with connection.cursor() as cursor:
+                # A no-op UPDATE takes the row lock (MySQL/PostgreSQL) or the write
+                # lock (SQLite) on every backend, unlike SELECT ... FOR UPDATE.
+                cursor.execute(f"UPDATE {table} SET expires = expires WHERE cache_key = %s", [cache_key])
+                cursor.execute(f"SELECT expires FROM {table} WHERE cache_key = %s", [cache_key])
+                row = cursor.fetchone()
+            value = self.get(key, self._missing_key, version=version)
+            if row is None or value is self._missing_key:
+                raise ValueError("Key '%s' not found" % key)
+
+            expires = row[0]
+            expression = models.Expression(output_field=models.DateTimeField())
+            for converter in connection.ops.get_db_converters(expression) + expression.get_db_converters(connection):
+                expires = converter(expires, expression, connection)
+            # set() stores datetime.max for "never expires"
+            timeout = None if expires.year == datetime.max.year else max(1, int(expires.timestamp() - time.time()))
+            value += delta
+            self.set(key, value, timeout, version)
+            return value
@@ -3,16 +3,24 @@ SEO context processor:
 injects site defaults + current absolute URL for canonical tags.
 """
 
+from functools import lru_cache
+
 from django.conf import settings
+from django.utils.functional import lazy
 
 
-def seo_defaults(request):
-    """Return global SEO variables for templates."""
+@lru_cache(maxsize=1)
+def _site_defaults() -> dict:
+    """Settings-only part, built once per process."""
     return {
         "SITE_NAME": getattr(settings, "SITE_NAME", "Website"),
         "SITE_URL": getattr(settings, "SITE_URL", "").rstrip("/"),
         "SITE_DEFAULT_DESCRIPTION": getattr(settings, "SITE_DEFAULT_DESCRIPTION", ""),
         "SITE_DEFAULT_OG_IMAGE": getattr(settings, "SITE_DEFAULT_OG_IMAGE", ""),
         "BUSINESS": getattr(settings, "BUSINESS", {}),
-        "CURRENT_URL": request.build_absolute_uri(),
-    }
\ No newline at end of file
+    }
+
+
+def seo_defaults(request):
+    """Return global SEO variables for templates (CURRENT_URL is built only if a template prints it)."""
+    return {**_site_defaults(), "CURRENT_URL": lazy(request.build_absolute_uri, str)()}
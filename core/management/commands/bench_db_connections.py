@@ -0,0 +1,72 @@
+"""
+Benchmark per-request DB latency with and without persistent connections.
+
+Simulates the request cycle Django runs in production: request_started and
+request_finished fire close_old_connections(), which drops the connection when
+CONN_MAX_AGE is 0 and (with CONN_HEALTH_CHECKS) pings a reused one. Each
+simulated request then runs the given number of small queries.
+
+Usage:
+    python manage.py bench_db_connections
+    python manage.py bench_db_connections --requests 500 --max-age 300 --queries 3
+"""
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+
+def _simulate(requests: int, queries: int) -> list:
+    """Run the request cycle `requests` times; return per-request seconds."""
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        request_started.send(sender=None)
+        with connection.cursor() as cursor:
+            for _ in range(queries):
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        request_finished.send(sender=None)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+class Command(BaseCommand):
+    help = "Compare per-request latency with CONN_MAX_AGE=0 vs persistent connections"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Simulated requests per mode")
+        parser.add_argument("--queries", type=int, default=1, help="Queries per request")
+        parser.add_argument("--max-age", type=int, default=60, help="CONN_MAX_AGE for the persistent run")
+        parser.add_argument("--no-health-checks", action="store_true", help="Disable CONN_HEALTH_CHECKS")
+
+    def handle(self, *args, **opts):
+        settings_dict = connection.settings_dict
+        original = (settings_dict.get("CONN_MAX_AGE", 0), settings_dict.get("CONN_HEALTH_CHECKS", False))
+        self.stdout.write(f"database: {connection.vendor} {settings_dict.get('HOST') or settings_dict.get('NAME')}")
+
+        results = {}
+        try:
+            for label, max_age in (("no pooling", 0), (f"persistent ({opts['max_age']}s)", opts["max_age"])):
+                # close() so the next connect picks up the new settings
+                connection.close()
+                settings_dict["CONN_MAX_AGE"] = max_age
+                settings_dict["CONN_HEALTH_CHECKS"] = not opts["no_health_checks"]
+                _simulate(5, opts["queries"])  # warm-up (imports, first connect)
+                ms = sorted(t * 1000 for t in _simulate(opts["requests"], opts["queries"]))
+                results[label] = ms
+                p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+                self.stdout.write(
+                    f"{label:<22} mean={statistics.mean(ms):.3f}ms p50={statistics.median(ms):.3f}ms "
+                    f"p95={p95:.3f}ms"
+                )
+        finally:
+            connection.close()
+            settings_dict["CONN_MAX_AGE"], settings_dict["CONN_HEALTH_CHECKS"] = original
+
+        base, pooled = (statistics.mean(v) for v in results.values())
+        if pooled > 0:
+            self.stdout.write(self.style.SUCCESS(f"✅ Persistent connections: {base / pooled:.1f}x faster per request."))
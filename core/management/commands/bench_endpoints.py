@@ -0,0 +1,353 @@
+"""
+Benchmark every JSON API endpoint (orders/api_urls.py), staff panel page
+(adminpanel/urls.py) and public page (core/urls.py).
+
+Each endpoint is requested --iterations times (after --warmup requests) as an
+anonymous visitor, customer or staff user, and reports latency p50/p95/p99,
+sequential requests/second and the number of DB queries per request. Results
+can be saved as JSON and compared with an earlier run. Seed data first
+(seed_synthetic) for production-like numbers; by default the order with the
+longest thread is used.
+
+Modes:
+- in-process (default): Django test client; query counts included. Write
+  endpoints run inside a transaction that is rolled back after every request,
+  with rate limits off, so the data set does not drift between runs.
+- --url http://127.0.0.1:8000: real HTTP against a running server sharing
+  this database (session cookies are minted here). GET endpoints only; no
+  query counts. --concurrency N sends the requests from N parallel clients;
+  run it once against gunicorn (SERVER_MODE=wsgi) and once against uvicorn
+  (SERVER_MODE=asgi, async read views) to compare throughput under load.
+
+The command fails if a route in either urls module has no benchmark case, so
+new endpoints can't silently go unmeasured.
+
+Usage:
+    python manage.py bench_endpoints
+    python manage.py bench_endpoints --iterations 200 --output bench/before.json
+    python manage.py bench_endpoints --output bench/after.json --compare bench/before.json
+    python manage.py bench_endpoints --url http://127.0.0.1:8000 --only staff/
+    python manage.py bench_endpoints --url http://127.0.0.1:8000 --concurrency 32 --iterations 2000 \
+        --only GET --output bench/wsgi.json      # then against uvicorn: --compare bench/wsgi.json
+"""
+
+import json
+import platform
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+
+from orders.models import Order, OrderMessage, OrderUpload
+
+BENCHED_URLCONFS = ("orders.api_urls", "adminpanel.urls", "core.urls")
+BATCH_ORDERS = 50  # orders per batch-operation request
+STAFF_PERMS = ("view_all_orders", "change_order_status", "set_pricing", "view_financial_reports")
+
+# route (as written in its urls module) -> (user, method, query string or JSON body)
+CASES = {
+    "orders.api_urls": {
+        "mine/": ("customer", "GET", "?limit=50"),
+        "create/": ("customer", "POST", {"title": "سفارش آزمایشی", "items": [{"product_type": "پیراهن", "qty": 50}]}),
+        "<int:order_id>/detail/": ("customer", "GET", ""),
+        "<int:order_id>/messages/": ("customer", "GET", "?limit=50"),
+        "<int:order_id>/message/": ("customer", "POST", {"message": "زمان تحویل را اعلام کنید."}),
+        "<int:order_id>/events/": ("customer", "GET", ""),
+        "<int:order_id>/uploads/": ("customer", "POST", {"filename": "الگو.zip", "size": 1048576, "type": "pattern"}),
+        "uploads/<uuid:upload_id>/": ("customer", "GET", ""),
+        "<int:order_id>/files/archive/": ("customer", "GET", ""),
+        "staff/list/": ("staff", "GET", "?limit=50"),
+        "staff/search/": ("staff", "GET", "?q=پیراهن&limit=50"),
+        "staff/export/": ("staff", "GET", "?format=csv&kind=orders&status=new"),
+        "staff/reports/financial/": ("staff", "GET", "?period=month"),
+        "staff/reports/lead-time/": ("staff", "GET", "?period=month"),
+        "staff/batch/": ("staff", "POST", {"order_ids": "<batch_order_ids>", "status": "production"}),
+        "staff/<int:order_id>/detail/": ("staff", "GET", ""),
+        "staff/<int:order_id>/messages/": ("staff", "GET", "?limit=50"),
+        "staff/<int:order_id>/pricing/": ("staff", "POST", {"total_price": 120000000, "deposit_amount": 36000000}),
+        "staff/<int:order_id>/status/": ("staff", "POST", {"status": "production"}),
+        "staff/<int:order_id>/note/": ("staff", "POST", {"message": "یادداشت داخلی آزمایشی"}),
+        "staff/<int:order_id>/payment/": ("staff", "POST", {"amount": 1000000, "method": "card", "status": "paid"}),
+        "staff/<int:order_id>/events/": ("staff", "GET", ""),
+    },
+    "adminpanel.urls": {
+        "": ("staff", "GET", ""),
+        "orders/": ("staff", "GET", ""),
+        "orders/<int:order_id>/": ("staff", "GET", ""),
+    },
+    "core.urls": {
+        "": ("anonymous", "GET", ""),
+        "metrics": ("staff", "GET", ""),
+    },
+}
+
+
+def _percentile(sorted_values, q: float):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def _mounted_routes() -> list:
+    """(urlconf, mount prefix, route) for every route of the benchmarked urls modules."""
+    found = []
+    for entry in get_resolver().url_patterns:
+        if not isinstance(entry, URLResolver):
+            continue
+        conf = getattr(entry.urlconf_name, "__name__", entry.urlconf_name)  # include() imports the module
+        if conf in BENCHED_URLCONFS:
+            prefix = "/" + str(entry.pattern)
+            found += [(conf, prefix, str(p.pattern)) for p in entry.url_patterns]
+    return found
+
+
+class Command(BaseCommand):
+    help = "Measure latency percentiles and query counts of every API endpoint, panel page and public page"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--order", type=int, help="Order id to use (default: longest thread)")
+        parser.add_argument("--staff", help="Staff username (default: first user holding every staff permission)")
+        parser.add_argument("--only", default="", help="Only routes containing this text")
+        parser.add_argument("--url", default="", help="Base URL of a running server (GET endpoints only)")
+        parser.add_argument("--concurrency", type=int, default=1, help="Parallel clients (--url mode only)")
+        parser.add_argument("--output", help="Write results as JSON to this path")
+        parser.add_argument("--compare", help="Earlier JSON results to compare against")
+
+    def handle(self, *args, **opts):
+        routes = _mounted_routes()
+        missing = [f"{prefix}{route}" for conf, prefix, route in routes if route not in CASES[conf]]
+        if missing:
+            raise CommandError(f"No benchmark case for: {', '.join(missing)} (add them to CASES).")
+
+        order = self._order(opts["order"])
+        users = {"anonymous": None, "customer": order.customer, "staff": self._staff(opts["staff"])}
+        base_url = opts["url"].rstrip("/")
+        iterations = max(1, opts["iterations"])
+        if opts["concurrency"] > 1 and not base_url:
+            raise CommandError("--concurrency needs --url (the in-process client sends one request at a time).")
+
+        # an open upload for the resume-status endpoint; removed afterwards
+        upload = OrderUpload.objects.create(order=order, user=order.customer, filename="bench.pdf", size=1)
+        placeholders = {"<int:order_id>": str(order.id), "<uuid:upload_id>": str(upload.pk)}
+        # JSON body values that stand for fixture data (batch operations need real ids)
+        self.body_values = {"<batch_order_ids>": list(Order.objects.order_by("-id").values_list("id", flat=True)[:BATCH_ORDERS])}
+        try:
+            with override_settings(RATELIMIT_ENABLE=False):
+                results = self._run(routes, users, placeholders, base_url, iterations, opts)
+        finally:
+            upload.delete()
+
+        report = {"meta": self._meta(order, users, iterations, base_url, opts["concurrency"]), "endpoints": results}
+        if opts["output"]:
+            path = Path(opts["output"])
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+            self.stdout.write(f"results: {path}")
+        if opts["compare"]:
+            self._compare(results, opts["compare"])
+        self.stdout.write(self.style.SUCCESS("✅ Benchmark finished."))
+
+    def _run(self, routes, users, placeholders, base_url: str, iterations: int, opts) -> dict:
+        results = {}
+        clients = {name: self._client(user) for name, user in users.items()}
+        for conf, prefix, route in routes:
+            who, method, params = CASES[conf][route]
+            name = f"{method} {prefix}{route}"
+            if opts["only"] not in name:
+                continue
+            skip = self._skip_reason(route, method, base_url)
+            if skip:
+                self.stdout.write(f"{name:<48} skipped ({skip})")
+                continue
+
+            url = prefix + route
+            for placeholder, value in placeholders.items():
+                url = url.replace(placeholder, value)
+            if method == "GET":
+                url += params
+            body = None
+            if method == "POST":
+                body = {k: self.body_values.get(v, v) if isinstance(v, str) else v for k, v in params.items()}
+            call = (
+                self._http_call(base_url + url, clients[who]) if base_url
+                else self._client_call(clients[who], method, url, body)
+            )
+            for _ in range(max(0, opts["warmup"])):
+                call()
+            start = time.perf_counter()
+            if opts["concurrency"] > 1:
+                with ThreadPoolExecutor(opts["concurrency"]) as pool:
+                    samples = list(pool.map(lambda _: call(), range(iterations)))
+            else:
+                samples = [call() for _ in range(iterations)]
+            results[name] = self._summary(url, samples, time.perf_counter() - start)
+            self.stdout.write(self._line(name, results[name]))
+        return results
+
+    # -----------------------
+    # Fixtures
+    # -----------------------
+
+    def _order(self, order_id):
+        qs = Order.objects.select_related("customer")
+        order = qs.filter(id=order_id).first() if order_id else qs.order_by("-message_count", "-id").first()
+        if order is None:
+            raise CommandError("No order to benchmark; run seed_synthetic or pass --order.")
+        return order
+
+    def _staff(self, username):
+        User = get_user_model()
+        if username:
+            user = User.objects.filter(username=username, is_active=True).first()
+            if user is None:
+                raise CommandError(f"Unknown or inactive user: {username}")
+            return user
+        qs = User.objects.filter(is_active=True)
+        for code in STAFF_PERMS:
+            qs = qs.filter(groups__permissions__codename=code)
+        user = qs.order_by("id").first() or User.objects.filter(is_active=True, is_superuser=True).first()
+        if user is None:
+            raise CommandError("No staff user with every staff permission; run seed_roles + seed_synthetic or pass --staff.")
+        return user
+
+    def _client(self, user) -> Client:
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+        client = Client(HTTP_HOST=host)
+        if user is not None:
+            client.force_login(user)
+        return client
+
+    def _skip_reason(self, route: str, method: str, base_url: str) -> str:
+        if base_url and method != "GET":
+            return "writes are not sent to a live server"
+        if route.endswith("events/") and getattr(settings, "SERVER_MODE", "wsgi") == "asgi":
+            return "long-lived stream under SERVER_MODE=asgi"
+        return ""
+
+    # -----------------------
+    # Requests
+    # -----------------------
+
+    def _client_call(self, client, method: str, url: str, body):
+        secure = settings.SECURE_SSL_REDIRECT
+
+        def call():
+            # writes are rolled back so every iteration sees the same data
+            with transaction.atomic() if method != "GET" else nullcontext():
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    if method == "GET":
+                        resp = client.get(url, secure=secure)
+                    else:
+                        resp = client.post(url, body, content_type="application/json", secure=secure)
+                    if resp.streaming:
+                        for _ in resp.streaming_content:
+                            pass
+                    elapsed = time.perf_counter() - start
+                if method != "GET":
+                    transaction.set_rollback(True)
+            return elapsed, len(ctx.captured_queries), resp.status_code
+
+        return call
+
+    def _http_call(self, url: str, client):
+        session = client.cookies.get(settings.SESSION_COOKIE_NAME)
+        headers = {"Cookie": f"{settings.SESSION_COOKIE_NAME}={session.value}"} if session else {}
+
+        def call():
+            request = urllib.request.Request(url, headers=headers)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as resp:
+                    resp.read()
+                    status = resp.status
+            except urllib.error.HTTPError as e:
+                status = e.code
+            return time.perf_counter() - start, None, status
+
+        return call
+
+    # -----------------------
+    # Reporting
+    # -----------------------
+
+    def _summary(self, url: str, samples, wall: float) -> dict:
+        ms = sorted(s[0] * 1000 for s in samples)
+        queries = [s[1] for s in samples if s[1] is not None]
+        statuses = sorted({s[2] for s in samples})
+        return {
+            "url": url,
+            "status": statuses,
+            "n": len(ms),
+            "mean_ms": round(statistics.mean(ms), 3),
+            "p50_ms": round(_percentile(ms, 0.50), 3),
+            "p95_ms": round(_percentile(ms, 0.95), 3),
+            "p99_ms": round(_percentile(ms, 0.99), 3),
+            "max_ms": round(ms[-1], 3),
+            "rps": round(len(ms) / wall, 1) if wall else None,  # completed requests per wall-clock second
+            "queries": max(queries) if queries else None,
+        }
+
+    def _line(self, name: str, r: dict) -> str:
+        queries = "-" if r["queries"] is None else r["queries"]
+        line = (
+            f"{name:<48} p50={r['p50_ms']:>8.2f}ms p95={r['p95_ms']:>8.2f}ms "
+            f"p99={r['p99_ms']:>8.2f}ms rps={r['rps'] or 0:>8.1f} queries={queries}"
+        )
+        if any(s >= 400 for s in r["status"]):
+            return self.style.WARNING(f"{line} status={r['status']}")
+        return line
+
+    def _meta(self, order, users, iterations: int, base_url: str, concurrency: int) -> dict:
+        return {
+            "finished_at": timezone.now().isoformat(),
+            "mode": "http" if base_url else "client",
+            "base_url": base_url or None,
+            "iterations": iterations,
+            "concurrency": concurrency,
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "db_vendor": connection.vendor,
+            "server_mode": getattr(settings, "SERVER_MODE", "wsgi"),
+            "orders": Order.objects.count(),
+            "messages": OrderMessage.objects.count(),
+            "order_id": order.id,
+            "order_messages": order.message_count,
+            "staff": users["staff"].username,
+        }
+
+    def _compare(self, results: dict, path: str) -> None:
+        try:
+            before = json.loads(Path(path).read_text(encoding="utf-8"))["endpoints"]
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+        self.stdout.write(f"\ncompared with {path} (p95, requests/s, queries):")
+        for name, r in results.items():
+            old = before.get(name)
+            if old is None:
+                self.stdout.write(f"{name:<48} new")
+                continue
+            change = (r["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+            line = f"{name:<48} p95 {old['p95_ms']:.2f} -> {r['p95_ms']:.2f}ms ({change:+.0f}%)"
+            if r.get("rps") and old.get("rps"):
+                line += f"  rps {old['rps']:.0f} -> {r['rps']:.0f}"
+            if r["queries"] is not None and old.get("queries") is not None and r["queries"] != old["queries"]:
+                line += f"  queries {old['queries']} -> {r['queries']}"
+                self.stdout.write(self.style.WARNING(line))
+            else:
+                self.stdout.write(line)
@@ -0,0 +1,93 @@
+"""
+Benchmark django_ratelimit checks against the configured cache.
+
+Reports per-check latency (mean/p50/p99) and, with --workers, verifies that
+counters are shared and atomic across processes: N workers x M hits on one key
+must end at exactly N*M. --fill first writes that many filler keys (expiring
+after the run), so latency is measured against a full cache.
+
+Usage:
+    python manage.py bench_ratelimit
+    python manage.py bench_ratelimit --checks 5000 --workers 4
+    python manage.py bench_ratelimit --fill 10000
+"""
+
+import multiprocessing
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import RequestFactory
+from django_ratelimit.core import get_usage
+
+
+def _hit(group: str, ip: str, n: int) -> list:
+    """Run n rate-limit checks for one client; return per-check seconds."""
+    rf = RequestFactory()
+    timings = []
+    for _ in range(n):
+        request = rf.post("/api/orders/create/", REMOTE_ADDR=ip)
+        start = time.perf_counter()
+        get_usage(request, group=group, key="ip", rate="1000000/h", method="POST", increment=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _worker(args):
+    group, ip, n = args
+    connections.close_all()
+    _hit(group, ip, n)
+
+
+class Command(BaseCommand):
+    help = "Measure rate-limit check latency and cross-process counter correctness"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--checks", type=int, default=2000, help="Checks in the latency run")
+        parser.add_argument("--workers", type=int, default=0, help="Processes for the shared-counter run")
+        parser.add_argument("--per-worker", type=int, default=200, help="Checks per worker process")
+        parser.add_argument("--fill", type=int, default=0, help="Filler keys to write before measuring")
+
+    def handle(self, *args, **opts):
+        backend = settings.CACHES[settings.RATELIMIT_USE_CACHE]["BACKEND"]
+        self.stdout.write(f"cache: {backend}")
+
+        if opts["fill"]:
+            cache = caches[settings.RATELIMIT_USE_CACHE]
+            prefix = f"bench-fill-{uuid.uuid4().hex[:8]}"
+            for start in range(0, opts["fill"], 500):
+                keys = range(start, min(start + 500, opts["fill"]))
+                cache.set_many({f"{prefix}:{i}": i for i in keys}, timeout=600)
+            self.stdout.write(f"filled: {opts['fill']} keys")
+
+        group = f"bench-{uuid.uuid4().hex[:8]}"
+        timings = sorted(_hit(group, "10.0.0.1", opts["checks"]))
+        ms = [t * 1000 for t in timings]
+        p99 = ms[min(len(ms) - 1, int(len(ms) * 0.99))]
+        self.stdout.write(
+            f"checks={len(ms)} mean={statistics.mean(ms):.3f}ms "
+            f"p50={statistics.median(ms):.3f}ms p99={p99:.3f}ms max={ms[-1]:.3f}ms"
+        )
+
+        workers = opts["workers"]
+        if workers:
+            per = opts["per_worker"]
+            group = f"bench-{uuid.uuid4().hex[:8]}"
+            connections.close_all()
+            ctx = multiprocessing.get_context("fork")
+            with ctx.Pool(workers) as pool:
+                pool.map(_worker, [(group, "10.0.0.2", per)] * workers)
+
+            request = RequestFactory().post("/api/orders/create/", REMOTE_ADDR="10.0.0.2")
+            usage = get_usage(request, group=group, key="ip", rate="1000000/h", method="POST", increment=False)
+            expected = workers * per
+            self.stdout.write(f"shared counter: {usage['count']} / expected {expected}")
+            if usage["count"] != expected:
+                raise CommandError("Rate-limit counter is not shared/atomic across processes for this cache.")
+
+        caches[settings.RATELIMIT_USE_CACHE].close()
+        self.stdout.write(self.style.SUCCESS("✅ Benchmark finished."))
@@ -0,0 +1,112 @@
+"""
+In-process request metrics in Prometheus text format.
+
+Per resolved view (+ HTTP method):
+- http_request_duration_seconds   histogram, wall time through the middleware
+- http_request_db_queries         histogram, queries executed by the request
+- http_request_db_duration_seconds histogram, time spent in those queries
+- http_response_size_bytes        histogram (non-streaming responses)
+- http_requests_total             counter by status code
+
+Each worker process keeps its own numbers (no shared store); a scrape reports
+the worker that served it, like prometheus_client without multiprocess mode.
+"""
+
+import threading
+from bisect import bisect_left
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Cumulative-bucket histogram for one label set (caller holds _lock)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+_FAMILIES = {
+    "http_request_duration_seconds": ("Request wall time through the middleware stack.", DURATION_BUCKETS),
+    "http_request_db_queries": ("Database queries executed per request.", QUERY_BUCKETS),
+    "http_request_db_duration_seconds": ("Time spent in database queries per request.", DURATION_BUCKETS),
+    "http_response_size_bytes": ("Response body size (non-streaming responses).", SIZE_BUCKETS),
+}
+_histograms = {name: {} for name in _FAMILIES}  # name -> {(view, method): Histogram}
+_requests = {}  # (view, method, status) -> count
+
+
+def observe_request(view: str, method: str, status: int, duration: float,
+                    queries=None, db_time=None, size=None) -> None:
+    """Record one finished request (None = not measured for this request)."""
+    labels = (view, method)
+    values = {
+        "http_request_duration_seconds": duration,
+        "http_request_db_queries": queries,
+        "http_request_db_duration_seconds": db_time,
+        "http_response_size_bytes": size,
+    }
+    with _lock:
+        for name, value in values.items():
+            if value is None:
+                continue
+            family = _histograms[name]
+            if labels not in family:
+                family[labels] = Histogram(_FAMILIES[name][1])
+            family[labels].observe(value)
+        key = (view, method, status)
+        _requests[key] = _requests.get(key, 0) + 1
+
+
+def reset() -> None:
+    """Drop all recorded data."""
+    with _lock:
+        for family in _histograms.values():
+            family.clear()
+        _requests.clear()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+
+
+def _number(value) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render() -> str:
+    """Current metrics in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    with _lock:
+        for name, (help_text, buckets) in _FAMILIES.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (view, method), h in sorted(_histograms[name].items()):
+                base = _labels(view=view, method=method)
+                cumulative = 0
+                for bound, n in zip((*buckets, "+Inf"), h.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{base},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{base}}} {_number(h.sum)}")
+                lines.append(f"{name}_count{{{base}}} {h.count}")
+
+        lines += ["# HELP http_requests_total Finished requests by status code.", "# TYPE http_requests_total counter"]
+        for (view, method, status), n in sorted(_requests.items()):
+            lines.append(f"http_requests_total{{{_labels(view=view, method=method, status=status)}}} {n}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,116 @@
+"""
+Request metrics + slow-request logging.
+
+RequestMetricsMiddleware records, per resolved view name (URL name, or the
+view's dotted path for unnamed routes) and method:
+- wall time from this middleware down to the view and back
+- number of DB queries and time spent in them (all database aliases)
+- response size for non-streaming responses
+into core.metrics (exposed at /metrics).
+
+Requests slower than settings.SLOW_REQUEST_MS are logged as one JSON line on
+the "core.metrics" logger (see LOGGING).
+
+Under ASGI, ORM calls run in sync_to_async worker threads whose connections
+this middleware cannot wrap, so async requests only record time and size.
+"""
+
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+from . import metrics
+
+logger = logging.getLogger("core.metrics")
+
+UNRESOLVED = "<unresolved>"
+
+
+class _QueryTimer:
+    """connection.execute_wrapper hook that counts queries and their duration."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.queries += 1
+
+
+def _view_name(request) -> str:
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match is not None else UNRESOLVED
+
+
+def _response_size(response):
+    if response.streaming:
+        return None
+    return len(response.content)
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "SLOW_REQUEST_MS", 1000)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timer = _QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(timer))
+            response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - start, timer)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - start, None)
+        return response
+
+    def _record(self, request, response, elapsed, timer) -> None:
+        view = _view_name(request)
+        size = _response_size(response)
+        metrics.observe_request(
+            view,
+            request.method,
+            response.status_code,
+            elapsed,
+            queries=timer.queries if timer else None,
+            db_time=timer.seconds if timer else None,
+            size=size,
+        )
+
+        elapsed_ms = elapsed * 1000
+        if self.slow_ms and elapsed_ms >= self.slow_ms:
+            logger.warning(json.dumps({
+                "event": "slow_request",
+                "view": view,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round(elapsed_ms, 1),
+                "db_queries": timer.queries if timer else None,
+                "db_ms": round(timer.seconds * 1000, 1) if timer else None,
+                "response_bytes": size,
+                "user_id": getattr(getattr(request, "user", None), "pk", None),
+            }, ensure_ascii=False))
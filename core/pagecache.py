@@ -0,0 +1,130 @@
+"""
+Full-page cache for anonymous GETs of public pages (/, robots.txt, sitemap.xml).
+
+AnonymousPageCacheMiddleware sits in front of sessions/auth, so a hit costs
+one cache read: no session load, no view, no template rendering.
+- only paths listed in settings.PAGE_CACHE_SECONDS (path -> TTL), GET/HEAD,
+  no query string
+- hits are served only to requests without a session cookie (we can't know a
+  session is anonymous without loading it); responses are stored when the
+  view ran for an anonymous user, returned 200 and set no cookies
+- the key varies by scheme, host and language (Accept-Language resolved
+  against settings.LANGUAGES), like the pages' canonical URLs and text
+- Cache-Control for the Nginx front: `public, max-age=<TTL>` for anonymous
+  responses, `private, no-cache` when the page was rendered for a logged-in
+  user; `Vary: Cookie, Accept-Language` keeps shared caches from mixing them
+
+Pages are not invalidated on writes; keep the home page TTL short (the
+marquee inside it is invalidated separately, see orders/marquee.py).
+"""
+
+from hashlib import md5
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.urls import resolve
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.translation import get_language_from_request
+
+HEADER = "X-Page-Cache"
+
+
+def _cache():
+    return caches[getattr(settings, "CACHE_MIDDLEWARE_ALIAS", "default")]
+
+
+def cache_seconds(request) -> int:
+    """TTL for this request's page, or 0 when it is not a cacheable public page."""
+    if request.method not in ("GET", "HEAD") or request.META.get("QUERY_STRING"):
+        return 0
+    return getattr(settings, "PAGE_CACHE_SECONDS", {}).get(request.path_info, 0)
+
+
+def page_key(request) -> str:
+    prefix = getattr(settings, "CACHE_MIDDLEWARE_KEY_PREFIX", "page")
+    raw = f"{request.scheme}://{request.get_host()}{request.path_info}|{get_language_from_request(request)}"
+    return f"{prefix}:anon:{md5(raw.encode(), usedforsecurity=False).hexdigest()}"
+
+
+def _restore(request, entry) -> HttpResponse:
+    # the view is skipped; still label the request for RequestMetricsMiddleware
+    request.resolver_match = resolve(request.path_info)
+    status, headers, content = entry
+    response = HttpResponse(content, status=status)
+    for name, value in headers:
+        response[name] = value
+    response[HEADER] = "HIT"
+    return response
+
+
+def _storable(request, response, user) -> bool:
+    return (
+        request.method == "GET"
+        and response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and user is not None
+        and not user.is_authenticated
+    )
+
+
+class AnonymousPageCacheMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _lookup(self, request):
+        """(ttl, key, may_serve_hit) for a cacheable page, else (0, None, False)."""
+        ttl = cache_seconds(request)
+        if not ttl:
+            return 0, None, False
+        return ttl, page_key(request), settings.SESSION_COOKIE_NAME not in request.COOKIES
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        ttl, key, may_hit = self._lookup(request)
+        if may_hit:
+            entry = _cache().get(key)
+            if entry is not None:
+                return _restore(request, entry)
+        response = self.get_response(request)
+        if ttl:
+            entry = self._finish(request, response, ttl, getattr(request, "user", None))
+            if entry is not None:
+                _cache().set(key, entry, ttl)
+        return response
+
+    async def __acall__(self, request):
+        ttl, key, may_hit = self._lookup(request)
+        if may_hit:
+            entry = await _cache().aget(key)
+            if entry is not None:
+                return _restore(request, entry)
+        response = await self.get_response(request)
+        if ttl:
+            # auser(): a lazy request.user would load the session synchronously here
+            user = await request.auser() if hasattr(request, "auser") else None
+            entry = self._finish(request, response, ttl, user)
+            if entry is not None:
+                await _cache().aset(key, entry, ttl)
+        return response
+
+    def _finish(self, request, response, ttl: int, user):
+        """Set Cache-Control/Vary; returns the entry to store, or None."""
+        patch_vary_headers(response, ("Cookie", "Accept-Language"))
+        if not _storable(request, response, user):
+            if user is not None and user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            return None
+        patch_cache_control(response, public=True, max_age=ttl)
+        response[HEADER] = "MISS"
+        headers = [(name, value) for name, value in response.items() if name != HEADER]
+        return response.status_code, headers, response.content
@@ -1,53 +1,37 @@
 """
-Public views + robots.txt content.
+Public views + robots.txt content + sitemap.xml + /metrics.
 """
 
+import hmac
+from functools import lru_cache, partial
+
 from django.conf import settings
-from django.http import HttpResponse
+from django.contrib.sitemaps.views import sitemap
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render
-from django.db.models import Sum
-from django.db.utils import ProgrammingError, OperationalError
+
+from . import metrics
+from .sitemaps import StaticViewSitemap
 
 def home(request):
-    slides = []
-    try:
-        from orders.models import Order
-        latest = list(
-            Order.objects
-            .prefetch_related("items")
-            .annotate(total_qty=Sum("items__qty"))
-            .order_by("-created_at")[:10]
-        )
-
-        # اسلایدهای واقعی
-        slides = [{"kind": "order", "obj": o} for o in latest]
-
-        # اگر کمتر از 10 تا بود، با نمونه پر کن
-        missing = 10 - len(slides)
-        for i in range(missing):
-            slides.append({
-                "kind": "sample",
-                "id": f"نمونه {i+1}",
-                "title": "نمونه سفارش سری‌دوزی",
-                "status": "نمونه",
-                "qty": 120,
-            })
-
-    except (ProgrammingError, OperationalError):
-        # DB آماده نیست: کل 10 تا رو نمونه پر کن
-        slides = [{
-            "kind": "sample",
-            "id": f"نمونه {i+1}",
-            "title": "نمونه سفارش سری‌دوزی",
-            "status": "نمونه",
-            "qty": 120,
-        } for i in range(10)]
-
-    return render(request, "home.html", {"slides": slides})
+    """
+    Landing page. The latest-orders marquee comes from a versioned snapshot and
+    its markup from the fragment cache (orders/marquee.py): no DB queries on a warm hit.
+    """
+    from orders import marquee
 
-def robots_txt(request):
+    current = marquee.version()
+    return render(request, "home.html", {
+        "marquee_version": current,
+        "marquee_seconds": marquee.SNAPSHOT_SECONDS,
+        # callable: the template only loads the snapshot when the fragment is not cached
+        "slides": partial(marquee.snapshot, current),
+    })
+
+@lru_cache(maxsize=1)
+def _robots_body() -> str:
     """
-    Robots policy:
+    Robots policy (depends on settings only, so built once per process):
     - Allow public crawling
     - Disallow private/auth/panel/api routes
     - Provide sitemap location
@@ -62,8 +46,56 @@ def robots_txt(request):
         "Disallow: /accounts/",
         "Disallow: /orders/",
         "Disallow: /api/",
+        "Disallow: /metrics",
         "",
         f"Sitemap: {sitemap_url}",
         "",
     ]
-    return HttpResponse("\n".join(lines), content_type="text/plain")
\ No newline at end of file
+    return "\n".join(lines)
+
+
+def robots_txt(request):
+    return HttpResponse(_robots_body(), content_type="text/plain")
+
+
+SITEMAPS = {"static": StaticViewSitemap}
+_sitemap_bodies = {}  # (scheme, host) -> rendered XML
+
+
+def sitemap_xml(request):
+    """
+    sitemap.xml, rendered once per scheme+host and process: it lists static
+    pages only, so it changes with deploys, not with data.
+    """
+    key = (request.scheme, request.get_host())
+    body = _sitemap_bodies.get(key)
+    if body is None:
+        response = sitemap(request, sitemaps=SITEMAPS)
+        response.render()
+        body = response.content
+        if len(_sitemap_bodies) >= 16:  # hosts come from ALLOWED_HOSTS; stay bounded anyway
+            _sitemap_bodies.clear()
+        _sitemap_bodies[key] = body
+    response = HttpResponse(body, content_type="application/xml")
+    response["X-Robots-Tag"] = "noindex, noodp, noarchive"
+    return response
+
+
+def metrics_view(request):
+    """
+    Prometheus text metrics of this worker process (see core.metrics).
+    Staff sessions, or `Authorization: Bearer <METRICS_TOKEN>` when configured.
+    """
+    from orders.permissions import is_staff_role
+
+    token = getattr(settings, "METRICS_TOKEN", "")
+    auth = request.headers.get("Authorization", "")
+    if not (
+        (token and hmac.compare_digest(auth.encode(), f"Bearer {token}".encode()))
+        or is_staff_role(request.user)
+    ):
+        return HttpResponseForbidden("Forbidden")
+
+    response = HttpResponse(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+    response["Cache-Control"] = "no-store"
+    return response
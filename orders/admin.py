@@ -1,5 +1,14 @@
+from collections import Counter
+
 from django.contrib import admin
-from .models import Order, OrderItem, OrderFile, OrderMessage, Payment
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import marquee, reports, search, status_events, uploads
+from .aggregates import recompute_orders
+from .models import Order, OrderItem, OrderFile, OrderMessage, OrderStatusEvent, Payment
+from .rollups import bump_status_count, bump_status_counts, move_status_count
 
 
 class OrderItemInline(admin.TabularInline):
@@ -10,6 +19,8 @@ class OrderItemInline(admin.TabularInline):
 class OrderFileInline(admin.TabularInline):
     model = OrderFile
     extra = 0
+    fields = ("file", "type", "original_name", "size", "sha256", "created_at")
+    readonly_fields = ("original_name", "size", "sha256", "created_at")
 
 
 class OrderMessageInline(admin.TabularInline):
@@ -17,13 +28,121 @@ class OrderMessageInline(admin.TabularInline):
     extra = 0
 
 
+class OrderStatusEventInline(admin.TabularInline):
+    """Status history is append-only: shown, never edited here."""
+    model = OrderStatusEvent
+    extra = 0
+    fields = ("created_at", "from_status", "to_status", "actor")
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     """Admin list for quick triage."""
-    list_display = ("id", "title", "customer", "status", "total_price", "created_at")
+    list_display = ("id", "title", "customer", "status", "total_price", "paid_total", "message_count", "created_at")
     list_filter = ("status", "created_at")
     search_fields = ("title", "customer__username", "customer__email")
-    inlines = [OrderItemInline, OrderFileInline, OrderMessageInline]
+    readonly_fields = ("total_qty", "item_count", "paid_total", "message_count", "last_message_at")
+    inlines = [OrderItemInline, OrderFileInline, OrderMessageInline, OrderStatusEventInline]
+
+    # Keep dashboard status counters in step with admin edits.
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            old_status = Order.objects.filter(pk=obj.pk).values_list("status", flat=True).first() if change else None
+            super().save_model(request, obj, form, change)
+            if old_status is None:
+                bump_status_count(obj.status)
+            else:
+                move_status_count(old_status, obj.status)
+            status_events.record(obj.pk, old_status or "", obj.status, request.user)
+            marquee.invalidate()  # title/qty/status shown on the home page
+
+    # Inline items/messages may have changed: rebuild this order's aggregates
+    # and its financial rollup day.
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        for formset in formsets:
+            if formset.model is OrderFile:
+                # files added here skip the upload API; record their hash/size for dedupe and ZIPs
+                for f in formset.forms:
+                    if "file" in f.changed_data and f.instance.pk and not f.cleaned_data.get("DELETE"):
+                        uploads.describe_stored(f.instance)
+        recompute_orders([form.instance.pk])
+        reports.refresh_days([timezone.localdate(form.instance.created_at)])
+        search.reindex_orders([form.instance.pk])
+
+    # Search box uses the inverted index instead of LIKE '%x%' across joins.
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        matches = search.matching_orders(search_term)
+        q = Q(id__in=matches.values("order_id")) if matches is not None else Q(pk__in=[])
+        if search_term.isdigit():
+            q |= Q(id=int(search_term))
+        return queryset.filter(q), False
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            payment_days = _local_days(Payment.objects.filter(order=obj))
+            super().delete_model(request, obj)
+            bump_status_count(obj.status, -1)
+            marquee.invalidate()
+            reports.refresh_days(payment_days | {timezone.localdate(obj.created_at)})
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            rows = list(queryset.values_list("status", "created_at"))
+            payment_days = _local_days(Payment.objects.filter(order__in=queryset))
+            super().delete_queryset(request, queryset)
+            bump_status_counts({status: -n for status, n in Counter(status for status, _ in rows).items()})
+            marquee.invalidate()
+            reports.refresh_days(payment_days | {timezone.localdate(created) for _, created in rows})
+
+
+def _local_days(qs) -> set:
+    """Local created dates of the given rows (the financial rollup days they touch)."""
+    return {timezone.localdate(created) for created in qs.values_list("created_at", flat=True)}
+
+
+@admin.register(Payment)
+class PaymentAdmin(admin.ModelAdmin):
+    """Payments; edits keep Order.paid_total (and the detail ETag) in sync."""
+    list_display = ("id", "order", "amount", "method", "status", "created_at")
+    list_filter = ("status", "method")
+
+    # Payment row, order aggregates and rollups commit together (as in staff_add_payment).
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            old_order_id = (
+                Payment.objects.filter(pk=obj.pk).values_list("order_id", flat=True).first() if change else None
+            )
+            super().save_model(request, obj, form, change)
+            order_ids = {obj.order_id, old_order_id} - {None}
+            recompute_orders(order_ids)
+            # A status-only edit changes neither row count nor created_at: bump the order version
+            Order.objects.filter(id__in=order_ids).update(updated_at=timezone.now())
+            self._refresh_reports(order_ids, {timezone.localdate(obj.created_at)})
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            recompute_orders([obj.order_id])
+            self._refresh_reports({obj.order_id}, {timezone.localdate(obj.created_at)})
 
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            order_ids = set(queryset.values_list("order_id", flat=True))
+            payment_days = _local_days(queryset)
+            super().delete_queryset(request, queryset)
+            recompute_orders(order_ids)
+            self._refresh_reports(order_ids, payment_days)
 
-admin.site.register(Payment)
\ No newline at end of file
+    # Payment days hold the payment buckets; the orders' creation days hold paid/outstanding.
+    def _refresh_reports(self, order_ids, payment_days):
+        order_days = _local_days(Order.objects.filter(id__in=order_ids))
+        reports.refresh_days(payment_days | order_days)
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Denormalized per-order aggregates.
+
+Order.total_qty / item_count / paid_total / message_count / last_message_at
+let lists and the home page show totals without joining children.
+
+- Write paths apply O(1) F() deltas right after inserting the child row
+  (call them inside the same transaction as the insert)
+- recompute_orders() rebuilds from children with correlated subqueries
+  (admin edits, backfills, drift repair)
+"""
+
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Order, OrderItem, OrderMessage, Payment
+
+
+def items_added(order_id: int, items) -> None:
+    """Account for newly inserted line items."""
+    items = list(items)
+    if not items:
+        return
+    Order.objects.filter(id=order_id).update(
+        total_qty=F("total_qty") + sum(i.qty for i in items),
+        item_count=F("item_count") + len(items),
+    )
+
+
+def messages_added(order_id: int, count: int, created_at) -> None:
+    """Account for newly inserted thread messages (internal notes included)."""
+    Order.objects.filter(id=order_id).update(
+        message_count=F("message_count") + count,
+        last_message_at=Greatest(Coalesce(F("last_message_at"), Value(created_at)), Value(created_at)),
+    )
+
+
+def payment_added(order_id: int, amount: int, status: str) -> None:
+    """Account for a new payment row (only paid payments count toward paid_total)."""
+    if status == Payment.PaymentStatus.PAID:
+        Order.objects.filter(id=order_id).update(paid_total=F("paid_total") + amount)
+
+
+def _subquery(qs, expr):
+    """Scalar correlated subquery over one child table, grouped by order."""
+    return Subquery(qs.filter(order=OuterRef("pk")).order_by().values("order").annotate(v=expr).values("v")[:1])
+
+
+def recompute_orders(order_ids) -> int:
+    """Rebuild aggregates for the given orders from their child rows. Returns rows updated."""
+    return Order.objects.filter(id__in=list(order_ids)).update(
+        total_qty=Coalesce(_subquery(OrderItem.objects, Sum("qty")), 0),
+        item_count=Coalesce(_subquery(OrderItem.objects, Count("id")), 0),
+        paid_total=Coalesce(
+            _subquery(Payment.objects.filter(status=Payment.PaymentStatus.PAID), Sum("amount")), 0
+        ),
+        message_count=Coalesce(_subquery(OrderMessage.objects, Count("id")), 0),
+        last_message_at=_subquery(OrderMessage.objects, Max("created_at")),
+    )
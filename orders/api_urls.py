@@ -1,18 +1,36 @@
+from django.conf import settings
 from django.urls import path
-from . import api_views
+from . import api_views, async_views, streams
+
+# Under SERVER_MODE=asgi the read endpoints are served by their async variants
+reads = async_views if getattr(settings, "SERVER_MODE", "wsgi") == "asgi" else api_views
 
 urlpatterns = [
     # customer
-    path("mine/", api_views.my_orders),
+    path("mine/", reads.my_orders),
     path("create/", api_views.create_order),
-    path("<int:order_id>/detail/", api_views.my_order_detail),
+    path("<int:order_id>/detail/", reads.my_order_detail),
+    path("<int:order_id>/messages/", api_views.my_order_messages),
     path("<int:order_id>/message/", api_views.add_message_customer),
+    path("<int:order_id>/events/", streams.my_order_events),
+
+    # files (owner or staff)
+    path("<int:order_id>/uploads/", api_views.start_file_upload),
+    path("uploads/<uuid:upload_id>/", api_views.file_upload),
+    path("<int:order_id>/files/archive/", api_views.order_files_archive),
 
     # staff
-    path("staff/list/", api_views.staff_orders),
-    path("staff/<int:order_id>/detail/", api_views.staff_order_detail),
+    path("staff/list/", reads.staff_orders),
+    path("staff/search/", api_views.staff_search_orders),
+    path("staff/export/", api_views.staff_export_orders),
+    path("staff/reports/financial/", api_views.staff_financial_report),
+    path("staff/reports/lead-time/", api_views.staff_lead_time_report),
+    path("staff/batch/", api_views.staff_batch_update),
+    path("staff/<int:order_id>/detail/", reads.staff_order_detail),
+    path("staff/<int:order_id>/messages/", api_views.staff_order_messages),
     path("staff/<int:order_id>/pricing/", api_views.staff_set_pricing),
     path("staff/<int:order_id>/status/", api_views.staff_change_status),
     path("staff/<int:order_id>/note/", api_views.staff_add_internal_note),
     path("staff/<int:order_id>/payment/", api_views.staff_add_payment),
+    path("staff/<int:order_id>/events/", streams.staff_order_events),
 ]
\ No newline at end of file
@@ -8,20 +8,67 @@ Security:
 """
 
 import json
-from django.http import JsonResponse
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django_ratelimit.decorators import ratelimit
 
-from .models import Order, OrderItem, OrderMessage, Payment, OrderStatus
+from . import aggregates, archives, batch, marquee, reports, search, status_events, uploads
+from .events import notify_order_changed
+from .exports import export_lines
+from .http import bad, conditional_detail, require_staff_perm, with_validators
+from .models import Order, OrderItem, OrderMessage, OrderUpload, Payment, OrderStatus
+from .pagination import apply_order_filters, keyset_page, parse_limit
 from .permissions import is_staff_role, has_perm
+from .rollups import bump_status_count, move_status_count
+from .serializers import (
+    FILE_FIELDS,
+    ORDER_LIST_FIELDS,
+    STAFF_ORDER_FIELDS,
+    file_row,
+    messages_since,
+    order_files,
+    order_items,
+    order_messages,
+    order_payments,
+    order_row,
+    order_status_history,
+)
+
+
+def _thread_page(request, order_id: int, include_internal: bool) -> JsonResponse:
+    """
+    One page of an order thread. Query params (pick one mode):
+    - before=<cursor> / after=<cursor>: older / newer page (cursors from a previous response)
+    - since=<message id>: everything newer than that id (incremental refresh)
+    - neither: the latest page
+    limit= defaults to 50 (max 200).
+    """
+    try:
+        limit = parse_limit(request.GET.get("limit"))
+        since = (request.GET.get("since") or "").strip()
+        if since:
+            if not since.isdigit():
+                return bad("Invalid since.")
+            messages, has_more = messages_since(order_id, include_internal, int(since), limit)
+            last_id = messages[-1]["id"] if messages else int(since)
+            return JsonResponse({"ok": True, "messages": messages, "last_id": last_id, "has_more": has_more})
+
+        messages, older, newer = order_messages(
+            order_id,
+            include_internal,
+            before=(request.GET.get("before") or "").strip(),
+            after=(request.GET.get("after") or "").strip(),
+            limit=limit,
+        )
+    except ValueError as e:
+        return bad(str(e))
 
-
-def _bad(msg: str, code: int = 400) -> JsonResponse:
-    """Standard JSON error response."""
-    return JsonResponse({"ok": False, "error": msg}, status=code)
+    return JsonResponse({"ok": True, "messages": messages, "older_cursor": older, "newer_cursor": newer})
 
 
 # -----------------------
@@ -31,24 +78,60 @@ def _bad(msg: str, code: int = 400) -> JsonResponse:
 @login_required
 @require_http_methods(["GET"])
 def my_orders(request):
-    """List current user's orders."""
-    qs = Order.objects.filter(customer=request.user).order_by("-created_at")
-    return JsonResponse(
-        {
-            "ok": True,
-            "orders": [
-                {
-                    "id": o.id,
-                    "title": o.title,
-                    "status": o.status,
-                    "status_label": o.get_status_display(),
-                    "total_price": o.total_price,
-                    "deposit_amount": o.deposit_amount,
-                    "created_at": o.created_at.isoformat(),
-                }
-                for o in qs
-            ],
-        }
+    """List current user's orders (cursor paginated, filterable)."""
+    try:
+        limit = parse_limit(request.GET.get("limit"))
+        qs = apply_order_filters(Order.objects.filter(customer=request.user), request.GET)
+        rows, next_cursor = keyset_page(qs.values(*ORDER_LIST_FIELDS), request.GET.get("cursor", ""), limit)
+    except ValueError as e:
+        return bad(str(e))
+
+    return JsonResponse({"ok": True, "orders": [order_row(o) for o in rows], "next_cursor": next_cursor})
+
+
+MAX_ORDER_ITEMS = 1000
+MAX_ITEM_QTY = 100000
+
+
+def _parse_items(items) -> list:
+    """
+    Validate every line item before anything is written.
+    Returns unsaved OrderItem objects; raises ValueError with a client-safe message.
+    """
+    if not isinstance(items, list):
+        raise ValueError("items must be a list")
+    if len(items) > MAX_ORDER_ITEMS:
+        raise ValueError(f"Too many items (max {MAX_ORDER_ITEMS}).")
+
+    parsed = []
+    for idx, it in enumerate(items, start=1):
+        if not isinstance(it, dict):
+            raise ValueError(f"Invalid item #{idx}")
+        try:
+            qty = int(it.get("qty") or 1)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid qty (item #{idx})")
+        if qty <= 0 or qty > MAX_ITEM_QTY:
+            raise ValueError(f"Invalid qty (item #{idx})")
+
+        parsed.append(
+            OrderItem(
+                product_type=str(it.get("product_type") or "").strip()[:80],
+                qty=qty,
+                size_range=str(it.get("size_range") or "").strip()[:120],
+                fabric_type=str(it.get("fabric_type") or "").strip()[:120],
+                notes=str(it.get("notes") or "").strip(),
+            )
+        )
+    return parsed
+
+
+def _replayed_order(request, key: str):
+    """Order already created by this user with the same Idempotency-Key, if any."""
+    return (
+        Order.objects.filter(customer=request.user, idempotency_key=key)
+        .values_list("id", flat=True)
+        .first()
     )
 
 
@@ -56,35 +139,58 @@ def my_orders(request):
 @ratelimit(key="user_or_ip", rate="20/m", block=True)
 @require_http_methods(["POST"])
 def create_order(request):
-    """Create a new order and its items."""
+    """
+    Create a new order and its items.
+
+    - All items are validated first, then inserted with one bulk_create in a
+      transaction (no half-created orders).
+    - Optional Idempotency-Key header: a retry with the same key returns the
+      order created by the first request instead of a duplicate.
+    """
     try:
         payload = json.loads(request.body.decode("utf-8"))
     except Exception:
-        return _bad("Invalid JSON payload.")
-
-    title = (payload.get("title") or "").strip()
-    items = payload.get("items") or []
-
+        return bad("Invalid JSON payload.")
+    if not isinstance(payload, dict):
+        return bad("Invalid JSON payload.")
+
+    key = request.headers.get("Idempotency-Key", "").strip() or None
+    if key is not None and (len(key) > 64 or not key.isprintable()):
+        return bad("Invalid Idempotency-Key.")
+    if key is not None:
+        existing = _replayed_order(request, key)
+        if existing:
+            return JsonResponse({"ok": True, "order_id": existing, "replayed": True})
+
+    title = str(payload.get("title") or "").strip()
     if not title:
-        return _bad("title required")
+        return bad("title required")
     if len(title) > 150:
-        return _bad("title too long")
+        return bad("title too long")
 
-    order = Order.objects.create(customer=request.user, title=title)
-
-    for it in items:
-        qty = int(it.get("qty") or 1)
-        if qty <= 0 or qty > 100000:
-            return _bad("Invalid qty")
+    try:
+        items = _parse_items(payload.get("items") or [])
+    except ValueError as e:
+        return bad(str(e))
 
-        OrderItem.objects.create(
-            order=order,
-            product_type=(it.get("product_type") or "").strip()[:80],
-            qty=qty,
-            size_range=(it.get("size_range") or "").strip()[:120],
-            fabric_type=(it.get("fabric_type") or "").strip()[:120],
-            notes=(it.get("notes") or "").strip(),
-        )
+    try:
+        with transaction.atomic():
+            order = Order.objects.create(customer=request.user, title=title, idempotency_key=key)
+            for item in items:
+                item.order = order
+            OrderItem.objects.bulk_create(items, batch_size=500)
+            aggregates.items_added(order.id, items)
+            bump_status_count(order.status)
+            status_events.record(order.id, "", order.status, request.user)
+            reports.order_created(order.created_at)
+            search.reindex_orders([order.id])
+            marquee.invalidate()
+    except IntegrityError:
+        # Concurrent retry with the same key won the race; return its order.
+        existing = _replayed_order(request, key) if key is not None else None
+        if not existing:
+            raise
+        return JsonResponse({"ok": True, "order_id": existing, "replayed": True})
 
     return JsonResponse({"ok": True, "order_id": order.id})
 
@@ -92,54 +198,34 @@ def create_order(request):
 @login_required
 @require_http_methods(["GET"])
 def my_order_detail(request, order_id: int):
-    """Get order details for owner only; hide internal messages."""
-    order = get_object_or_404(Order, id=order_id, customer=request.user)
-
-    return JsonResponse(
+    """Get order details for owner only; hide internal messages. Supports conditional GET."""
+    qs = Order.objects.filter(id=order_id, customer=request.user)
+    order, etag, last_modified, not_modified = conditional_detail(request, qs, ORDER_LIST_FIELDS, "customer")
+    if not_modified is not None:
+        return with_validators(not_modified, etag, last_modified)
+
+    messages, messages_cursor, _ = order_messages(order_id, include_internal=False)
+    response = JsonResponse(
         {
             "ok": True,
-            "order": {
-                "id": order.id,
-                "title": order.title,
-                "status": order.status,
-                "status_label": order.get_status_display(),
-                "total_price": order.total_price,
-                "deposit_amount": order.deposit_amount,
-                "created_at": order.created_at.isoformat(),
-            },
-            "items": [
-                {
-                    "id": i.id,
-                    "product_type": i.product_type,
-                    "qty": i.qty,
-                    "size_range": i.size_range,
-                    "fabric_type": i.fabric_type,
-                    "notes": i.notes,
-                }
-                for i in order.items.all()
-            ],
-            "messages": [
-                {
-                    "id": m.id,
-                    "sender": getattr(m.sender, "username", "unknown"),
-                    "message": m.message,
-                    "created_at": m.created_at.isoformat(),
-                }
-                for m in order.messages.filter(is_internal=False).order_by("created_at")
-            ],
-            "payments": [
-                {
-                    "id": p.id,
-                    "amount": p.amount,
-                    "method": p.method,
-                    "status": p.status,
-                    "status_label": p.get_status_display(),
-                    "created_at": p.created_at.isoformat(),
-                }
-                for p in order.payments.order_by("-created_at")
-            ],
+            "order": order_row(order),
+            "items": order_items(order_id),
+            "messages": messages,
+            "messages_cursor": messages_cursor,
+            "payments": order_payments(order_id),
+            "files": order_files(order_id),
         }
     )
+    return with_validators(response, etag, last_modified)
+
+
+@login_required
+@require_http_methods(["GET"])
+def my_order_messages(request, order_id: int):
+    """Page through the owner's order thread (internal notes excluded)."""
+    if not Order.objects.filter(id=order_id, customer=request.user).exists():
+        raise Http404("No Order matches the given query.")
+    return _thread_page(request, order_id, include_internal=False)
 
 
 @login_required
@@ -152,15 +238,19 @@ def add_message_customer(request, order_id: int):
     try:
         payload = json.loads(request.body.decode("utf-8"))
     except Exception:
-        return _bad("Invalid JSON payload.")
+        return bad("Invalid JSON payload.")
 
     text = (payload.get("message") or "").strip()
     if not text:
-        return _bad("Message cannot be empty.")
+        return bad("Message cannot be empty.")
     if len(text) > 5000:
-        return _bad("Message too long.")
+        return bad("Message too long.")
 
-    OrderMessage.objects.create(order=order, sender=request.user, message=text, is_internal=False)
+    with transaction.atomic():
+        msg = OrderMessage.objects.create(order=order, sender=request.user, message=text, is_internal=False)
+        aggregates.messages_added(order.id, 1, msg.created_at)
+        search.index_text(order.id, text)
+        notify_order_changed(order.id)
     return JsonResponse({"ok": True})
 
 
@@ -168,104 +258,101 @@ def add_message_customer(request, order_id: int):
 # Staff APIs
 # -----------------------
 
-def _require_staff_perm(request, codename: str):
-    """Centralized staff role + permission check."""
-    if not is_staff_role(request.user):
-        return _bad("Forbidden", 403)
-    if not has_perm(request.user, codename):
-        return _bad("No permission", 403)
-    return None
+@login_required
+@require_http_methods(["GET"])
+def staff_orders(request):
+    """List all orders (requires view_all_orders); cursor paginated, filterable."""
+    err = require_staff_perm(request, "view_all_orders")
+    if err:
+        return err
+
+    try:
+        limit = parse_limit(request.GET.get("limit"))
+        qs = apply_order_filters(Order.objects.all(), request.GET, allow_customer=True)
+        qs = qs.values(*STAFF_ORDER_FIELDS)
+        rows, next_cursor = keyset_page(qs, request.GET.get("cursor", ""), limit)
+    except ValueError as e:
+        return bad(str(e))
+
+    return JsonResponse({"ok": True, "orders": [order_row(o) for o in rows], "next_cursor": next_cursor})
 
 
 @login_required
 @require_http_methods(["GET"])
-def staff_orders(request):
-    """List all orders (requires view_all_orders)."""
-    err = _require_staff_perm(request, "view_all_orders")
+def staff_search_orders(request):
+    """
+    Ranked search over titles, items, messages and customer username/phone
+    (requires view_all_orders). ?q=...&cursor=...&limit=... plus the same
+    filters as the staff list.
+    """
+    err = require_staff_perm(request, "view_all_orders")
     if err:
         return err
 
-    qs = Order.objects.all().order_by("-created_at")
-    return JsonResponse(
-        {
-            "ok": True,
-            "orders": [
-                {
-                    "id": o.id,
-                    "title": o.title,
-                    "customer": o.customer.username,
-                    "status": o.status,
-                    "status_label": o.get_status_display(),
-                    "total_price": o.total_price,
-                    "deposit_amount": o.deposit_amount,
-                    "created_at": o.created_at.isoformat(),
-                }
-                for o in qs
-            ],
-        }
-    )
+    try:
+        limit = parse_limit(request.GET.get("limit"))
+        filtered = apply_order_filters(Order.objects.all(), request.GET, allow_customer=True)
+        hits, next_cursor = search.search_page(
+            request.GET.get("q", ""),
+            request.GET.get("cursor", ""),
+            limit,
+            orders=filtered if filtered.query.has_filters() else None,
+        )
+    except ValueError as e:
+        return bad(str(e))
+
+    rows = {o["id"]: o for o in Order.objects.filter(id__in=[h["order_id"] for h in hits]).values(*STAFF_ORDER_FIELDS)}
+    orders = [{**order_row(rows[h["order_id"]]), "score": h["score"]} for h in hits if h["order_id"] in rows]
+    return JsonResponse({"ok": True, "orders": orders, "next_cursor": next_cursor})
 
 
 @login_required
 @require_http_methods(["GET"])
 def staff_order_detail(request, order_id: int):
-    """Order detail for staff (includes internal messages)."""
-    err = _require_staff_perm(request, "view_all_orders")
+    """Order detail for staff (includes internal messages). Supports conditional GET."""
+    err = require_staff_perm(request, "view_all_orders")
     if err:
         return err
 
-    order = get_object_or_404(Order, id=order_id)
+    caps = {
+        "can_set_pricing": has_perm(request.user, "set_pricing"),
+        "can_change_status": has_perm(request.user, "change_order_status"),
+        "can_view_financial": has_perm(request.user, "view_financial_reports"),
+    }
+    qs = Order.objects.filter(id=order_id)
+    order, etag, last_modified, not_modified = conditional_detail(
+        request, qs, STAFF_ORDER_FIELDS, "staff", *caps.values()
+    )
+    if not_modified is not None:
+        return with_validators(not_modified, etag, last_modified)
 
-    return JsonResponse(
+    messages, messages_cursor, _ = order_messages(order_id, include_internal=True)
+    response = JsonResponse(
         {
             "ok": True,
-            "order": {
-                "id": order.id,
-                "title": order.title,
-                "customer": order.customer.username,
-                "status": order.status,
-                "status_label": order.get_status_display(),
-                "total_price": order.total_price,
-                "deposit_amount": order.deposit_amount,
-                "created_at": order.created_at.isoformat(),
-            },
-            "items": [
-                {
-                    "id": i.id,
-                    "product_type": i.product_type,
-                    "qty": i.qty,
-                    "size_range": i.size_range,
-                    "fabric_type": i.fabric_type,
-                    "notes": i.notes,
-                }
-                for i in order.items.all()
-            ],
-            "messages": [
-                {
-                    "id": m.id,
-                    "sender": getattr(m.sender, "username", "unknown"),
-                    "message": m.message,
-                    "is_internal": m.is_internal,
-                    "created_at": m.created_at.isoformat(),
-                }
-                for m in order.messages.order_by("created_at")
-            ],
-            "payments": [
-                {
-                    "id": p.id,
-                    "amount": p.amount,
-                    "method": p.method,
-                    "status": p.status,
-                    "status_label": p.get_status_display(),
-                    "created_at": p.created_at.isoformat(),
-                }
-                for p in order.payments.order_by("-created_at")
-            ],
-            "can_set_pricing": has_perm(request.user, "set_pricing"),
-            "can_change_status": has_perm(request.user, "change_order_status"),
-            "can_view_financial": has_perm(request.user, "view_financial_reports"),
+            "order": order_row(order),
+            "items": order_items(order_id),
+            "messages": messages,
+            "messages_cursor": messages_cursor,
+            "payments": order_payments(order_id),
+            "files": order_files(order_id),
+            "status_history": order_status_history(order_id),
+            **caps,
         }
     )
+    return with_validators(response, etag, last_modified)
+
+
+@login_required
+@require_http_methods(["GET"])
+def staff_order_messages(request, order_id: int):
+    """Page through the full order thread, internal notes included (requires view_all_orders)."""
+    err = require_staff_perm(request, "view_all_orders")
+    if err:
+        return err
+    if not Order.objects.filter(id=order_id).exists():
+        raise Http404("No Order matches the given query.")
+    return _thread_page(request, order_id, include_internal=True)
 
 
 @login_required
@@ -273,24 +360,29 @@ def staff_order_detail(request, order_id: int):
 @require_http_methods(["POST"])
 def staff_set_pricing(request, order_id: int):
     """Set order pricing (requires set_pricing)."""
-    err = _require_staff_perm(request, "set_pricing")
+    err = require_staff_perm(request, "set_pricing")
     if err:
         return err
 
-    order = get_object_or_404(Order, id=order_id)
     try:
         payload = json.loads(request.body.decode("utf-8"))
     except Exception:
-        return _bad("Invalid JSON payload.")
+        return bad("Invalid JSON payload.")
 
     total = int(payload.get("total_price") or 0)
     deposit = int(payload.get("deposit_amount") or 0)
     if total < 0 or deposit < 0:
-        return _bad("Invalid price values.")
-
-    order.total_price = total
-    order.deposit_amount = deposit
-    order.save(update_fields=["total_price", "deposit_amount", "updated_at"])
+        return bad("Invalid price values.")
+
+    with transaction.atomic():
+        # Row lock: the rollup delta needs the figures this save replaces
+        order = get_object_or_404(Order.objects.select_for_update(), id=order_id)
+        old = (order.total_price, order.deposit_amount, order.paid_total)
+        order.total_price = total
+        order.deposit_amount = deposit
+        order.save(update_fields=["total_price", "deposit_amount", "updated_at"])
+        reports.order_figures_changed(order.created_at, old, (total, deposit, order.paid_total))
+        notify_order_changed(order.id)
     return JsonResponse({"ok": True})
 
 
@@ -299,32 +391,60 @@ def staff_set_pricing(request, order_id: int):
 @require_http_methods(["POST"])
 def staff_change_status(request, order_id: int):
     """Change order status (requires change_order_status)."""
-    err = _require_staff_perm(request, "change_order_status")
+    err = require_staff_perm(request, "change_order_status")
     if err:
         return err
 
-    order = get_object_or_404(Order, id=order_id)
     try:
         payload = json.loads(request.body.decode("utf-8"))
     except Exception:
-        return _bad("Invalid JSON payload.")
+        return bad("Invalid JSON payload.")
 
     status = (payload.get("status") or "").strip()
     valid = {s[0] for s in OrderStatus.choices}
     if status not in valid:
-        return _bad("Invalid status.")
+        return bad("Invalid status.")
+
+    with transaction.atomic():
+        # Row lock keeps the old->new counter move consistent under concurrent changes
+        order = get_object_or_404(Order.objects.select_for_update(), id=order_id)
+        old_status = order.status
+        order.status = status
+        order.save(update_fields=["status", "updated_at"])
+        move_status_count(old_status, status)
+        status_events.record(order.id, old_status, status, request.user)
+        marquee.invalidate()
+        notify_order_changed(order.id)
+    return JsonResponse({"ok": True})
 
-    order.status = status
-    order.save(update_fields=["status", "updated_at"])
 
-    # Audit trail as internal note
-    OrderMessage.objects.create(
-        order=order,
-        sender=request.user,
-        message=f"Status changed to: {order.get_status_display()}",
-        is_internal=True,
-    )
-    return JsonResponse({"ok": True})
+@login_required
+@ratelimit(key="user_or_ip", rate="20/m", block=True)
+@require_http_methods(["POST"])
+def staff_batch_update(request):
+    """
+    Apply status / assigned_to / pricing to many orders in one transaction
+    (each operation needs its own permission). See batch.py.
+    """
+    err = require_staff_perm(request, "view_all_orders")
+    if err:
+        return err
+
+    try:
+        payload = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        return bad("Invalid JSON payload.")
+
+    try:
+        order_ids, ops = batch.parse_batch(payload)
+    except ValueError as e:
+        return bad(str(e))
+    for op in ops:
+        err = require_staff_perm(request, batch.OPERATION_PERMS[op])
+        if err:
+            return err
+
+    return JsonResponse({"ok": True, "results": batch.apply_batch(order_ids, ops, request.user)})
 
 
 @login_required
@@ -332,7 +452,7 @@ def staff_change_status(request, order_id: int):
 @require_http_methods(["POST"])
 def staff_add_internal_note(request, order_id: int):
     """Add internal staff note (requires view_all_orders)."""
-    err = _require_staff_perm(request, "view_all_orders")
+    err = require_staff_perm(request, "view_all_orders")
     if err:
         return err
 
@@ -340,15 +460,19 @@ def staff_add_internal_note(request, order_id: int):
     try:
         payload = json.loads(request.body.decode("utf-8"))
     except Exception:
-        return _bad("Invalid JSON payload.")
+        return bad("Invalid JSON payload.")
 
     text = (payload.get("message") or "").strip()
     if not text:
-        return _bad("Note cannot be empty.")
+        return bad("Note cannot be empty.")
     if len(text) > 5000:
-        return _bad("Note too long.")
+        return bad("Note too long.")
 
-    OrderMessage.objects.create(order=order, sender=request.user, message=text, is_internal=True)
+    with transaction.atomic():
+        msg = OrderMessage.objects.create(order=order, sender=request.user, message=text, is_internal=True)
+        aggregates.messages_added(order.id, 1, msg.created_at)
+        search.index_text(order.id, text)
+        notify_order_changed(order.id)
     return JsonResponse({"ok": True})
 
 
@@ -357,7 +481,7 @@ def staff_add_internal_note(request, order_id: int):
 @require_http_methods(["POST"])
 def staff_add_payment(request, order_id: int):
     """Add payment (requires view_financial_reports)."""
-    err = _require_staff_perm(request, "view_financial_reports")
+    err = require_staff_perm(request, "view_financial_reports")
     if err:
         return err
 
@@ -365,20 +489,212 @@ def staff_add_payment(request, order_id: int):
     try:
         payload = json.loads(request.body.decode("utf-8"))
     except Exception:
-        return _bad("Invalid JSON payload.")
+        return bad("Invalid JSON payload.")
 
     amount = int(payload.get("amount") or 0)
     method = (payload.get("method") or "card").strip()[:30]
     status = (payload.get("status") or "paid").strip()
 
     if amount <= 0:
-        return _bad("Amount must be > 0.")
-
-    payment = Payment.objects.create(
-        order=order,
-        amount=amount,
-        method=method,
-        status=status,
-        paid_at=timezone.now() if status == "paid" else None,
-    )
-    return JsonResponse({"ok": True, "payment_id": payment.id})
\ No newline at end of file
+        return bad("Amount must be > 0.")
+    # the financial rollups bucket by status: unknown values would become junk buckets
+    if status not in Payment.PaymentStatus.values:
+        return bad("Invalid payment status.")
+
+    with transaction.atomic():
+        payment = Payment.objects.create(
+            order=order,
+            amount=amount,
+            method=method,
+            status=status,
+            paid_at=timezone.now() if status == "paid" else None,
+        )
+        aggregates.payment_added(order.id, amount, status)
+        reports.payment_recorded(payment)
+        notify_order_changed(order.id)
+    return JsonResponse({"ok": True, "payment_id": payment.id})
+
+
+@login_required
+@ratelimit(key="user_or_ip", rate="10/m", block=True)
+@require_http_methods(["GET"])
+def staff_export_orders(request):
+    """
+    Stream orders as CSV or NDJSON (requires view_financial_reports).
+
+    Query params: format=csv|ndjson, kind=orders|items|payments (CSV only),
+    plus the list filters (status, created_from/created_to, customer, ...).
+    """
+    err = require_staff_perm(request, "view_financial_reports")
+    if err:
+        return err
+
+    fmt = (request.GET.get("format") or "csv").strip()
+    kind = (request.GET.get("kind") or "orders").strip()
+    try:
+        qs = apply_order_filters(Order.objects.all(), request.GET, allow_customer=True)
+        lines = export_lines(qs, fmt, kind)
+    except ValueError as e:
+        return bad(str(e))
+
+    if fmt == "csv":
+        content_type, filename = "text/csv; charset=utf-8", f"{kind}-{timezone.localdate():%Y%m%d}.csv"
+    else:
+        content_type, filename = "application/x-ndjson", f"orders-{timezone.localdate():%Y%m%d}.ndjson"
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    patch_cache_control(response, private=True, no_store=True)
+    return response
+
+
+@login_required
+@require_http_methods(["GET"])
+def staff_financial_report(request):
+    """
+    Revenue, refunds, deposits and outstanding per day or month (requires view_financial_reports).
+    Reads the rollup tables only; ?period=day|month&from=YYYY-MM-DD&to=YYYY-MM-DD.
+    """
+    err = require_staff_perm(request, "view_financial_reports")
+    if err:
+        return err
+
+    try:
+        period, first, last = reports.parse_report_range(request.GET)
+    except ValueError as e:
+        return bad(str(e))
+
+    return JsonResponse({"ok": True, **reports.financial_report(period, first, last)})
+
+
+@login_required
+@require_http_methods(["GET"])
+def staff_lead_time_report(request):
+    """
+    Time in each stage, created -> delivered lead time and throughput from the
+    status history (requires view_all_orders); same ?period/from/to as the financial report.
+    """
+    err = require_staff_perm(request, "view_all_orders")
+    if err:
+        return err
+
+    try:
+        period, first, last = reports.parse_report_range(request.GET)
+    except ValueError as e:
+        return bad(str(e))
+
+    return JsonResponse({"ok": True, **status_events.lead_time_report(period, first, last)})
+
+
+# -----------------------
+# Files (owner or staff)
+# -----------------------
+
+def _files_order(request, order_id: int) -> Order:
+    """The order if the user owns it or is staff with view_all_orders (404 otherwise)."""
+    qs = Order.objects.filter(id=order_id)
+    if not (is_staff_role(request.user) and has_perm(request.user, "view_all_orders")):
+        qs = qs.filter(customer=request.user)
+    return get_object_or_404(qs)
+
+
+def _upload_state(upload, order_file=None) -> dict:
+    state = {"ok": True, "upload_id": str(upload.pk), "offset": upload.received, "size": upload.size}
+    if order_file is not None:
+        state["file"] = file_row({f: getattr(order_file, f) for f in FILE_FIELDS} | {"file": order_file.file.name})
+    return state
+
+
+@login_required
+@ratelimit(key="user_or_ip", rate="30/m", block=True)
+@require_http_methods(["POST"])
+def start_file_upload(request, order_id: int):
+    """
+    Open a chunked upload: {filename, size, type}. Chunks then go to
+    PUT /api/orders/uploads/<upload_id>/ (see uploads.py for the protocol).
+    """
+    order = _files_order(request, order_id)
+    try:
+        payload = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        return bad("Invalid JSON payload.")
+
+    try:
+        upload = uploads.start_upload(
+            order, request.user, payload.get("filename"), payload.get("size"), (payload.get("type") or "").strip()
+        )
+    except ValueError as e:
+        return bad(str(e))
+    return JsonResponse({**_upload_state(upload), "chunk_size": uploads.MAX_CHUNK_BYTES})
+
+
+@login_required
+@ratelimit(key="user_or_ip", rate="600/m", block=True)
+@require_http_methods(["GET", "PUT", "DELETE"])
+def file_upload(request, upload_id):
+    """
+    GET: current offset (resume point). DELETE: abandon the upload.
+    PUT: raw chunk bytes with Content-Range; the last chunk returns the stored file.
+    """
+    upload = get_object_or_404(OrderUpload, pk=upload_id, user=request.user)
+    if request.method == "GET":
+        return JsonResponse(_upload_state(upload))
+    if request.method == "DELETE":
+        uploads.discard(upload)
+        return JsonResponse({"ok": True})
+
+    try:
+        start, length = uploads.parse_content_range(request.headers.get("Content-Range"), upload.size)
+        if request.META.get("CONTENT_LENGTH") not in (None, "", str(length)):
+            raise ValueError("Content-Length does not match Content-Range.")
+        # `request` is read as a stream: the chunk is never held in memory
+        upload, order_file = uploads.append_chunk(upload.pk, request, start, length)
+    except uploads.OffsetMismatch as e:
+        return JsonResponse({"ok": False, "error": str(e), "offset": e.offset}, status=409)
+    except OrderUpload.DoesNotExist:
+        raise Http404("Upload not found.")
+    except ValueError as e:
+        return bad(str(e))
+    return JsonResponse(_upload_state(upload, order_file))
+
+
+@login_required
+@ratelimit(key="user_or_ip", rate="30/m", block=True)
+@require_http_methods(["GET", "HEAD"])
+def order_files_archive(request, order_id: int):
+    """
+    All files of an order as one ZIP, streamed (see archives.py).
+    Supports a single Range (with If-Range) so interrupted downloads resume.
+    """
+    order = _files_order(request, order_id)
+    try:
+        archive = archives.order_archive(order.id)
+    except archives.ArchiveTooLarge as e:
+        return bad(str(e), 413)
+    if not archive.entries:
+        return bad("This order has no files.", 404)
+
+    etag = archive.etag
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    span = None
+    if request.headers.get("If-Range", etag) == etag:
+        try:
+            span = archives.parse_range(request.headers.get("Range"), archive.size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{archive.size}"
+            return response
+
+    first, last = span or (0, archive.size - 1)
+    body = archive.stream(first, last) if request.method == "GET" else iter(())
+    response = StreamingHttpResponse(body, content_type="application/zip", status=206 if span else 200)
+    response["Content-Length"] = str(last - first + 1)
+    if span:
+        response["Content-Range"] = f"bytes {first}-{last}/{archive.size}"
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Content-Disposition"] = f'attachment; filename="order-{order.id}-files.zip"'
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class OrdersConfig(AppConfig):
+    """Orders app config."""
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "orders"
+
+    def ready(self):
+        from . import permissions, search
+
+        permissions.connect_signals()
+        search.connect_signals()
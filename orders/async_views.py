@@ -0,0 +1,116 @@
+"""
+ASGI-native variants of the read-only JSON endpoints.
+
+With SERVER_MODE=asgi, api_urls.py routes these URLs here instead of to
+api_views.py. Under uvicorn a sync view holds an executor thread for the whole
+request; these await the async ORM, cache and auth (request.auser(),
+apermission_snapshot) instead. Responses, ETags and query counts match the
+sync views exactly; only the I/O calls differ.
+
+Under WSGI the sync views stay in place: Django would have to run each
+coroutine in a fresh event loop (async_to_sync), which only adds overhead.
+"""
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.views.decorators.http import require_http_methods
+
+from .http import aconditional_detail, arequire_staff_perm, bad, with_validators
+from .models import Order
+from .pagination import akeyset_page, apply_order_filters, parse_limit
+from .serializers import (
+    ORDER_LIST_FIELDS,
+    STAFF_ORDER_FIELDS,
+    aorder_files,
+    aorder_items,
+    aorder_messages,
+    aorder_payments,
+    aorder_status_history,
+    order_row,
+)
+
+
+async def _detail_payload(order_id: int, include_internal: bool) -> dict:
+    messages, messages_cursor, _ = await aorder_messages(order_id, include_internal=include_internal)
+    return {
+        "items": await aorder_items(order_id),
+        "messages": messages,
+        "messages_cursor": messages_cursor,
+        "payments": await aorder_payments(order_id),
+        "files": await aorder_files(order_id),
+    }
+
+
+@login_required
+@require_http_methods(["GET"])
+async def my_orders(request):
+    """List current user's orders (cursor paginated, filterable)."""
+    user = await request.auser()
+    try:
+        limit = parse_limit(request.GET.get("limit"))
+        qs = apply_order_filters(Order.objects.filter(customer=user), request.GET)
+        rows, next_cursor = await akeyset_page(qs.values(*ORDER_LIST_FIELDS), request.GET.get("cursor", ""), limit)
+    except ValueError as e:
+        return bad(str(e))
+
+    return JsonResponse({"ok": True, "orders": [order_row(o) for o in rows], "next_cursor": next_cursor})
+
+
+@login_required
+@require_http_methods(["GET"])
+async def my_order_detail(request, order_id: int):
+    """Get order details for owner only; hide internal messages. Supports conditional GET."""
+    user = await request.auser()
+    qs = Order.objects.filter(id=order_id, customer=user)
+    order, etag, last_modified, not_modified = await aconditional_detail(request, qs, ORDER_LIST_FIELDS, "customer")
+    if not_modified is not None:
+        return with_validators(not_modified, etag, last_modified)
+
+    payload = await _detail_payload(order_id, include_internal=False)
+    response = JsonResponse({"ok": True, "order": order_row(order), **payload})
+    return with_validators(response, etag, last_modified)
+
+
+@login_required
+@require_http_methods(["GET"])
+async def staff_orders(request):
+    """List all orders (requires view_all_orders); cursor paginated, filterable."""
+    err, _ = await arequire_staff_perm(await request.auser(), "view_all_orders")
+    if err:
+        return err
+
+    try:
+        limit = parse_limit(request.GET.get("limit"))
+        qs = apply_order_filters(Order.objects.all(), request.GET, allow_customer=True)
+        qs = qs.values(*STAFF_ORDER_FIELDS)
+        rows, next_cursor = await akeyset_page(qs, request.GET.get("cursor", ""), limit)
+    except ValueError as e:
+        return bad(str(e))
+
+    return JsonResponse({"ok": True, "orders": [order_row(o) for o in rows], "next_cursor": next_cursor})
+
+
+@login_required
+@require_http_methods(["GET"])
+async def staff_order_detail(request, order_id: int):
+    """Order detail for staff (includes internal messages). Supports conditional GET."""
+    err, snapshot = await arequire_staff_perm(await request.auser(), "view_all_orders")
+    if err:
+        return err
+
+    caps = {
+        "can_set_pricing": snapshot.has("set_pricing"),
+        "can_change_status": snapshot.has("change_order_status"),
+        "can_view_financial": snapshot.has("view_financial_reports"),
+    }
+    qs = Order.objects.filter(id=order_id)
+    order, etag, last_modified, not_modified = await aconditional_detail(
+        request, qs, STAFF_ORDER_FIELDS, "staff", *caps.values()
+    )
+    if not_modified is not None:
+        return with_validators(not_modified, etag, last_modified)
+
+    payload = await _detail_payload(order_id, include_internal=True)
+    payload["status_history"] = await aorder_status_history(order_id)
+    response = JsonResponse({"ok": True, "order": order_row(order), **payload, **caps})
+    return with_validators(response, etag, last_modified)
@@ -0,0 +1,156 @@
+"""
+Batch staff operations: one status, assignee and/or pricing change applied to
+many orders in one transaction.
+
+POST /api/orders/staff/batch/
+  {"order_ids": [...], "status": "...", "assigned_to": <user id>|null,
+   "pricing": {"total_price": ..., "deposit_amount": ...}}
+
+- the selected orders are locked once (SELECT ... FOR UPDATE, values only);
+  orders that already hold the requested value are left alone
+- each operation is one UPDATE ... WHERE id IN (...) for the orders it changes
+- side tables follow in bulk: status counters get one delta per old status,
+  the status history gets one bulk INSERT, report rollups get one delta per
+  touched day/month bucket
+- per-order results in request order: the fields that changed, or an error
+  for ids that don't exist
+"""
+
+from collections import Counter, defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import marquee, reports, status_events
+from .events import notify_order_changed
+from .models import Order, OrderStatus
+from .rollups import bump_status_counts
+
+MAX_BATCH_ORDERS = 500
+PRICING_FIELDS = ("total_price", "deposit_amount")
+# operation -> permission codename (there is no separate assignment permission)
+OPERATION_PERMS = {
+    "status": "change_order_status",
+    "assigned_to": "change_order_status",
+    "pricing": "set_pricing",
+}
+_LOCKED_FIELDS = ("id", "status", "assigned_to_id", "created_at", "paid_total") + PRICING_FIELDS
+
+
+def _non_negative(value, name: str) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise ValueError(f"{name} must be a non-negative integer.")
+    return value
+
+
+def _staff_user_id(value):
+    """An active staff-role user id (group member or superuser), or None to unassign."""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("assigned_to must be a user id or null.")
+    exists = (
+        get_user_model().objects.filter(pk=value, is_active=True)
+        .filter(Q(is_superuser=True) | Q(groups__isnull=False))
+        .exists()
+    )
+    if not exists:
+        raise ValueError("assigned_to must be an active staff user.")
+    return value
+
+
+def parse_batch(payload) -> tuple:
+    """(order_ids, operations) from a request payload. Raises ValueError."""
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid JSON payload.")
+    ids = payload.get("order_ids")
+    if not isinstance(ids, list) or not ids:
+        raise ValueError("order_ids must be a non-empty list.")
+    if any(isinstance(i, bool) or not isinstance(i, int) or i <= 0 for i in ids):
+        raise ValueError("order_ids must be positive integers.")
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_BATCH_ORDERS:
+        raise ValueError(f"Too many orders (max {MAX_BATCH_ORDERS}).")
+
+    ops = {}
+    if "status" in payload:
+        status = (payload.get("status") or "").strip()
+        if status not in OrderStatus.values:
+            raise ValueError("Invalid status.")
+        ops["status"] = status
+    if "assigned_to" in payload:
+        ops["assigned_to"] = _staff_user_id(payload.get("assigned_to"))
+    if "pricing" in payload:
+        pricing = payload.get("pricing")
+        if not isinstance(pricing, dict) or not pricing or set(pricing) - set(PRICING_FIELDS):
+            raise ValueError("pricing must set total_price and/or deposit_amount.")
+        ops["pricing"] = {f: _non_negative(pricing[f], f) for f in PRICING_FIELDS if f in pricing}
+    if not ops:
+        raise ValueError("Nothing to do: give status, assigned_to and/or pricing.")
+    return ids, ops
+
+
+def _set_status(rows: dict, status: str, user, now) -> list:
+    ids = [i for i, r in rows.items() if r["status"] != status]
+    if not ids:
+        return ids
+    Order.objects.filter(id__in=ids).update(status=status, updated_at=now)
+    deltas = Counter({status: len(ids)})
+    deltas.subtract(rows[i]["status"] for i in ids)
+    bump_status_counts(deltas)
+    status_events.record_many([(i, rows[i]["status"]) for i in ids], status, user)
+    marquee.invalidate()
+    return ids
+
+
+def _set_assignee(rows: dict, user_id, now) -> list:
+    ids = [i for i, r in rows.items() if r["assigned_to_id"] != user_id]
+    if ids:
+        Order.objects.filter(id__in=ids).update(assigned_to_id=user_id, updated_at=now)
+    return ids
+
+
+def _set_pricing(rows: dict, pricing: dict, now) -> list:
+    ids = [i for i, r in rows.items() if any(r[f] != v for f, v in pricing.items())]
+    if not ids:
+        return ids
+    Order.objects.filter(id__in=ids).update(**pricing, updated_at=now)
+    changes = []
+    for i in ids:
+        r = rows[i]
+        old = (r["total_price"], r["deposit_amount"], r["paid_total"])
+        new = (pricing.get("total_price", r["total_price"]), pricing.get("deposit_amount", r["deposit_amount"]), r["paid_total"])
+        changes.append((r["created_at"], old, new))
+    reports.orders_figures_changed(changes)
+    return ids
+
+
+def apply_batch(order_ids: list, ops: dict, user) -> list:
+    """Apply parsed operations to the orders in one transaction; per-order results in request order."""
+    changed = defaultdict(list)
+    with transaction.atomic():
+        # Row locks: counter and rollup deltas need the values these updates replace
+        rows = {
+            r["id"]: r
+            for r in Order.objects.select_for_update().filter(id__in=order_ids).order_by("id").values(*_LOCKED_FIELDS)
+        }
+        now = timezone.now()
+        if "status" in ops:
+            for i in _set_status(rows, ops["status"], user, now):
+                changed[i].append("status")
+        if "assigned_to" in ops:
+            for i in _set_assignee(rows, ops["assigned_to"], now):
+                changed[i].append("assigned_to")
+        if "pricing" in ops:
+            for i in _set_pricing(rows, ops["pricing"], now):
+                changed[i].append("pricing")
+        for i in changed:
+            notify_order_changed(i)
+
+    return [
+        {"id": i, "ok": True, "changed": changed.get(i, [])} if i in rows
+        else {"id": i, "ok": False, "error": "Order not found."}
+        for i in order_ids
+    ]
@@ -0,0 +1,14 @@
+"""
+RBAC context processor:
+exposes the current user's permission snapshot as `rbac` (lazy, so pages
+that never check roles don't load it).
+"""
+
+from django.utils.functional import SimpleLazyObject
+
+from .permissions import permission_snapshot
+
+
+def rbac(request):
+    """Return the user's PermissionSnapshot for templates (rbac.is_staff, rbac.has_roles)."""
+    return {"rbac": SimpleLazyObject(lambda: permission_snapshot(request.user))}
@@ -0,0 +1,48 @@
+"""
+In-process fanout for live order updates (no broker).
+
+Write paths call notify_order_changed(order_id) after commit; every open event
+stream for that order in this process wakes up immediately. Streams also poll
+the order's version key on a short interval, so writes handled by other worker
+processes still arrive (just up to one poll interval later).
+"""
+
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+
+_lock = threading.Lock()
+_waiters = defaultdict(set)  # order_id -> {(loop, asyncio.Event)}
+
+
+def subscribe(order_id: int) -> asyncio.Event:
+    """Register the running event loop for wakeups on this order."""
+    event = asyncio.Event()
+    with _lock:
+        _waiters[order_id].add((asyncio.get_running_loop(), event))
+    return event
+
+
+def unsubscribe(order_id: int, event: asyncio.Event) -> None:
+    with _lock:
+        waiters = _waiters.get(order_id)
+        if not waiters:
+            return
+        waiters.difference_update({w for w in waiters if w[1] is event})
+        if not waiters:
+            del _waiters[order_id]
+
+
+def _wake(order_id: int) -> None:
+    with _lock:
+        waiters = list(_waiters.get(order_id, ()))
+    for loop, event in waiters:
+        if not loop.is_closed():
+            loop.call_soon_threadsafe(event.set)
+
+
+def notify_order_changed(order_id: int) -> None:
+    """Wake this process's streams for the order once the current transaction commits."""
+    transaction.on_commit(lambda: _wake(order_id))
@@ -0,0 +1,167 @@
+"""
+Constant-memory order exports (CSV / NDJSON) for accounting.
+
+Orders are read in keyset batches of `chunk_size` (id > last id, ordered by
+id). Each batch costs three queries: orders, their items, their payments.
+MySQL's client buffers a whole result set even with QuerySet.iterator(), so
+short batched queries are what keeps memory flat on every backend.
+
+Formats:
+- ndjson: one JSON object per order with nested "items" and "payments"
+- csv: one flat table per `kind`:
+  - orders    one row per order
+  - items     one row per line item (with order columns)
+  - payments  one row per payment (with order columns)
+"""
+
+import csv
+import json
+from collections import defaultdict
+
+from .models import OrderItem, Payment
+from .serializers import ORDER_STATUS_LABELS, PAYMENT_STATUS_LABELS
+
+FORMATS = ("csv", "ndjson")
+CSV_KINDS = ("orders", "items", "payments")
+DEFAULT_CHUNK_SIZE = 500
+
+ORDER_EXPORT_FIELDS = (
+    "id", "created_at", "customer__username", "title", "status", "deadline_date",
+    "total_price", "deposit_amount", "paid_total", "total_qty", "item_count",
+)
+ITEM_EXPORT_FIELDS = ("id", "order_id", "product_type", "qty", "size_range", "fabric_type", "notes")
+PAYMENT_EXPORT_FIELDS = ("id", "order_id", "amount", "method", "status", "ref_code", "paid_at", "created_at")
+
+ORDER_COLUMNS = [
+    "order_id", "created_at", "customer", "title", "status", "status_label", "deadline_date",
+    "total_price", "deposit_amount", "paid_total", "outstanding", "total_qty", "item_count",
+]
+ITEM_COLUMNS = ["item_id", "product_type", "qty", "size_range", "fabric_type", "notes"]
+PAYMENT_COLUMNS = ["payment_id", "amount", "method", "payment_status", "payment_status_label", "ref_code",
+                   "paid_at", "payment_created_at"]
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _order(o: dict) -> dict:
+    return {
+        "order_id": o["id"],
+        "created_at": _iso(o["created_at"]),
+        "customer": o["customer__username"],
+        "title": o["title"],
+        "status": o["status"],
+        "status_label": ORDER_STATUS_LABELS.get(o["status"], o["status"]),
+        "deadline_date": _iso(o["deadline_date"]),
+        "total_price": o["total_price"],
+        "deposit_amount": o["deposit_amount"],
+        "paid_total": o["paid_total"],
+        "outstanding": max(0, o["total_price"] - o["paid_total"]),
+        "total_qty": o["total_qty"],
+        "item_count": o["item_count"],
+    }
+
+
+def _item(i: dict) -> dict:
+    return {
+        "item_id": i["id"],
+        "product_type": i["product_type"],
+        "qty": i["qty"],
+        "size_range": i["size_range"],
+        "fabric_type": i["fabric_type"],
+        "notes": i["notes"],
+    }
+
+
+def _payment(p: dict) -> dict:
+    return {
+        "payment_id": p["id"],
+        "amount": p["amount"],
+        "method": p["method"],
+        "payment_status": p["status"],
+        "payment_status_label": PAYMENT_STATUS_LABELS.get(p["status"], p["status"]),
+        "ref_code": p["ref_code"],
+        "paid_at": _iso(p["paid_at"]),
+        "payment_created_at": _iso(p["created_at"]),
+    }
+
+
+def order_batches(qs, chunk_size: int = DEFAULT_CHUNK_SIZE, items: bool = True, payments: bool = True):
+    """
+    Yield lists of (order, items, payments) for the orders in qs, oldest id first.
+    Only one batch is held in memory at a time.
+    """
+    last_id = 0
+    while True:
+        rows = list(qs.filter(id__gt=last_id).order_by("id").values(*ORDER_EXPORT_FIELDS)[:chunk_size])
+        if not rows:
+            return
+        last_id = rows[-1]["id"]
+        ids = [o["id"] for o in rows]
+
+        items_by_order = defaultdict(list)
+        if items:
+            for i in OrderItem.objects.filter(order_id__in=ids).order_by("id").values(*ITEM_EXPORT_FIELDS):
+                items_by_order[i["order_id"]].append(_item(i))
+        payments_by_order = defaultdict(list)
+        if payments:
+            for p in Payment.objects.filter(order_id__in=ids).order_by("id").values(*PAYMENT_EXPORT_FIELDS):
+                payments_by_order[p["order_id"]].append(_payment(p))
+
+        yield [(_order(o), items_by_order[o["id"]], payments_by_order[o["id"]]) for o in rows]
+        if len(rows) < chunk_size:
+            return
+
+
+def _safe_cell(value):
+    """Neutralize spreadsheet formulas in free-text cells (CSV injection)."""
+    if isinstance(value, str) and value[:1] in ("=", "+", "-", "@", "\t", "\r"):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    """File-like object whose write() returns the line instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(qs, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield one JSON line per order (items and payments nested)."""
+    for batch in order_batches(qs, chunk_size):
+        yield "".join(
+            json.dumps({**order, "items": items, "payments": payments}, ensure_ascii=False) + "\n"
+            for order, items, payments in batch
+        )
+
+
+def csv_lines(qs, kind: str = "orders", chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Yield CSV text (header first, then one chunk of rows per batch)."""
+    columns = ORDER_COLUMNS + {"orders": [], "items": ITEM_COLUMNS, "payments": PAYMENT_COLUMNS}[kind]
+    writer = csv.DictWriter(_Echo(), fieldnames=columns)
+    # UTF-8 BOM so Excel opens Persian text correctly
+    yield "\ufeff" + writer.writeheader()
+
+    batches = order_batches(qs, chunk_size, items=kind == "items", payments=kind == "payments")
+    for batch in batches:
+        if kind == "orders":
+            rows = [order for order, _, _ in batch]
+        elif kind == "items":
+            rows = [{**order, **item} for order, items, _ in batch for item in items]
+        else:
+            rows = [{**order, **payment} for order, _, payments in batch for payment in payments]
+        yield "".join(writer.writerow({k: _safe_cell(v) for k, v in row.items()}) for row in rows)
+
+
+def export_lines(qs, fmt: str, kind: str = "orders", chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Dispatch to the CSV/NDJSON writer. Raises ValueError on an unknown format/kind."""
+    if fmt == "ndjson":
+        return ndjson_lines(qs, chunk_size)
+    if fmt == "csv":
+        if kind not in CSV_KINDS:
+            raise ValueError(f"Invalid kind (expected one of: {', '.join(CSV_KINDS)}).")
+        return csv_lines(qs, kind, chunk_size)
+    raise ValueError(f"Invalid format (expected one of: {', '.join(FORMATS)}).")
+
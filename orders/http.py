@@ -0,0 +1,66 @@
+"""
+Response helpers shared by the JSON views (api_views, async_views, streams).
+"""
+
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .permissions import apermission_snapshot, has_perm, is_staff_role
+from .versioning import aorder_version, order_version, version_etag, version_last_modified
+
+
+def bad(msg: str, code: int = 400) -> JsonResponse:
+    """Standard JSON error response."""
+    return JsonResponse({"ok": False, "error": msg}, status=code)
+
+
+def with_validators(response, etag: str, last_modified: float):
+    """Attach validators; private + no-cache makes clients revalidate every time."""
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_detail(request, qs, fields, *etag_extra):
+    """
+    Load the order row (with its version) in one query.
+    Returns (row, etag, last_modified, response_or_None); the response is a 304
+    when the client's If-None-Match/If-Modified-Since still match.
+    """
+    row = order_version(qs, *fields)
+    if row is None:
+        raise Http404("No Order matches the given query.")
+    etag = version_etag(row, *etag_extra)
+    last_modified = version_last_modified(row).timestamp()
+    return row, etag, last_modified, get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+async def aconditional_detail(request, qs, fields, *etag_extra):
+    """conditional_detail for async views."""
+    row = await aorder_version(qs, *fields)
+    if row is None:
+        raise Http404("No Order matches the given query.")
+    etag = version_etag(row, *etag_extra)
+    last_modified = version_last_modified(row).timestamp()
+    return row, etag, last_modified, get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def require_staff_perm(request, codename: str):
+    """Centralized staff role + permission check; the error response, or None."""
+    if not is_staff_role(request.user):
+        return bad("Forbidden", 403)
+    if not has_perm(request.user, codename):
+        return bad("No permission", 403)
+    return None
+
+
+async def arequire_staff_perm(user, codename: str):
+    """require_staff_perm for async views; returns (error_response, snapshot)."""
+    snapshot = await apermission_snapshot(user)
+    if not snapshot.is_staff:
+        return bad("Forbidden", 403), snapshot
+    if not snapshot.has(codename):
+        return bad("No permission", 403), snapshot
+    return None, snapshot
@@ -0,0 +1,46 @@
+"""
+Build pending image thumbnails (uploads queue them; this catches anything a
+restarted worker dropped, and backfills older files).
+
+Usage:
+    python manage.py build_thumbnails
+    python manage.py build_thumbnails --workers 4 --retry-failed
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from orders import thumbnails
+from orders.models import OrderFile
+
+
+def _build(order_file_id: int) -> str:
+    try:
+        return thumbnails.build(order_file_id)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = "Generate WebP/JPEG thumbnails for image attachments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=thumbnails.WORKERS)
+        parser.add_argument("--retry-failed", action="store_true", help="Also retry files that failed before")
+
+    def handle(self, *args, **opts):
+        statuses = [OrderFile.PreviewStatus.PENDING]
+        if opts["retry_failed"]:
+            statuses.append(OrderFile.PreviewStatus.FAILED)
+        ids = list(OrderFile.objects.filter(preview_status__in=statuses).order_by("id").values_list("id", flat=True))
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, opts["workers"])) as pool:
+            for status in pool.map(_build, ids):
+                results[status] = results.get(status, 0) + 1
+
+        ready = results.get(OrderFile.PreviewStatus.READY, 0)
+        failed = results.get(OrderFile.PreviewStatus.FAILED, 0)
+        self.stdout.write(self.style.SUCCESS(f"✅ Thumbnails: {ready} ready, {failed} failed."))
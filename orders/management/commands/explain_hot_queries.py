@@ -0,0 +1,114 @@
+"""
+Run EXPLAIN on the hot order queries and report full table scans.
+
+The query shapes mirror api_views (keyset lists, detail collections),
+adminpanel.views.dashboard (status counts) and core.views.home (latest orders).
+Run it against a database with realistic row counts: planners may legitimately
+prefer a scan on tiny tables.
+
+Usage:
+    python manage.py explain_hot_queries
+    python manage.py explain_hot_queries --verbose --strict
+"""
+
+import json
+import re
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+
+from orders.models import Order, OrderItem, OrderMessage, Payment, OrderStatus
+
+
+def hot_queries():
+    """(label, queryset) pairs matching what the views actually execute."""
+    now = timezone.now()
+    customer_id = 1
+    order_id = 1
+    return [
+        ("home: latest orders", Order.objects.order_by("-created_at")[:10]),
+        ("staff_orders: first page", Order.objects.order_by("-created_at", "-id")[:51]),
+        (
+            "staff_orders: status filter",
+            Order.objects.filter(status__in=[OrderStatus.NEW]).order_by("-created_at", "-id")[:51],
+        ),
+        (
+            "staff_orders: created range",
+            Order.objects.filter(created_at__gte=now - timedelta(days=30), created_at__lt=now)
+            .order_by("-created_at", "-id")[:51],
+        ),
+        (
+            "staff_orders: deadline range",
+            Order.objects.filter(deadline_date__gte=now.date(), deadline_date__lte=now.date() + timedelta(days=7))
+            .order_by("-created_at", "-id")[:51],
+        ),
+        (
+            "my_orders: first page",
+            Order.objects.filter(customer_id=customer_id).order_by("-created_at", "-id")[:51],
+        ),
+        ("dashboard: status counts", Order.objects.values("status").annotate(n=Count("id")).order_by()),
+        ("detail: items", OrderItem.objects.filter(order_id=order_id).order_by("id")),
+        (
+            "detail: customer messages",
+            OrderMessage.objects.filter(order_id=order_id, is_internal=False).order_by("created_at", "id"),
+        ),
+        ("detail: staff messages", OrderMessage.objects.filter(order_id=order_id).order_by("created_at", "id")),
+        ("detail: payments", Payment.objects.filter(order_id=order_id).order_by("-created_at", "-id")),
+    ]
+
+
+def full_scans(vendor: str, plan: str) -> list:
+    """Return the tables the plan reads with a full scan (vendor-specific parsing)."""
+    if vendor == "mysql":
+        found = []
+
+        def walk(node):
+            if isinstance(node, dict):
+                if node.get("access_type") == "ALL":
+                    found.append(node.get("table_name", "?"))
+                for v in node.values():
+                    walk(v)
+            elif isinstance(node, list):
+                for v in node:
+                    walk(v)
+
+        try:
+            walk(json.loads(plan))
+        except ValueError:
+            return re.findall(r"(\w+)\s+\S+\s+ALL\b", plan)
+        return found
+    if vendor == "postgresql":
+        return re.findall(r"Seq Scan on (\w+)", plan)
+    if vendor == "sqlite":
+        # "SCAN t USING [COVERING] INDEX ..." walks an index; bare "SCAN t" is a table scan
+        return re.findall(r"SCAN (\w+)(?! USING)(?:\s|$)", plan + "\n")
+    return []
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot order queries and flag full table scans"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose", action="store_true", help="Print full plans")
+        parser.add_argument("--strict", action="store_true", help="Exit non-zero if any query scans a table")
+
+    def handle(self, *args, **opts):
+        vendor = connection.vendor
+        flagged = []
+
+        for label, qs in hot_queries():
+            plan = qs.explain(format="JSON") if vendor == "mysql" else qs.explain()
+            scans = full_scans(vendor, plan)
+            if scans:
+                flagged.append(label)
+                self.stdout.write(self.style.WARNING(f"FULL SCAN  {label}  ({', '.join(sorted(set(scans)))})"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"INDEXED    {label}"))
+            if opts["verbose"]:
+                self.stdout.write(plan + "\n")
+
+        if flagged and opts["strict"]:
+            raise CommandError(f"{len(flagged)} quer{'y' if len(flagged) == 1 else 'ies'} fell back to full scans")
@@ -0,0 +1,49 @@
+"""
+Export orders with items/payments as CSV or NDJSON (constant memory).
+
+Usage:
+    python manage.py export_orders --output orders.csv
+    python manage.py export_orders --kind payments --from 2025-01-01 --to 2025-03-31 --output payments.csv
+    python manage.py export_orders --format ndjson --status delivered > orders.ndjson
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from orders.exports import CSV_KINDS, DEFAULT_CHUNK_SIZE, FORMATS, export_lines
+from orders.models import Order
+from orders.pagination import apply_order_filters
+
+
+class Command(BaseCommand):
+    help = "Stream orders (with items and payments) to CSV or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument("--kind", choices=CSV_KINDS, default="orders", help="CSV table (ignored for ndjson)")
+        parser.add_argument("--status", default="", help="Comma separated statuses")
+        parser.add_argument("--from", dest="created_from", default="", help="Created on/after (YYYY-MM-DD)")
+        parser.add_argument("--to", dest="created_to", default="", help="Created on/before (YYYY-MM-DD)")
+        parser.add_argument("--customer", default="", help="Customer id or username")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--output", default="-", help="File path, or - for stdout")
+
+    def handle(self, *args, **opts):
+        params = {k: opts[k] for k in ("status", "created_from", "created_to", "customer")}
+        try:
+            qs = apply_order_filters(Order.objects.all(), params, allow_customer=True)
+            lines = export_lines(qs, opts["format"], opts["kind"], max(1, opts["chunk_size"]))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if opts["output"] == "-":
+            for chunk in lines:
+                sys.stdout.write(chunk)
+            sys.stdout.flush()
+            return
+
+        with open(opts["output"], "w", encoding="utf-8", newline="") as fh:
+            for chunk in lines:
+                fh.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"✅ Exported to {opts['output']}."))
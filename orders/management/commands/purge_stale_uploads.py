@@ -0,0 +1,41 @@
+"""
+Delete chunked uploads nobody has touched for a while, with their .part files,
+plus .part files left without an upload row and staged chunks (.chunk) of
+requests that died mid-body.
+
+Usage:
+    python manage.py purge_stale_uploads
+    python manage.py purge_stale_uploads --hours 6
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from orders.models import OrderUpload
+from orders.uploads import PART_DIR, discard
+
+
+class Command(BaseCommand):
+    help = "Remove abandoned chunked uploads and orphaned part files"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24, help="Idle time before an upload is abandoned")
+
+    def handle(self, *args, **opts):
+        cutoff = timezone.now() - timedelta(hours=max(1, opts["hours"]))
+        stale = 0
+        for upload in OrderUpload.objects.filter(updated_at__lt=cutoff).iterator():
+            discard(upload)
+            stale += 1
+
+        orphans = 0
+        if PART_DIR.exists():
+            live = {f"{pk}.part" for pk in OrderUpload.objects.values_list("pk", flat=True)}
+            for path in [*PART_DIR.glob("*.part"), *PART_DIR.glob("*.chunk")]:
+                if path.name not in live and path.stat().st_mtime < cutoff.timestamp():
+                    path.unlink(missing_ok=True)
+                    orphans += 1
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Removed {stale} stale uploads and {orphans} orphaned part files."))
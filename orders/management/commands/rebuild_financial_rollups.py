@@ -0,0 +1,40 @@
+"""
+Recompute the daily/monthly financial rollups from orders and payments.
+
+Run after backfills, raw SQL edits, or `recompute_order_aggregates` (which can
+change paid totals without going through the incremental path). Writes that
+land while it runs may be missed; schedule it in a quiet period.
+
+Usage:
+    python manage.py rebuild_financial_rollups
+    python manage.py rebuild_financial_rollups --day 2025-03-14 --day 2025-03-15
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from orders.reports import rebuild_rollups, refresh_days
+
+
+class Command(BaseCommand):
+    help = "Rebuild financial report rollups (all, or only the given local days)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--day", action="append", dest="days", help="Only re-derive this day (YYYY-MM-DD)")
+
+    def handle(self, *args, **opts):
+        if opts["days"]:
+            days = [parse_date(d) for d in opts["days"]]
+            if None in days:
+                raise CommandError("Invalid --day (expected YYYY-MM-DD).")
+            refresh_days(days)
+            self.stdout.write(self.style.SUCCESS(f"✅ Refreshed {len(days)} day(s) and their months."))
+            return
+
+        counts = rebuild_rollups(max(1, opts["batch_size"]))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Rebuilt {counts['order_buckets']} order buckets and {counts['payment_buckets']} payment buckets."
+            )
+        )
@@ -0,0 +1,39 @@
+"""
+Rebuild the order search index from orders, items, messages and customers.
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --batch-size 200 --order 42
+"""
+
+from django.core.management.base import BaseCommand
+
+from orders.models import Order
+from orders.search import reindex_orders
+
+
+class Command(BaseCommand):
+    help = "Rebuild the inverted search index in order-id batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--order", type=int, action="append", dest="orders", help="Only these order ids")
+
+    def handle(self, *args, **opts):
+        batch = max(1, opts["batch_size"])
+        qs = Order.objects.order_by("id")
+        if opts["orders"]:
+            qs = qs.filter(id__in=opts["orders"])
+
+        done = terms = 0
+        last_id = 0
+        while True:
+            ids = list(qs.filter(id__gt=last_id).values_list("id", flat=True)[:batch])
+            if not ids:
+                break
+            terms += reindex_orders(ids)
+            done += len(ids)
+            last_id = ids[-1]
+            self.stdout.write(f"... {done} orders")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Indexed {done} orders ({terms} terms)."))
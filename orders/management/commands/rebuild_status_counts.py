@@ -0,0 +1,20 @@
+"""
+Recompute dashboard status counters from the orders table.
+
+Usage:
+    python manage.py rebuild_status_counts
+"""
+
+from django.core.management.base import BaseCommand
+
+from orders.rollups import rebuild_status_counts
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-status order counters (fixes drift after bulk/raw edits)"
+
+    def handle(self, *args, **kwargs):
+        counts = rebuild_status_counts()
+        for status, n in counts.items():
+            self.stdout.write(f"{status:<12} {n}")
+        self.stdout.write(self.style.SUCCESS("✅ Status counters rebuilt."))
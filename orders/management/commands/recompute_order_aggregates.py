@@ -0,0 +1,39 @@
+"""
+Rebuild denormalized Order aggregates (total_qty, item_count, paid_total,
+message_count, last_message_at) from child rows, in id batches.
+
+Usage:
+    python manage.py recompute_order_aggregates
+    python manage.py recompute_order_aggregates --batch-size 2000 --order 42 --order 43
+"""
+
+from django.core.management.base import BaseCommand
+
+from orders.aggregates import recompute_orders
+from orders.models import Order
+
+
+class Command(BaseCommand):
+    help = "Recompute per-order aggregate columns in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--order", type=int, action="append", dest="orders", help="Only these order ids")
+
+    def handle(self, *args, **opts):
+        batch = max(1, opts["batch_size"])
+        qs = Order.objects.order_by("id")
+        if opts["orders"]:
+            qs = qs.filter(id__in=opts["orders"])
+
+        done = 0
+        last_id = 0
+        while True:
+            ids = list(qs.filter(id__gt=last_id).values_list("id", flat=True)[:batch])
+            if not ids:
+                break
+            done += recompute_orders(ids)
+            last_id = ids[-1]
+            self.stdout.write(f"... {done} orders")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Recomputed aggregates for {done} orders."))
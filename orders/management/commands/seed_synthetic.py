@@ -0,0 +1,343 @@
+"""
+Generate production-scale synthetic data (Persian text) for load tests and
+benchmarks.
+
+Creates `syn_*` customers and staff, orders spread over every OrderStatus and
+the last --days days, items, customer/staff messages and internal notes,
+payments, and each order's status history along the usual lifecycle. Rows are
+written with bulk_create in batches, then the derived tables are rebuilt the
+same way the maintenance commands do: order aggregates, status counters,
+financial rollups and the search index.
+
+Staff users join the seeded roles (run seed_roles first to get permissions).
+The same --seed produces the same data (dates are relative to now).
+
+Usage:
+    python manage.py seed_synthetic
+    python manage.py seed_synthetic --customers 2000 --orders 50000 --seed 7
+    python manage.py seed_synthetic --purge            # delete all syn_* users and their orders
+"""
+
+import random
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from orders import marquee
+from orders.aggregates import recompute_orders
+from orders.models import Order, OrderItem, OrderMessage, OrderStatus, OrderStatusEvent, Payment
+from orders.permissions import invalidate_permission_snapshots
+from orders.reports import rebuild_rollups
+from orders.rollups import rebuild_status_counts
+from orders.search import reindex_orders
+
+PREFIX = "syn_"
+PASSWORD = "synthetic-pass"
+
+# Share of orders per status (roughly a workshop's steady state).
+STATUS_WEIGHTS = {
+    OrderStatus.NEW: 8,
+    OrderStatus.REVIEW: 7,
+    OrderStatus.QUOTED: 10,
+    OrderStatus.CONFIRMED: 10,
+    OrderStatus.PRODUCTION: 15,
+    OrderStatus.READY: 8,
+    OrderStatus.DELIVERED: 35,
+    OrderStatus.CANCELED: 7,
+}
+PRICED = {
+    OrderStatus.QUOTED, OrderStatus.CONFIRMED, OrderStatus.PRODUCTION,
+    OrderStatus.READY, OrderStatus.DELIVERED, OrderStatus.CANCELED,
+}
+DEPOSIT_PAID = {OrderStatus.CONFIRMED, OrderStatus.PRODUCTION, OrderStatus.READY, OrderStatus.DELIVERED}
+# Status history path to each status (canceled orders leave from an earlier stage).
+LIFECYCLE = [
+    OrderStatus.NEW, OrderStatus.REVIEW, OrderStatus.QUOTED, OrderStatus.CONFIRMED,
+    OrderStatus.PRODUCTION, OrderStatus.READY, OrderStatus.DELIVERED,
+]
+
+PRODUCTS = ["پیراهن", "شلوار", "مانتو", "روپوش", "کاپشن", "جلیقه", "تی‌شرت", "لباس فرم", "پیش‌بند", "کت"]
+FABRICS = ["کتان", "جین", "لینن", "پلی‌استر", "فاستونی", "کرپ", "مخمل", "ویسکوز", "نخ پنبه"]
+SIZES = ["S-XL", "M-XXL", "36-44", "38-48", "فری‌سایز", "2-12 سال"]
+CLIENTS = ["مدرسه", "بیمارستان", "رستوران", "شرکت", "هتل", "باشگاه", "فروشگاه", "کارخانه"]
+PLACES = ["تهران", "اصفهان", "شیراز", "تبریز", "مشهد", "کرج", "قم", "رشت"]
+NOTES = [
+    "دکمه‌های فلزی", "جیب روی سینه", "آرم گلدوزی شده", "دوخت دوبل", "یقه انگلیسی",
+    "آستین کوتاه", "زیپ مخفی", "رنگ سرمه‌ای", "بسته‌بندی جداگانه", "",
+]
+CUSTOMER_MESSAGES = [
+    "سلام، زمان تحویل را اعلام کنید.", "لطفا نمونه پارچه را ارسال کنید.",
+    "تعداد را {n} عدد افزایش دهید.", "آیا امکان تحویل زودتر وجود دارد؟",
+    "رسید واریز بیعانه ارسال شد.", "سایزبندی را اصلاح کردم.", "رنگ را به مشکی تغییر دهید.",
+]
+STAFF_MESSAGES = [
+    "پیش‌فاکتور برای شما صادر شد.", "پارچه سفارش داده شد.", "سفارش وارد خط تولید شد.",
+    "نمونه اولیه آماده است.", "لطفا مبلغ بیعانه را واریز کنید.", "سفارش آماده تحویل است.",
+]
+INTERNAL_NOTES = [
+    "مشتری قدیمی؛ تخفیف ۵٪", "موجودی پارچه کافی نیست", "اولویت بالا", "برش انجام شد",
+    "کنترل کیفیت تایید شد", "پیگیری تلفنی شود",
+]
+PAYMENT_METHODS = ["card", "card", "transfer", "cash", "pos"]
+
+
+@contextmanager
+def _explicit_dates(*models):
+    """Let bulk_create keep the backdated created_at/updated_at set on the instances."""
+    fields = [
+        f for model in models for f in model._meta.concrete_fields
+        if getattr(f, "auto_now", False) or getattr(f, "auto_now_add", False)
+    ]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, auto_now, auto_now_add in saved:
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate synthetic customers, orders, items, messages and payments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--customers", type=int, default=200)
+        parser.add_argument("--orders", type=int, default=5000, help="Total orders (spread over customers)")
+        parser.add_argument("--staff", type=int, default=5)
+        parser.add_argument("--max-items", type=int, default=6)
+        parser.add_argument("--max-messages", type=int, default=20)
+        parser.add_argument("--days", type=int, default=365, help="Spread created_at over the last N days")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--purge", action="store_true", help="Delete previously seeded syn_* data and exit")
+
+    def handle(self, *args, **opts):
+        if opts["purge"]:
+            self._purge()
+            return
+        if opts["customers"] < 1 or opts["orders"] < 0 or opts["staff"] < 1:
+            raise CommandError("--customers and --staff must be >= 1, --orders >= 0.")
+
+        self.rng = random.Random(opts["seed"])
+        self.now = timezone.now()
+        self.run = uuid.uuid4().hex[:8]
+
+        customers, staff = self._users(opts["customers"], opts["staff"])
+        self.stdout.write(f"users: {len(customers)} customers, {len(staff)} staff")
+
+        batch = max(1, opts["batch_size"])
+        order_ids = []
+        remaining = opts["orders"]
+        while remaining > 0:
+            n = min(batch, remaining)
+            with transaction.atomic():
+                order_ids += self._order_batch(n, customers, staff, opts)
+            remaining -= n
+            self.stdout.write(f"... {len(order_ids)} orders")
+
+        self.stdout.write("rebuilding derived tables ...")
+        for start in range(0, len(order_ids), batch):
+            recompute_orders(order_ids[start:start + batch])
+            reindex_orders(order_ids[start:start + batch])
+        rebuild_status_counts()
+        rebuild_rollups()
+        marquee.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Seeded {len(order_ids)} orders for {len(customers)} customers "
+            f"(login: {PREFIX}c1 / {PREFIX}staff1, password: {PASSWORD})."
+        ))
+
+    # -----------------------
+    # Users
+    # -----------------------
+
+    def _users(self, n_customers: int, n_staff: int):
+        """Create missing syn_* users (idempotent by username); return (customer ids, staff ids)."""
+        User = get_user_model()
+        password = make_password(PASSWORD)  # hash once, not per user
+        wanted = [f"{PREFIX}c{i}" for i in range(1, n_customers + 1)]
+        wanted_staff = [f"{PREFIX}staff{i}" for i in range(1, n_staff + 1)]
+
+        existing = set(User.objects.filter(username__in=wanted + wanted_staff).values_list("username", flat=True))
+        new = [
+            User(
+                username=name,
+                password=password,
+                first_name=self.rng.choice(CLIENTS),
+                last_name=self.rng.choice(PLACES),
+                phone=f"0912{self.rng.randrange(10**7):07d}",
+            )
+            for name in wanted + wanted_staff
+            if name not in existing
+        ]
+        User.objects.bulk_create(new, batch_size=1000)
+
+        ids = dict(User.objects.filter(username__in=wanted + wanted_staff).values_list("username", "id"))
+        staff = [ids[name] for name in wanted_staff]
+        roles = list(Group.objects.order_by("name"))
+        if roles:
+            through = User.groups.through
+            through.objects.bulk_create(
+                [through(user_id=uid, group_id=roles[i % len(roles)].id) for i, uid in enumerate(staff)],
+                ignore_conflicts=True,
+            )
+            invalidate_permission_snapshots()  # bulk_create sends no m2m_changed
+        else:
+            self.stdout.write(self.style.WARNING("No roles found; run seed_roles so syn_staff* get permissions."))
+        return [ids[name] for name in wanted], staff
+
+    def _purge(self):
+        User = get_user_model()
+        users = User.objects.filter(username__startswith=PREFIX)
+        orders = Order.objects.filter(customer__in=users)
+        n_orders = orders.count()
+        with transaction.atomic():
+            orders.delete()
+            users.delete()
+        rebuild_status_counts()
+        rebuild_rollups()
+        marquee.invalidate()
+        self.stdout.write(self.style.SUCCESS(f"✅ Purged {n_orders} orders and the {PREFIX}* users."))
+
+    # -----------------------
+    # Orders and children
+    # -----------------------
+
+    def _order_batch(self, n: int, customers, staff, opts) -> list:
+        rng = self.rng
+        statuses = list(STATUS_WEIGHTS)
+        weights = list(STATUS_WEIGHTS.values())
+
+        orders = []
+        for _ in range(n):
+            status = rng.choices(statuses, weights)[0]
+            created = self.now - timedelta(days=rng.random() * opts["days"])
+            total = rng.randrange(50, 3000) * 100_000 if status in PRICED else 0
+            order = Order(
+                customer_id=rng.choice(customers),
+                title=f"{rng.choice(PRODUCTS)} {rng.choice(CLIENTS)} {rng.choice(PLACES)}",
+                status=status,
+                total_price=total,
+                deposit_amount=total * rng.choice((20, 30, 50)) // 100,
+                deadline_date=(created + timedelta(days=rng.randrange(7, 60))).date(),
+                assigned_to_id=rng.choice(staff) if status not in (OrderStatus.NEW, OrderStatus.REVIEW) else None,
+                # unique per order: lets us read back ids on backends without bulk RETURNING (MySQL)
+                idempotency_key=f"seed-{self.run}-{uuid.uuid4().hex[:16]}",
+            )
+            order.created_at = order.updated_at = created
+            orders.append(order)
+
+        with _explicit_dates(Order, OrderMessage, Payment):
+            Order.objects.bulk_create(orders)
+            self._children(orders, staff, opts)
+        return [o.pk for o in orders]
+
+    def _children(self, orders, staff, opts) -> None:
+        if orders[0].pk is None:
+            ids = dict(
+                Order.objects.filter(idempotency_key__in=[o.idempotency_key for o in orders])
+                .values_list("idempotency_key", "id")
+            )
+            for o in orders:
+                o.pk = ids[o.idempotency_key]
+
+        items, messages, payments, events = [], [], [], []
+        for o in orders:
+            items += self._items(o, opts["max_items"])
+            messages += self._messages(o, staff, opts["max_messages"])
+            payments += self._payments(o)
+            events += self._status_events(o, staff)
+
+        OrderItem.objects.bulk_create(items, batch_size=1000)
+        OrderMessage.objects.bulk_create(messages, batch_size=1000)
+        Payment.objects.bulk_create(payments, batch_size=1000)
+        OrderStatusEvent.objects.bulk_create(events, batch_size=1000)
+
+    def _items(self, order, max_items: int) -> list:
+        rng = self.rng
+        return [
+            OrderItem(
+                order_id=order.pk,
+                product_type=rng.choice(PRODUCTS),
+                qty=rng.choice((10, 20, 25, 30, 50, 100, 120, 200, 500)),
+                size_range=rng.choice(SIZES),
+                fabric_type=rng.choice(FABRICS),
+                notes=rng.choice(NOTES),
+            )
+            for _ in range(rng.randint(1, max(1, max_items)))
+        ]
+
+    def _messages(self, order, staff, max_messages: int) -> list:
+        rng = self.rng
+        span = max(60.0, (self.now - order.created_at).total_seconds())
+        rows = []
+        for _ in range(rng.randint(0, max(0, max_messages))):
+            kind = rng.random()
+            if kind < 0.45:
+                sender, internal = order.customer_id, False
+                text = rng.choice(CUSTOMER_MESSAGES).format(n=rng.choice((10, 20, 50)))
+            elif kind < 0.8:
+                sender, internal, text = rng.choice(staff), False, rng.choice(STAFF_MESSAGES)
+            else:
+                sender, internal, text = rng.choice(staff), True, rng.choice(INTERNAL_NOTES)
+            rows.append(OrderMessage(
+                order_id=order.pk, sender_id=sender, message=text, is_internal=internal,
+                created_at=order.created_at + timedelta(seconds=rng.random() * span),
+            ))
+        rows.sort(key=lambda m: m.created_at)
+        return rows
+
+    def _status_events(self, order, staff) -> list:
+        rng = self.rng
+        if order.status == OrderStatus.CANCELED:
+            path = LIFECYCLE[:rng.randint(1, 5)] + [OrderStatus.CANCELED]
+        else:
+            path = LIFECYCLE[:LIFECYCLE.index(order.status) + 1]
+        span = max(60.0, (self.now - order.created_at).total_seconds())
+        times = [order.created_at] + sorted(
+            order.created_at + timedelta(seconds=rng.random() * span) for _ in path[1:]
+        )
+        return [
+            OrderStatusEvent(
+                order_id=order.pk, from_status=old, to_status=new, created_at=at,
+                actor_id=rng.choice(staff) if old else order.customer_id,
+            )
+            for old, new, at in zip([""] + path, path, times)
+        ]
+
+    def _payments(self, order) -> list:
+        rng = self.rng
+        if not order.total_price:
+            return []
+        rows = []
+
+        def add(amount, status):
+            paid_at = order.created_at + timedelta(days=rng.random() * 20)
+            paid_at = min(paid_at, self.now)
+            rows.append(Payment(
+                order_id=order.pk, amount=amount, method=rng.choice(PAYMENT_METHODS), status=status,
+                ref_code=f"{rng.randrange(10**9):09d}",
+                paid_at=paid_at if status == Payment.PaymentStatus.PAID else None,
+                created_at=paid_at,
+            ))
+
+        if rng.random() < 0.1:
+            add(order.deposit_amount, Payment.PaymentStatus.FAILED)
+        if order.status in DEPOSIT_PAID:
+            add(order.deposit_amount, Payment.PaymentStatus.PAID)
+            if order.status == OrderStatus.DELIVERED:
+                add(order.total_price - order.deposit_amount, Payment.PaymentStatus.PAID)
+        elif order.status == OrderStatus.QUOTED and rng.random() < 0.5:
+            add(order.deposit_amount, Payment.PaymentStatus.PENDING)
+        elif order.status == OrderStatus.CANCELED and rng.random() < 0.3:
+            add(order.deposit_amount, Payment.PaymentStatus.REFUNDED)
+        return rows
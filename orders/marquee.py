@@ -0,0 +1,75 @@
+"""
+Home page "latest orders" marquee, precomputed.
+
+- snapshot(): the latest MARQUEE_SIZE orders as plain dicts (padded with sample
+  slides), cached under a version key so anonymous home hits don't query orders
+- home.html caches the rendered slide markup per version ({% cache %}), so a
+  warm hit needs neither the snapshot nor any rendering of the slides
+- invalidate() bumps the version after commit; write paths call it when an
+  order is created, deleted or changes status (or is edited in admin).
+  Old entries are never read again and simply expire.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.utils import OperationalError, ProgrammingError
+
+from .models import Order, OrderStatus
+
+MARQUEE_SIZE = 10
+SNAPSHOT_SECONDS = getattr(settings, "MARQUEE_SNAPSHOT_SECONDS", 3600)
+_VERSION_KEY = "marquee:version"
+
+
+def _sample(i: int) -> dict:
+    return {"kind": "sample", "id": f"نمونه {i + 1}", "title": "نمونه سفارش سری‌دوزی", "status": "نمونه", "qty": 120}
+
+
+def version() -> int:
+    value = cache.get(_VERSION_KEY)
+    if value is None:
+        cache.add(_VERSION_KEY, 1, None)
+        value = cache.get(_VERSION_KEY, 1)
+    return value
+
+
+def _build() -> list:
+    """Slides for the latest orders (one query, no joins), padded with samples."""
+    rows = Order.objects.order_by("-created_at").values(
+        "id", "title", "status", "total_qty", "deadline_date", "created_at"
+    )[:MARQUEE_SIZE]
+    labels = dict(OrderStatus.choices)
+    slides = [
+        {"kind": "order", **row, "status_label": labels.get(row["status"], row["status"])}
+        for row in rows
+    ]
+    return slides + [_sample(i) for i in range(MARQUEE_SIZE - len(slides))]
+
+
+def snapshot(at_version: int = None) -> list:
+    """Cached slides for the given (default: current) version."""
+    key = f"marquee:{at_version or version()}"
+    slides = cache.get(key)
+    if slides is None:
+        try:
+            slides = _build()
+        except (ProgrammingError, OperationalError):
+            # DB not ready (fresh deploy): samples only, not cached
+            return [_sample(i) for i in range(MARQUEE_SIZE)]
+        cache.set(key, slides, SNAPSHOT_SECONDS)
+    return slides
+
+
+def _bump() -> None:
+    if cache.add(_VERSION_KEY, 2, None):
+        return
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:  # evicted between add() and incr()
+        cache.add(_VERSION_KEY, 2, None)
+
+
+def invalidate() -> None:
+    """Drop the snapshot and cached slide markup once the current transaction commits."""
+    transaction.on_commit(_bump)
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:55
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['created_at'], name='order_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'created_at'], name='order_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', 'created_at'], name='order_customer_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['deadline_date'], name='order_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ordermessage',
+            index=models.Index(fields=['order', 'is_internal', 'created_at'], name='msg_order_internal_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ordermessage',
+            index=models.Index(fields=['order', 'created_at'], name='msg_order_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['order', 'created_at'], name='payment_order_created_idx'),
+        ),
+    ]
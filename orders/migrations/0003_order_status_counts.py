@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:56
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_status_counts(apps, schema_editor):
+    """Seed one counter row per status from a single GROUP BY."""
+    Order = apps.get_model("orders", "Order")
+    OrderStatusCount = apps.get_model("orders", "OrderStatusCount")
+    grouped = dict(Order.objects.order_by().values_list("status").annotate(n=Count("id")))
+    statuses = [c[0] for c in OrderStatusCount._meta.get_field("status").choices]
+    OrderStatusCount.objects.bulk_create(
+        [OrderStatusCount(status=s, count=grouped.get(s, 0)) for s in statuses]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_access_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusCount',
+            fields=[
+                ('status', models.CharField(choices=[('new', 'جدید'), ('review', 'در حال بررسی'), ('quoted', 'پیش\u200cفاکتور صادر شد'), ('confirmed', 'تأیید شد'), ('production', 'در حال تولید'), ('ready', 'آماده تحویل'), ('delivered', 'تحویل شد'), ('canceled', 'لغو شد')], max_length=20, primary_key=True, serialize=False)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_status_counts, migrations.RunPython.noop),
+    ]
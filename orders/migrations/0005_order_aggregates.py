@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:59
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+BATCH_SIZE = 1000
+
+
+def backfill_aggregates(apps, schema_editor):
+    """Fill the new columns from child rows, in id batches."""
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+    OrderMessage = apps.get_model("orders", "OrderMessage")
+    Payment = apps.get_model("orders", "Payment")
+
+    def sub(qs, expr):
+        return Subquery(qs.filter(order=OuterRef("pk")).order_by().values("order").annotate(v=expr).values("v")[:1])
+
+    ids = list(Order.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(ids), BATCH_SIZE):
+        Order.objects.filter(id__in=ids[start:start + BATCH_SIZE]).update(
+            total_qty=Coalesce(sub(OrderItem.objects, Sum("qty")), 0),
+            item_count=Coalesce(sub(OrderItem.objects, Count("id")), 0),
+            paid_total=Coalesce(sub(Payment.objects.filter(status="paid"), Sum("amount")), 0),
+            message_count=Coalesce(sub(OrderMessage.objects, Count("id")), 0),
+            last_message_at=sub(OrderMessage.objects, Max("created_at")),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='message_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='paid_total',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='total_qty',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
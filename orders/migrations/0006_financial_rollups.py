@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:12
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.utils import timezone
+
+FIGURES = ("orders", "billed", "deposits_due", "deposits_collected", "paid", "outstanding")
+
+
+def _rows(model, fields, batch=2000):
+    last_id = 0
+    while True:
+        rows = list(model.objects.filter(id__gt=last_id).order_by("id").values("id", *fields)[:batch])
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1]["id"]
+
+
+def backfill_rollups(apps, schema_editor):
+    """Seed day + month buckets from existing orders/payments (id batches, bounded memory)."""
+    Order = apps.get_model("orders", "Order")
+    Payment = apps.get_model("orders", "Payment")
+    OrderRollup = apps.get_model("orders", "OrderRollup")
+    PaymentRollup = apps.get_model("orders", "PaymentRollup")
+
+    orders = defaultdict(lambda: dict.fromkeys(FIGURES, 0))
+    for o in _rows(Order, ("created_at", "total_price", "deposit_amount", "paid_total")):
+        day = timezone.localdate(o["created_at"])
+        total, deposit, paid = o["total_price"], o["deposit_amount"], o["paid_total"]
+        for key in (("day", day), ("month", day.replace(day=1))):
+            b = orders[key]
+            b["orders"] += 1
+            b["billed"] += total
+            b["deposits_due"] += deposit
+            b["deposits_collected"] += min(paid, deposit)
+            b["paid"] += paid
+            b["outstanding"] += max(0, total - paid)
+
+    payments = defaultdict(lambda: [0, 0])
+    for p in _rows(Payment, ("created_at", "method", "status", "amount")):
+        day = timezone.localdate(p["created_at"])
+        for period, start in (("day", day), ("month", day.replace(day=1))):
+            b = payments[(period, start, p["method"], p["status"])]
+            b[0] += 1
+            b[1] += p["amount"]
+
+    OrderRollup.objects.bulk_create(
+        [OrderRollup(period=p, start=s, **f) for (p, s), f in orders.items()], batch_size=1000
+    )
+    PaymentRollup.objects.bulk_create(
+        [
+            PaymentRollup(period=p, start=s, method=m, status=st, count=n, amount=a)
+            for (p, s, m, st), (n, a) in payments.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_order_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'روزانه'), ('month', 'ماهانه')], max_length=5)),
+                ('start', models.DateField()),
+                ('orders', models.IntegerField(default=0)),
+                ('billed', models.BigIntegerField(default=0)),
+                ('deposits_due', models.BigIntegerField(default=0)),
+                ('deposits_collected', models.BigIntegerField(default=0)),
+                ('paid', models.BigIntegerField(default=0)),
+                ('outstanding', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('period', 'start'), name='order_rollup_bucket_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PaymentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'روزانه'), ('month', 'ماهانه')], max_length=5)),
+                ('start', models.DateField()),
+                ('method', models.CharField(max_length=30)),
+                ('status', models.CharField(choices=[('pending', 'در انتظار'), ('paid', 'پرداخت شده'), ('failed', 'ناموفق'), ('refunded', 'برگشت خورده')], max_length=15)),
+                ('count', models.IntegerField(default=0)),
+                ('amount', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('period', 'start', 'method', 'status'), name='payment_rollup_bucket_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:14
+
+import re
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of orders.search as of this migration (weights, normalizer,
+# tokenizer): later changes to search.py must not change what this produces.
+# After such a change, run `manage.py rebuild_search_index`.
+WEIGHT_TITLE = 8
+WEIGHT_CUSTOMER = 6
+WEIGHT_ITEM = 4
+WEIGHT_TEXT = 1
+MAX_WEIGHT = 1000
+MAX_TERM_LENGTH = 64
+
+_CHAR_MAP = str.maketrans(
+    {
+        "ي": "ی", "ى": "ی", "ئ": "ی",
+        "ك": "ک",
+        "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+        "ؤ": "و",
+        "ة": "ه", "ۀ": "ه",
+        "\u200c": None,
+        "\u200d": None,
+        "\u0640": None,
+        **{chr(c): None for c in range(0x064B, 0x0660)},
+        "\u0670": None,
+        **{chr(0x06F0 + i): str(i) for i in range(10)},
+        **{chr(0x0660 + i): str(i) for i in range(10)},
+    }
+)
+_TOKEN = re.compile(r"\w+")
+
+
+def weigh(*parts) -> Counter:
+    """Term -> weight for (text, weight) pairs."""
+    weights = Counter()
+    for text, weight in parts:
+        for term in _TOKEN.findall((text or "").translate(_CHAR_MAP).casefold()):
+            if len(term) > 1 or term.isdigit():
+                weights[term[:MAX_TERM_LENGTH]] += weight
+    return weights
+
+
+def backfill_search_index(apps, schema_editor):
+    """Index existing orders in id batches (same weights as search.reindex_orders at the time)."""
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+    OrderMessage = apps.get_model("orders", "OrderMessage")
+    OrderSearchTerm = apps.get_model("orders", "OrderSearchTerm")
+
+    last_id = 0
+    while True:
+        orders = list(
+            Order.objects.filter(id__gt=last_id).order_by("id")
+            .values("id", "title", "customer__username", "customer__phone")[:500]
+        )
+        if not orders:
+            return
+        last_id = orders[-1]["id"]
+        ids = [o["id"] for o in orders]
+
+        parts = {o["id"]: [
+            (o["title"], WEIGHT_TITLE),
+            (o["customer__username"], WEIGHT_CUSTOMER),
+            (o["customer__phone"], WEIGHT_CUSTOMER),
+        ] for o in orders}
+        for i in OrderItem.objects.filter(order_id__in=ids).values("order_id", "product_type", "fabric_type", "notes"):
+            parts[i["order_id"]] += [
+                (i["product_type"], WEIGHT_ITEM),
+                (i["fabric_type"], WEIGHT_ITEM),
+                (i["notes"], WEIGHT_TEXT),
+            ]
+        messages = (
+            OrderMessage.objects.filter(order_id__in=ids)
+            .exclude(is_internal=True, message__startswith="Status changed to:")
+            .values_list("order_id", "message")
+        )
+        for order_id, text in messages:
+            parts[order_id].append((text, WEIGHT_TEXT))
+
+        OrderSearchTerm.objects.bulk_create(
+            [
+                OrderSearchTerm(order_id=order_id, term=t, weight=min(w, MAX_WEIGHT))
+                for order_id, texts in parts.items()
+                for t, w in weigh(*texts).items()
+            ],
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_financial_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=0)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_terms', to='orders.order')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('term', 'order'), name='search_term_order_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
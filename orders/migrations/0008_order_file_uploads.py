@@ -0,0 +1,108 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:22
+
+import django.db.models.deletion
+import hashlib
+import os
+import uuid
+import zlib
+from django.conf import settings
+from django.db import migrations, models
+
+CHUNK = 64 * 1024
+
+
+def digest(f):
+    """(sha256 hex, crc32, size) of an open binary file in one pass (frozen copy of uploads.digest)."""
+    sha = hashlib.sha256()
+    crc = size = 0
+    while piece := f.read(CHUNK):
+        sha.update(piece)
+        crc = zlib.crc32(piece, crc)
+        size += len(piece)
+    return sha.hexdigest(), crc, size
+
+
+def backfill_file_digests(apps, schema_editor):
+    """Hash existing files in id batches; rows whose file is missing on disk keep empty values."""
+    OrderFile = apps.get_model("orders", "OrderFile")
+    storage = OrderFile._meta.get_field("file").storage
+
+    last_id = 0
+    while True:
+        rows = list(OrderFile.objects.filter(id__gt=last_id).order_by("id")[:200])
+        if not rows:
+            return
+        last_id = rows[-1].id
+        for row in rows:
+            if not row.file or not storage.exists(row.file.name):
+                continue
+            with storage.open(row.file.name, "rb") as f:
+                row.sha256, row.crc32, row.size = digest(f)
+            row.original_name = os.path.basename(row.file.name)[:255]
+        OrderFile.objects.bulk_update(rows, ["sha256", "crc32", "size", "original_name"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_order_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255)),
+                ('type', models.CharField(choices=[('pattern', 'الگو'), ('sample', 'نمونه'), ('reference', 'مرجع'), ('invoice', 'فاکتور'), ('other', 'سایر')], default='other', max_length=20)),
+                ('size', models.PositiveBigIntegerField()),
+                ('received', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='orderfile',
+            name='crc32',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='orderfile',
+            name='original_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='orderfile',
+            name='sha256',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='orderfile',
+            name='size',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='orderfile',
+            index=models.Index(fields=['sha256'], name='orderfile_sha256_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderfile',
+            index=models.Index(fields=['order', 'created_at'], name='orderfile_order_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='orderupload',
+            name='order',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='orders.order'),
+        ),
+        migrations.AddField(
+            model_name='orderupload',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='orderupload',
+            index=models.Index(fields=['updated_at'], name='upload_updated_idx'),
+        ),
+        migrations.RunPython(backfill_file_digests, migrations.RunPython.noop),
+    ]
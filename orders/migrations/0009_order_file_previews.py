@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:26
+
+from django.db import migrations, models
+from django.db.models import Q
+
+
+def queue_existing_images(apps, schema_editor):
+    """Mark stored images pending; `manage.py build_thumbnails` then builds them."""
+    OrderFile = apps.get_model("orders", "OrderFile")
+    images = Q(file__iendswith=".png") | Q(file__iendswith=".jpg") | Q(file__iendswith=".jpeg")
+    OrderFile.objects.filter(images).update(preview_status="pending")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_file_uploads'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderfile',
+            name='preview_status',
+            field=models.CharField(blank=True, choices=[('', 'بدون پیش\u200cنمایش'), ('pending', 'در صف'), ('ready', 'آماده'), ('failed', 'ناموفق')], default='', max_length=10),
+        ),
+        migrations.RunPython(queue_existing_images, migrations.RunPython.noop),
+    ]
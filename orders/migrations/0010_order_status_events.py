@@ -0,0 +1,166 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:47
+
+from collections import defaultdict
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Count, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+AUDIT_PREFIX = "Status changed to:"
+
+# Frozen copy of orders.models.OrderStatus (value, label) as of this migration:
+# the audit notes carry these labels, whatever the model says later.
+STATUS_CHOICES = (
+    ("new", "جدید"),
+    ("review", "در حال بررسی"),
+    ("quoted", "پیش\u200cفاکتور صادر شد"),
+    ("confirmed", "تأیید شد"),
+    ("production", "در حال تولید"),
+    ("ready", "آماده تحویل"),
+    ("delivered", "تحویل شد"),
+    ("canceled", "لغو شد"),
+)
+STATUS_NEW = "new"
+
+
+def _recount_messages(Order, OrderMessage, order_ids):
+    """message_count / last_message_at from the remaining thread (as aggregates.recompute_orders)."""
+    thread = OrderMessage.objects.filter(order=OuterRef("pk")).order_by().values("order")
+    Order.objects.filter(id__in=order_ids).update(
+        message_count=Coalesce(Subquery(thread.annotate(v=Count("id")).values("v")[:1]), 0),
+        last_message_at=Subquery(thread.annotate(v=Max("created_at")).values("v")[:1]),
+    )
+
+
+def backfill_status_events(apps, schema_editor):
+    """
+    Per order, in id batches: a creation event (new, by the customer), then one
+    event per "Status changed to: <label>" audit note (from = the previous
+    status). Status edits made in the Django admin never left a note, so when
+    the history doesn't end in the order's current status a closing event is
+    added at updated_at. The notes that became events are then deleted from
+    the thread (the reverse writes them back) and the orders' message
+    aggregates recounted; notes with an unknown label or no status change stay.
+    """
+    Order = apps.get_model("orders", "Order")
+    OrderMessage = apps.get_model("orders", "OrderMessage")
+    OrderStatusEvent = apps.get_model("orders", "OrderStatusEvent")
+    by_label = {label: value for value, label in STATUS_CHOICES}
+
+    last_id = 0
+    while True:
+        orders = list(
+            Order.objects.filter(id__gt=last_id).order_by("id")
+            .values("id", "customer_id", "status", "created_at", "updated_at")[:500]
+        )
+        if not orders:
+            return
+        last_id = orders[-1]["id"]
+
+        notes = OrderMessage.objects.filter(
+            order_id__in=[o["id"] for o in orders], is_internal=True, message__startswith=AUDIT_PREFIX
+        )
+        history = defaultdict(list)
+        for n in notes.order_by("order_id", "created_at", "id").values(
+            "id", "order_id", "sender_id", "message", "created_at"
+        ):
+            history[n["order_id"]].append(n)
+
+        events = []
+        moved = []
+        for o in orders:
+            current, at = STATUS_NEW, o["created_at"]
+            events.append(OrderStatusEvent(
+                order_id=o["id"], from_status="", to_status=current, actor_id=o["customer_id"], created_at=at,
+            ))
+            for n in history[o["id"]]:
+                new = by_label.get(n["message"][len(AUDIT_PREFIX):].strip())
+                if new is None or new == current:
+                    continue
+                events.append(OrderStatusEvent(
+                    order_id=o["id"], from_status=current, to_status=new, actor_id=n["sender_id"],
+                    created_at=n["created_at"],
+                ))
+                moved.append(n["id"])
+                current, at = new, n["created_at"]
+            if current != o["status"]:
+                events.append(OrderStatusEvent(
+                    order_id=o["id"], from_status=current, to_status=o["status"], created_at=max(at, o["updated_at"]),
+                ))
+        OrderStatusEvent.objects.bulk_create(events, batch_size=1000)
+
+        if moved:
+            OrderMessage.objects.filter(id__in=moved).delete()
+            _recount_messages(Order, OrderMessage, list(history))
+
+
+def restore_audit_notes(apps, schema_editor):
+    """
+    Reverse: put the transitions back into the thread as internal audit notes.
+    created_at is auto_now_add, so each batch is inserted first and its rows
+    then get the events' times with an explicit UPDATE (matched in id order:
+    nothing else writes audit notes once this migration has run).
+    """
+    Order = apps.get_model("orders", "Order")
+    OrderMessage = apps.get_model("orders", "OrderMessage")
+    OrderStatusEvent = apps.get_model("orders", "OrderStatusEvent")
+    labels = dict(STATUS_CHOICES)
+
+    last_id = 0
+    while True:
+        events = list(
+            OrderStatusEvent.objects.filter(id__gt=last_id).exclude(from_status="").order_by("id")
+            .values("id", "order_id", "to_status", "actor_id", "created_at")[:1000]
+        )
+        if not events:
+            return
+        last_id = events[-1]["id"]
+
+        before = OrderMessage.objects.aggregate(m=Max("id"))["m"] or 0
+        OrderMessage.objects.bulk_create([
+            OrderMessage(
+                order_id=e["order_id"], sender_id=e["actor_id"], is_internal=True,
+                message=f"{AUDIT_PREFIX} {labels.get(e['to_status'], e['to_status'])}",
+            )
+            for e in events
+        ])
+        restored = list(
+            OrderMessage.objects.filter(id__gt=before, is_internal=True, message__startswith=AUDIT_PREFIX)
+            .order_by("id").values_list("id", flat=True)
+        )
+        OrderMessage.objects.filter(id__in=restored).update(
+            created_at=Case(
+                *[When(id=pk, then=Value(e["created_at"])) for pk, e in zip(restored, events)],
+                output_field=models.DateTimeField(),
+            )
+        )
+        _recount_messages(Order, OrderMessage, {e["order_id"] for e in events})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0009_order_file_previews'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, choices=[('new', 'جدید'), ('review', 'در حال بررسی'), ('quoted', 'پیش\u200cفاکتور صادر شد'), ('confirmed', 'تأیید شد'), ('production', 'در حال تولید'), ('ready', 'آماده تحویل'), ('delivered', 'تحویل شد'), ('canceled', 'لغو شد')], max_length=20)),
+                ('to_status', models.CharField(choices=[('new', 'جدید'), ('review', 'در حال بررسی'), ('quoted', 'پیش\u200cفاکتور صادر شد'), ('confirmed', 'تأیید شد'), ('production', 'در حال تولید'), ('ready', 'آماده تحویل'), ('delivered', 'تحویل شد'), ('canceled', 'لغو شد')], max_length=20)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='orders.order')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['order', 'created_at'], name='status_event_order_idx'), models.Index(fields=['to_status', 'created_at'], name='status_event_to_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_status_events, restore_audit_notes),
+    ]
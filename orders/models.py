@@ -6,8 +6,11 @@ Security considerations:
 - File uploads should be validated by extension/size (validators.py).
 """
 
+import uuid
+
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from .validators import validate_upload
 
 
@@ -41,13 +44,81 @@ class Order(models.Model):
         related_name="assigned_orders",
     )
 
+    # Denormalized aggregates (maintained by aggregates.py on every write path;
+    # `manage.py recompute_order_aggregates` rebuilds them)
+    total_qty = models.PositiveIntegerField(default=0, editable=False)
+    item_count = models.PositiveIntegerField(default=0, editable=False)
+    paid_total = models.PositiveBigIntegerField(default=0, editable=False)
+    message_count = models.PositiveIntegerField(default=0, editable=False)
+    last_message_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Client-supplied Idempotency-Key of the create request (retries return this order)
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["customer", "idempotency_key"], name="order_customer_idempotency_uniq"),
+        ]
+        # Match the list/dashboard/home query shapes (newest-first keyset pages).
+        indexes = [
+            models.Index(fields=["created_at"], name="order_created_idx"),
+            models.Index(fields=["status", "created_at"], name="order_status_created_idx"),
+            models.Index(fields=["customer", "created_at"], name="order_customer_created_idx"),
+            models.Index(fields=["deadline_date"], name="order_deadline_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"{self.id} - {self.title}"
 
 
+class OrderStatusCount(models.Model):
+    """
+    Rollup: number of orders per status.
+    Maintained incrementally by write paths (see rollups.py) so the dashboard
+    reads a handful of rows instead of counting the orders table.
+    """
+    status = models.CharField(max_length=20, choices=OrderStatus.choices, primary_key=True)
+    count = models.IntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"{self.status}: {self.count}"
+
+
+class OrderStatusEvent(models.Model):
+    """
+    Append-only status history: one row per transition, from_status blank for
+    the order's creation. Written by every status write path (status_events.py);
+    rows are never updated.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="status_events")
+    from_status = models.CharField(max_length=20, choices=OrderStatus.choices, blank=True)
+    to_status = models.CharField(max_length=20, choices=OrderStatus.choices)
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    # not auto_now_add: backfills and synthetic data write historical times
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # one order's history in order (detail page, per-order window partitions)
+            models.Index(fields=["order", "created_at"], name="status_event_order_idx"),
+            # entries into a stage over a date range (analytics)
+            models.Index(fields=["to_status", "created_at"], name="status_event_to_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError("Status events are append-only.")
+        super().save(*args, **kwargs)
+
+    def __str__(self) -> str:
+        return f"#{self.order_id}: {self.from_status or '-'} -> {self.to_status}"
+
+
 class OrderItem(models.Model):
     """Line item."""
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
@@ -67,12 +138,55 @@ class OrderFile(models.Model):
         INVOICE = "invoice", "فاکتور"
         OTHER = "other", "سایر"
 
+    class PreviewStatus(models.TextChoices):
+        NONE = "", "بدون پیش‌نمایش"
+        PENDING = "pending", "در صف"
+        READY = "ready", "آماده"
+        FAILED = "failed", "ناموفق"
+
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="files")
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True)
     file = models.FileField(upload_to="orders/files/", validators=[validate_upload])
     type = models.CharField(max_length=20, choices=FileType.choices, default=FileType.OTHER)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Content metadata, filled on upload. Identical content shares one stored
+    # file (dedupe by sha256); crc32 lets archives be built without re-reading.
+    original_name = models.CharField(max_length=255, blank=True)
+    size = models.PositiveBigIntegerField(default=0)
+    sha256 = models.CharField(max_length=64, blank=True)
+    crc32 = models.PositiveBigIntegerField(null=True, blank=True)
+    # Image thumbnails (thumbnails.py); blank for types without a preview
+    preview_status = models.CharField(max_length=10, choices=PreviewStatus.choices, blank=True, default="")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["sha256"], name="orderfile_sha256_idx"),
+            models.Index(fields=["order", "created_at"], name="orderfile_order_created_idx"),
+        ]
+
+
+class OrderUpload(models.Model):
+    """
+    An unfinished chunked upload (see uploads.py). Bytes received so far live
+    in a .part file; the row is deleted once the file is assembled.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="uploads")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    filename = models.CharField(max_length=255)
+    type = models.CharField(max_length=20, choices=OrderFile.FileType.choices, default=OrderFile.FileType.OTHER)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["updated_at"], name="upload_updated_idx")]
+
+    def __str__(self) -> str:
+        return f"{self.filename} {self.received}/{self.size}"
+
 
 class OrderMessage(models.Model):
     """Order thread messages; internal notes are staff-only."""
@@ -82,6 +196,13 @@ class OrderMessage(models.Model):
     is_internal = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # customer thread (is_internal=False) and staff thread, both oldest-first
+            models.Index(fields=["order", "is_internal", "created_at"], name="msg_order_internal_created_idx"),
+            models.Index(fields=["order", "created_at"], name="msg_order_created_idx"),
+        ]
+
 
 class Payment(models.Model):
     """Payment entries (manual for MVP)."""
@@ -97,4 +218,80 @@ class Payment(models.Model):
     status = models.CharField(max_length=15, choices=PaymentStatus.choices, default=PaymentStatus.PENDING)
     ref_code = models.CharField(max_length=80, blank=True)
     paid_at = models.DateTimeField(null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["order", "created_at"], name="payment_order_created_idx"),
+        ]
+
+
+class RollupPeriod(models.TextChoices):
+    DAY = "day", "روزانه"
+    MONTH = "month", "ماهانه"
+
+
+class PaymentRollup(models.Model):
+    """
+    Rollup: payment count/amount per (period, method, status), bucketed by the
+    payment's local created date. Maintained by reports.py on every write path;
+    `manage.py rebuild_financial_rollups` rebuilds it.
+    """
+    period = models.CharField(max_length=5, choices=RollupPeriod.choices)
+    start = models.DateField()
+    method = models.CharField(max_length=30)
+    status = models.CharField(max_length=15, choices=Payment.PaymentStatus.choices)
+    count = models.IntegerField(default=0)
+    amount = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["period", "start", "method", "status"], name="payment_rollup_bucket_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.period} {self.start} {self.method}/{self.status}: {self.amount}"
+
+
+class OrderRollup(models.Model):
+    """
+    Rollup: billing figures of the orders created in each period (local date).
+    Per order: billed = total_price, paid = paid_total,
+    deposits_collected = min(paid, deposit), outstanding = max(0, total - paid).
+    """
+    period = models.CharField(max_length=5, choices=RollupPeriod.choices)
+    start = models.DateField()
+    orders = models.IntegerField(default=0)
+    billed = models.BigIntegerField(default=0)
+    deposits_due = models.BigIntegerField(default=0)
+    deposits_collected = models.BigIntegerField(default=0)
+    paid = models.BigIntegerField(default=0)
+    outstanding = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["period", "start"], name="order_rollup_bucket_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.period} {self.start}: {self.orders} orders"
+
+
+class OrderSearchTerm(models.Model):
+    """
+    Inverted search index: one row per (normalized term, order) with a
+    field-weighted score. Maintained by search.py; `manage.py
+    rebuild_search_index` rebuilds it.
+    """
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="search_terms")
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # (term, order) doubles as the lookup index: exact and prefix matches seek on term
+            models.UniqueConstraint(fields=["term", "order"], name="search_term_order_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.term} -> {self.order_id} ({self.weight})"
@@ -0,0 +1,202 @@
+"""
+Keyset (cursor) pagination + list filters for order lists and message threads.
+
+Why keyset instead of OFFSET:
+- OFFSET scans and discards every skipped row, so deep pages get slower
+- a (created_at, id) cursor seeks straight to the next row via the index
+- new orders arriving between page loads never shift/duplicate rows
+
+Cursors are opaque to clients (urlsafe base64 of the last row's sort key).
+"""
+
+import base64
+import json
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import OrderStatus
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at, pk: int) -> str:
+    """Encode the sort key of the last row on a page."""
+    raw = json.dumps([created_at.isoformat(), pk]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a cursor into (created_at, id). Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_raw, pk = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = parse_datetime(created_raw)
+    except Exception:
+        raise ValueError("Invalid cursor.")
+    if created_at is None or not isinstance(pk, int):
+        raise ValueError("Invalid cursor.")
+    return created_at, pk
+
+
+def parse_limit(raw) -> int:
+    """Clamp ?limit= to [1, MAX_PAGE_SIZE]."""
+    if raw in (None, ""):
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid limit.")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def _keyset_query(qs, cursor: str, limit: int):
+    qs = qs.order_by("-created_at", "-id")
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    return qs[: limit + 1]
+
+
+def _keyset_result(rows: list, limit: int):
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    if isinstance(last, dict):
+        return rows, encode_cursor(last["created_at"], last["id"])
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+def keyset_page(qs, cursor: str = "", limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Return (rows, next_cursor) for a newest-first page.
+
+    Fetches limit+1 rows to know whether another page exists without COUNT(*).
+    """
+    return _keyset_result(list(_keyset_query(qs, cursor, limit)), limit)
+
+
+async def akeyset_page(qs, cursor: str = "", limit: int = DEFAULT_PAGE_SIZE):
+    """keyset_page for async views (async ORM iteration)."""
+    return _keyset_result([row async for row in _keyset_query(qs, cursor, limit)], limit)
+
+
+def _parse_day(raw: str, name: str):
+    day = parse_date(raw)
+    if day is None:
+        raise ValueError(f"Invalid {name} (expected YYYY-MM-DD).")
+    return day
+
+
+def _day_start(day):
+    """Aware datetime for 00:00 of a local day (keeps created_at filters index-friendly)."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def apply_order_filters(qs, params, allow_customer: bool = False):
+    """
+    Apply server-side list filters from query params.
+
+    Supported:
+    - status=new,review          (comma separated)
+    - assigned_to=<id>|none
+    - customer=<id>|<username>   (staff lists only)
+    - deadline_from / deadline_to  (YYYY-MM-DD, inclusive)
+    - created_from / created_to    (YYYY-MM-DD, inclusive, local time)
+
+    Raises ValueError with a client-safe message on bad input.
+    """
+    status = (params.get("status") or "").strip()
+    if status:
+        wanted = {s.strip() for s in status.split(",") if s.strip()}
+        valid = {s[0] for s in OrderStatus.choices}
+        if not wanted <= valid:
+            raise ValueError("Invalid status filter.")
+        qs = qs.filter(status__in=wanted)
+
+    assigned = (params.get("assigned_to") or "").strip()
+    if assigned:
+        if assigned == "none":
+            qs = qs.filter(assigned_to__isnull=True)
+        elif assigned.isdigit():
+            qs = qs.filter(assigned_to_id=int(assigned))
+        else:
+            raise ValueError("Invalid assigned_to filter.")
+
+    customer = (params.get("customer") or "").strip()
+    if customer and allow_customer:
+        if customer.isdigit():
+            qs = qs.filter(customer_id=int(customer))
+        else:
+            qs = qs.filter(customer__username=customer)
+
+    raw = (params.get("deadline_from") or "").strip()
+    if raw:
+        qs = qs.filter(deadline_date__gte=_parse_day(raw, "deadline_from"))
+    raw = (params.get("deadline_to") or "").strip()
+    if raw:
+        qs = qs.filter(deadline_date__lte=_parse_day(raw, "deadline_to"))
+
+    raw = (params.get("created_from") or "").strip()
+    if raw:
+        qs = qs.filter(created_at__gte=_day_start(_parse_day(raw, "created_from")))
+    raw = (params.get("created_to") or "").strip()
+    if raw:
+        end = _parse_day(raw, "created_to") + timedelta(days=1)
+        qs = qs.filter(created_at__lt=_day_start(end))
+
+    return qs
+
+
+def _row_cursor(row) -> str:
+    return encode_cursor(row["created_at"], row["id"])
+
+
+def _thread_query(qs, before: str, after: str, limit: int):
+    if before and after:
+        raise ValueError("Use either before or after, not both.")
+    if after:
+        created_at, pk = decode_cursor(after)
+        qs = qs.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+        return qs.order_by("created_at", "id")[: limit + 1]
+    if before:
+        created_at, pk = decode_cursor(before)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    return qs.order_by("-created_at", "-id")[: limit + 1]
+
+
+def _thread_result(rows: list, before: str, after: str, limit: int):
+    more = len(rows) > limit
+    if after:
+        rows = rows[:limit]
+        older = _row_cursor(rows[0]) if rows else after
+        return rows, older, _row_cursor(rows[-1]) if more else None
+
+    rows = rows[:limit][::-1]
+    newer = (_row_cursor(rows[-1]) if rows else before) if before else None
+    return rows, _row_cursor(rows[0]) if more else None, newer
+
+
+def thread_page(qs, before: str = "", after: str = "", limit: int = DEFAULT_PAGE_SIZE):
+    """
+    Return (rows, older_cursor, newer_cursor) for an oldest-first message thread.
+
+    - no cursor: the latest `limit` rows
+    - before=<cursor>: the `limit` rows just older than the cursor
+    - after=<cursor>: the `limit` rows just newer than the cursor
+
+    older_cursor / newer_cursor are None when nothing remains in that direction
+    (pass them back as before= / after=). Fetches limit+1 rows, no COUNT(*).
+    """
+    return _thread_result(list(_thread_query(qs, before, after, limit)), before, after, limit)
+
+
+async def athread_page(qs, before: str = "", after: str = "", limit: int = DEFAULT_PAGE_SIZE):
+    """thread_page for async views (async ORM iteration)."""
+    rows = [row async for row in _thread_query(qs, before, after, limit)]
+    return _thread_result(rows, before, after, limit)
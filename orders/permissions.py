@@ -2,18 +2,169 @@
 RBAC helpers:
 - staff role = belongs to at least one group OR superuser
 - permissions = standard Django permissions + custom perms (seeded)
+
+Checks read a per-user snapshot (roles + orders.* codenames) instead of
+querying groups/permissions on every call:
+- memoized on the user object for the rest of the request
+- cached across requests under a global version key
+- any group/permission change (seed_roles, Django admin, group membership)
+  bumps the version via signals (see connect_signals) after its transaction
+  commits, so stale snapshots are never read again and simply expire
+is_superuser / is_active are read live from the user row, not cached.
 """
 
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+SNAPSHOT_SECONDS = getattr(settings, "RBAC_SNAPSHOT_SECONDS", 3600)
+_VERSION_KEY = "rbac:version"
+
+
+class PermissionSnapshot:
+    """Roles and orders.* permission codenames of one user."""
+
+    __slots__ = ("is_superuser", "roles", "codenames")
+
+    def __init__(self, is_superuser: bool = False, roles=(), codenames=()):
+        self.is_superuser = is_superuser
+        self.roles = tuple(roles)
+        self.codenames = frozenset(codenames)
+
+    @property
+    def has_roles(self) -> bool:
+        return bool(self.roles)
+
+    @property
+    def is_staff(self) -> bool:
+        return self.is_superuser or self.has_roles
+
+    def has(self, codename: str) -> bool:
+        return self.is_superuser or codename in self.codenames
+
+
+_ANONYMOUS = PermissionSnapshot()
+
+
+def _version() -> int:
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        cache.add(_VERSION_KEY, 1, None)
+        version = cache.get(_VERSION_KEY, 1)
+    return version
+
+
+async def _aversion() -> int:
+    version = await cache.aget(_VERSION_KEY)
+    if version is None:
+        await cache.aadd(_VERSION_KEY, 1, None)
+        version = await cache.aget(_VERSION_KEY, 1)
+    return version
+
+
+def _roles_query(user):
+    return user.groups.order_by("name").values_list("name", flat=True)
+
+
+def _codenames_query(user):
+    return (
+        Permission.objects.filter(content_type__app_label="orders")
+        .filter(Q(group__user=user) | Q(user=user))
+        .values_list("codename", flat=True)
+        .distinct()
+    )
+
+
+def _load(user) -> tuple:
+    """(roles, codenames) from the database (2 queries)."""
+    roles = tuple(_roles_query(user))
+    if not user.is_active:
+        return roles, ()
+    return roles, tuple(_codenames_query(user))
+
+
+async def _aload(user) -> tuple:
+    roles = tuple([name async for name in _roles_query(user)])
+    if not user.is_active:
+        return roles, ()
+    return roles, tuple([code async for code in _codenames_query(user)])
+
+
+def permission_snapshot(user) -> PermissionSnapshot:
+    """The user's snapshot, computed at most once per request and cached across requests."""
+    if not user.is_authenticated:
+        return _ANONYMOUS
+    snapshot = getattr(user, "_rbac_snapshot", None)
+    if snapshot is not None:
+        return snapshot
+
+    key = f"rbac:{_version()}:{user.pk}"
+    cached = cache.get(key)
+    if cached is None:
+        cached = _load(user)
+        cache.set(key, cached, SNAPSHOT_SECONDS)
+    snapshot = PermissionSnapshot(user.is_superuser, *cached)
+    user._rbac_snapshot = snapshot
+    return snapshot
+
+
+async def apermission_snapshot(user) -> PermissionSnapshot:
+    """permission_snapshot for async views: same memo and cache entries, async cache/ORM calls."""
+    if not user.is_authenticated:
+        return _ANONYMOUS
+    snapshot = getattr(user, "_rbac_snapshot", None)
+    if snapshot is not None:
+        return snapshot
+
+    key = f"rbac:{await _aversion()}:{user.pk}"
+    cached = await cache.aget(key)
+    if cached is None:
+        cached = await _aload(user)
+        await cache.aset(key, cached, SNAPSHOT_SECONDS)
+    snapshot = PermissionSnapshot(user.is_superuser, *cached)
+    user._rbac_snapshot = snapshot
+    return snapshot
+
+
+def _bump() -> None:
+    if cache.add(_VERSION_KEY, 2, None):
+        return
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:  # evicted between add() and incr()
+        cache.add(_VERSION_KEY, 2, None)
+
+
+def invalidate_permission_snapshots(**kwargs) -> None:
+    """
+    Bump the version once the current transaction commits, so every cached
+    snapshot is recomputed on next use. Bumping earlier would let a concurrent
+    request cache the pre-commit roles under the new version.
+    """
+    transaction.on_commit(_bump)
+
+
+def connect_signals() -> None:
+    """Invalidate snapshots whenever roles or permissions change."""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.models import Group
+    from django.db.models.signals import m2m_changed, post_delete, post_save
+
+    User = get_user_model()
+    for through in (User.groups.through, User.user_permissions.through, Group.permissions.through):
+        m2m_changed.connect(invalidate_permission_snapshots, sender=through, dispatch_uid=f"rbac-{through.__name__}")
+    for model in (Group, Permission):
+        post_save.connect(invalidate_permission_snapshots, sender=model, dispatch_uid=f"rbac-save-{model.__name__}")
+        post_delete.connect(invalidate_permission_snapshots, sender=model, dispatch_uid=f"rbac-del-{model.__name__}")
+
 
 def is_staff_role(user) -> bool:
     """Return True if user is staff (role/group based) or superuser."""
-    return bool(user.is_authenticated and (user.is_superuser or user.groups.exists()))
+    return permission_snapshot(user).is_staff
 
 
 def has_perm(user, perm_codename: str) -> bool:
     """Check a custom permission in the 'orders' app namespace."""
-    if not user.is_authenticated:
-        return False
-    if user.is_superuser:
-        return True
-    return user.has_perm(f"orders.{perm_codename}")
\ No newline at end of file
+    return permission_snapshot(user).has(perm_codename)
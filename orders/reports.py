@@ -0,0 +1,369 @@
+"""
+Financial reporting from precomputed daily + monthly rollups.
+
+Two small tables answer every report without scanning Payment or Order:
+- PaymentRollup  count/amount per (period, method, status), by payment created date
+- OrderRollup    billed / deposits / paid / outstanding, by order created date
+
+Keeping them current:
+- API write paths apply O(1) F() deltas to the day and month bucket inside
+  their own transaction (order_created, order_figures_changed, payment_recorded;
+  orders_figures_changed for batch edits)
+- admin edits re-derive the touched days from source rows (refresh_days)
+- rebuild_rollups() recomputes everything (backfills, drift repair)
+
+Buckets are local (TIME_ZONE) calendar days; months start on day 1.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Case, Count, ExpressionWrapper, F, Sum, When
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Order, OrderRollup, Payment, PaymentRollup, RollupPeriod
+
+ORDER_FIGURES = ("orders", "billed", "deposits_due", "deposits_collected", "paid", "outstanding")
+
+MAX_BUCKETS = {RollupPeriod.DAY: 400, RollupPeriod.MONTH: 120}
+DEFAULT_BUCKETS = {RollupPeriod.DAY: 30, RollupPeriod.MONTH: 12}
+
+
+def _month(day):
+    return day.replace(day=1)
+
+
+def _buckets(day):
+    """(period, start) keys that a local date contributes to."""
+    return ((RollupPeriod.DAY, day), (RollupPeriod.MONTH, _month(day)))
+
+
+def _day_range(day):
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def order_figures(total: int, deposit: int, paid: int, orders: int = 1) -> dict:
+    """One order's contribution to its OrderRollup bucket."""
+    return {
+        "orders": orders,
+        "billed": total,
+        "deposits_due": deposit,
+        "deposits_collected": min(paid, deposit),
+        "paid": paid,
+        "outstanding": max(0, total - paid),
+    }
+
+
+def _bump(model, lookup: dict, deltas: dict) -> None:
+    """Add deltas to one rollup row, creating it on first use."""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas:
+        return
+    updates = {k: F(k) + v for k, v in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another writer created the bucket first.
+        model.objects.filter(**lookup).update(**updates)
+
+
+# -----------------------
+# Incremental updates (API write paths)
+# -----------------------
+
+def _bump_order(created_at, deltas: dict) -> None:
+    for period, start in _buckets(timezone.localdate(created_at)):
+        _bump(OrderRollup, {"period": period, "start": start}, deltas)
+
+
+def order_created(created_at, total: int = 0, deposit: int = 0) -> None:
+    """Account for a new order."""
+    _bump_order(created_at, order_figures(total, deposit, 0))
+
+
+def order_figures_changed(created_at, old: tuple, new: tuple) -> None:
+    """Account for a change of an order's (total_price, deposit_amount, paid_total)."""
+    before = order_figures(*old)
+    after = order_figures(*new)
+    _bump_order(created_at, {k: after[k] - before[k] for k in ORDER_FIGURES})
+
+
+def orders_figures_changed(changes) -> None:
+    """
+    order_figures_changed for many orders at once (batch edits): `changes` are
+    (created_at, old, new) tuples; deltas are summed per local day, so each
+    touched bucket is bumped once.
+    """
+    per_day = defaultdict(lambda: dict.fromkeys(ORDER_FIGURES, 0))
+    for created_at, old, new in changes:
+        before, after = order_figures(*old), order_figures(*new)
+        deltas = per_day[timezone.localdate(created_at)]
+        for k in ORDER_FIGURES:
+            deltas[k] += after[k] - before[k]
+    per_bucket = defaultdict(lambda: dict.fromkeys(ORDER_FIGURES, 0))
+    for day, deltas in per_day.items():
+        for bucket in _buckets(day):
+            for k, v in deltas.items():
+                per_bucket[bucket][k] += v
+    for (period, start), deltas in per_bucket.items():
+        _bump(OrderRollup, {"period": period, "start": start}, deltas)
+
+
+def payment_recorded(payment) -> None:
+    """
+    Account for a new Payment row. Call after aggregates.payment_added(), in the
+    same transaction: a paid payment also moves its order's paid/outstanding.
+    """
+    for period, start in _buckets(timezone.localdate(payment.created_at)):
+        lookup = {"period": period, "start": start, "method": payment.method, "status": payment.status}
+        _bump(PaymentRollup, lookup, {"count": 1, "amount": payment.amount})
+
+    if payment.status == Payment.PaymentStatus.PAID:
+        o = (
+            Order.objects.filter(id=payment.order_id)
+            .values("created_at", "total_price", "deposit_amount", "paid_total")
+            .first()
+        )
+        if o is not None:
+            new = (o["total_price"], o["deposit_amount"], o["paid_total"])
+            order_figures_changed(o["created_at"], (new[0], new[1], new[2] - payment.amount), new)
+
+
+# -----------------------
+# Re-derivation (admin edits, backfills)
+# -----------------------
+
+def _outstanding_expr():
+    # CASE instead of total - paid: unsigned columns can't go negative on MySQL
+    diff = ExpressionWrapper(F("total_price") - F("paid_total"), output_field=BigIntegerField())
+    return Case(When(total_price__gt=F("paid_total"), then=diff), default=0, output_field=BigIntegerField())
+
+
+def _collected_expr():
+    return Case(
+        When(paid_total__lt=F("deposit_amount"), then=F("paid_total")),
+        default=F("deposit_amount"),
+        output_field=BigIntegerField(),
+    )
+
+
+def _refresh_order_day(day) -> None:
+    start, end = _day_range(day)
+    row = Order.objects.filter(created_at__gte=start, created_at__lt=end).aggregate(
+        orders=Count("id"),
+        billed=Sum("total_price"),
+        deposits_due=Sum("deposit_amount"),
+        deposits_collected=Sum(_collected_expr()),
+        paid=Sum("paid_total"),
+        outstanding=Sum(_outstanding_expr()),
+    )
+    lookup = {"period": RollupPeriod.DAY, "start": day}
+    if not row["orders"]:
+        OrderRollup.objects.filter(**lookup).delete()
+        return
+    OrderRollup.objects.update_or_create(**lookup, defaults={k: row[k] or 0 for k in ORDER_FIGURES})
+
+
+def _refresh_payment_day(day) -> None:
+    start, end = _day_range(day)
+    grouped = (
+        Payment.objects.filter(created_at__gte=start, created_at__lt=end)
+        .order_by()
+        .values("method", "status")
+        .annotate(n=Count("id"), total=Sum("amount"))
+    )
+    PaymentRollup.objects.filter(period=RollupPeriod.DAY, start=day).delete()
+    PaymentRollup.objects.bulk_create(
+        [
+            PaymentRollup(period=RollupPeriod.DAY, start=day, method=g["method"], status=g["status"],
+                          count=g["n"], amount=g["total"] or 0)
+            for g in grouped
+        ]
+    )
+
+
+def _refresh_month(month) -> None:
+    """Rebuild a month's rows from its (already current) day rows."""
+    end = (month + timedelta(days=32)).replace(day=1)
+    days = {"period": RollupPeriod.DAY, "start__gte": month, "start__lt": end}
+
+    row = OrderRollup.objects.filter(**days).aggregate(**{k: Sum(k) for k in ORDER_FIGURES})
+    lookup = {"period": RollupPeriod.MONTH, "start": month}
+    if not row["orders"]:
+        OrderRollup.objects.filter(**lookup).delete()
+    else:
+        OrderRollup.objects.update_or_create(**lookup, defaults={k: row[k] or 0 for k in ORDER_FIGURES})
+
+    grouped = (
+        PaymentRollup.objects.filter(**days)
+        .order_by()
+        .values("method", "status")
+        .annotate(n=Sum("count"), total=Sum("amount"))
+    )
+    PaymentRollup.objects.filter(**lookup).delete()
+    PaymentRollup.objects.bulk_create(
+        [PaymentRollup(**lookup, method=g["method"], status=g["status"], count=g["n"], amount=g["total"]) for g in grouped]
+    )
+
+
+def refresh_days(days) -> None:
+    """Re-derive the day buckets for the given local dates (and their months) from source rows."""
+    days = set(days)
+    if not days:
+        return
+    with transaction.atomic():
+        for day in sorted(days):
+            _refresh_order_day(day)
+            _refresh_payment_day(day)
+        for month in sorted({_month(d) for d in days}):
+            _refresh_month(month)
+
+
+def rebuild_rollups(batch_size: int = 2000) -> dict:
+    """
+    Recompute both rollup tables from Order/Payment (read in id batches, so memory
+    is bounded by the number of buckets, not rows). Returns bucket counts.
+    """
+    orders = defaultdict(lambda: dict.fromkeys(ORDER_FIGURES, 0))
+    payments = defaultdict(lambda: [0, 0])
+
+    for row in _id_batches(Order.objects, ("created_at", "total_price", "deposit_amount", "paid_total"), batch_size):
+        figures = order_figures(row["total_price"], row["deposit_amount"], row["paid_total"])
+        for key in _buckets(timezone.localdate(row["created_at"])):
+            bucket = orders[key]
+            for k, v in figures.items():
+                bucket[k] += v
+
+    for row in _id_batches(Payment.objects, ("created_at", "method", "status", "amount"), batch_size):
+        for period, start in _buckets(timezone.localdate(row["created_at"])):
+            bucket = payments[(period, start, row["method"], row["status"])]
+            bucket[0] += 1
+            bucket[1] += row["amount"]
+
+    with transaction.atomic():
+        OrderRollup.objects.all().delete()
+        PaymentRollup.objects.all().delete()
+        OrderRollup.objects.bulk_create(
+            [OrderRollup(period=p, start=s, **figures) for (p, s), figures in orders.items()], batch_size=1000
+        )
+        PaymentRollup.objects.bulk_create(
+            [
+                PaymentRollup(period=p, start=s, method=m, status=st, count=n, amount=amount)
+                for (p, s, m, st), (n, amount) in payments.items()
+            ],
+            batch_size=1000,
+        )
+    return {"order_buckets": len(orders), "payment_buckets": len(payments)}
+
+
+def _id_batches(manager, fields, batch_size):
+    """Yield values() rows of a whole table in primary-key batches."""
+    last_id = 0
+    while True:
+        rows = list(manager.filter(id__gt=last_id).order_by("id").values("id", *fields)[:batch_size])
+        if not rows:
+            return
+        yield from rows
+        last_id = rows[-1]["id"]
+
+
+# -----------------------
+# Reading
+# -----------------------
+
+def parse_report_range(params):
+    """
+    (period, first, last) from ?period=day|month&from=YYYY-MM-DD&to=YYYY-MM-DD.
+    Defaults to the last 30 days / 12 months. Raises ValueError with a client-safe message.
+    """
+    period = (params.get("period") or RollupPeriod.DAY).strip()
+    if period not in RollupPeriod.values:
+        raise ValueError("Invalid period (expected day or month).")
+
+    dates = {}
+    for name in ("from", "to"):
+        raw = (params.get(name) or "").strip()
+        if raw:
+            dates[name] = parse_date(raw)
+            if dates[name] is None:
+                raise ValueError(f"Invalid {name} (expected YYYY-MM-DD).")
+
+    last = dates.get("to") or timezone.localdate()
+    if period == RollupPeriod.MONTH:
+        last = _month(last)
+        first = _month(dates["from"]) if "from" in dates else _months_back(last, DEFAULT_BUCKETS[period] - 1)
+        buckets = (last.year - first.year) * 12 + last.month - first.month + 1
+    else:
+        first = dates.get("from") or last - timedelta(days=DEFAULT_BUCKETS[period] - 1)
+        buckets = (last - first).days + 1
+
+    if buckets < 1:
+        raise ValueError("from must not be after to.")
+    if buckets > MAX_BUCKETS[period]:
+        raise ValueError(f"Range too long (max {MAX_BUCKETS[period]} {period}s).")
+    return period, first, last
+
+
+def _months_back(month, n: int):
+    index = month.year * 12 + month.month - 1 - n
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _empty_row(start) -> dict:
+    return {
+        "start": start.isoformat(),
+        **dict.fromkeys(ORDER_FIGURES, 0),
+        "revenue": 0,
+        "refunds": 0,
+        "by_status": {},
+        "by_method": {},
+    }
+
+
+def _add_payment(row: dict, method: str, status: str, count: int, amount: int) -> None:
+    slot = row["by_status"].setdefault(status, {"count": 0, "amount": 0})
+    slot["count"] += count
+    slot["amount"] += amount
+    if status == Payment.PaymentStatus.PAID:
+        row["revenue"] += amount
+        row["by_method"][method] = row["by_method"].get(method, 0) + amount
+    elif status == Payment.PaymentStatus.REFUNDED:
+        row["refunds"] += amount
+
+
+def financial_report(period: str, first, last) -> dict:
+    """Per-bucket figures between first and last (inclusive) plus totals; two indexed queries."""
+    rows = {}
+    for o in OrderRollup.objects.filter(period=period, start__range=(first, last)).values("start", *ORDER_FIGURES):
+        row = rows.setdefault(o["start"], _empty_row(o["start"]))
+        for k in ORDER_FIGURES:
+            row[k] = o[k]
+
+    totals = _empty_row(first)
+    del totals["start"]
+
+    payments = PaymentRollup.objects.filter(period=period, start__range=(first, last)).values(
+        "start", "method", "status", "count", "amount"
+    )
+    for p in payments:
+        row = rows.setdefault(p["start"], _empty_row(p["start"]))
+        _add_payment(row, p["method"], p["status"], p["count"], p["amount"])
+        _add_payment(totals, p["method"], p["status"], p["count"], p["amount"])
+
+    for row in rows.values():
+        for k in ORDER_FIGURES:
+            totals[k] += row[k]
+
+    return {
+        "period": period,
+        "from": first.isoformat(),
+        "to": last.isoformat(),
+        "rows": [rows[k] for k in sorted(rows)],
+        "totals": totals,
+    }
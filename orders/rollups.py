@@ -0,0 +1,57 @@
+"""
+Precomputed rollups for dashboard counters.
+
+Write paths call bump/move helpers inside their own transaction; readers get
+counters without scanning orders. rebuild_status_counts() recomputes from a
+single GROUP BY (used by the migration backfill and the management command).
+"""
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Order, OrderStatus, OrderStatusCount
+
+
+def rebuild_status_counts() -> dict:
+    """Recompute all status counters from one GROUP BY status query."""
+    grouped = dict(Order.objects.order_by().values_list("status").annotate(n=Count("id")))
+    counts = {s: grouped.get(s, 0) for s in OrderStatus.values}
+    with transaction.atomic():
+        for status, n in counts.items():
+            OrderStatusCount.objects.update_or_create(status=status, defaults={"count": n})
+    return counts
+
+
+def status_counts() -> dict:
+    """Return {status: count} for every OrderStatus (reads the rollup table only)."""
+    rows = dict(OrderStatusCount.objects.values_list("status", "count"))
+    if len(rows) < len(OrderStatus.values):
+        return rebuild_status_counts()
+    return {s: rows[s] for s in OrderStatus.values}
+
+
+def bump_status_count(status: str, delta: int = 1) -> bool:
+    """
+    Atomically add delta to one status counter. Call it after the order row
+    has changed: if the counter row is missing (fresh DB / new status), every
+    counter is recounted from the orders table instead, which already includes
+    this change, and False is returned so callers skip their remaining deltas.
+    """
+    if OrderStatusCount.objects.filter(status=status).update(count=F("count") + delta):
+        return True
+    rebuild_status_counts()
+    return False
+
+
+def bump_status_counts(deltas: dict) -> None:
+    """Apply several counter deltas ({status: delta}); stops once a recount has covered them."""
+    for status, delta in deltas.items():
+        if delta and not bump_status_count(status, delta):
+            return
+
+
+def move_status_count(old: str, new: str) -> None:
+    """Record an order moving from one status to another."""
+    if old == new:
+        return
+    bump_status_counts({old: -1, new: 1})
@@ -0,0 +1,255 @@
+"""
+Staff order search over an inverted index table (works on MySQL and SQLite).
+
+OrderSearchTerm holds one row per (normalized term, order) with a field-weighted
+score, so a search is an index range scan on `term` instead of LIKE '%x%'
+across orders, items, messages and users.
+
+Indexed text (weight per occurrence):
+- Order.title                                   TITLE
+- customer username / phone                     CUSTOMER
+- OrderItem.product_type / fabric_type          ITEM
+- OrderItem.notes, message bodies               TEXT
+
+Persian normalization: Arabic ي/ك -> ی/ک, ZWNJ joins the word, hamza/alef
+variants folded, diacritics and tatweel dropped, Persian/Arabic digits -> ASCII.
+
+Maintenance:
+- new orders / admin edits: reindex_orders(ids) (rebuilds those orders' rows)
+- new messages: index_text() adds only the new text's terms (3 queries)
+- customer username/phone changes: that customer's orders, after commit (signals)
+- `manage.py rebuild_search_index` rebuilds everything
+"""
+
+import base64
+import json
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Max, Q, Sum, Value, When
+
+from .models import Order, OrderItem, OrderMessage, OrderSearchTerm
+
+WEIGHT_TITLE = 8
+WEIGHT_CUSTOMER = 6
+WEIGHT_ITEM = 4
+WEIGHT_TEXT = 1
+MAX_WEIGHT = 1000
+
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+
+_CHAR_MAP = str.maketrans(
+    {
+        "ي": "ی", "ى": "ی", "ئ": "ی",
+        "ك": "ک",
+        "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+        "ؤ": "و",
+        "ة": "ه", "ۀ": "ه",
+        "\u200c": None,  # ZWNJ: "می‌خواهم" and "میخواهم" index the same
+        "\u200d": None,  # ZWJ
+        "\u0640": None,  # tatweel
+        **{chr(c): None for c in range(0x064B, 0x0660)},  # harakat
+        "\u0670": None,  # superscript alef
+        **{chr(0x06F0 + i): str(i) for i in range(10)},  # Persian digits
+        **{chr(0x0660 + i): str(i) for i in range(10)},  # Arabic digits
+    }
+)
+_TOKEN = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Fold Persian/Arabic variants and case so equivalent spellings compare equal."""
+    return (text or "").translate(_CHAR_MAP).casefold()
+
+
+def tokenize(text: str) -> list:
+    """Normalized terms of a text (single letters dropped unless digits)."""
+    return [
+        t[:MAX_TERM_LENGTH]
+        for t in _TOKEN.findall(normalize(text))
+        if len(t) > 1 or t.isdigit()
+    ]
+
+
+def weigh(*parts) -> Counter:
+    """Term -> weight for (text, weight) pairs."""
+    weights = Counter()
+    for text, weight in parts:
+        for term in tokenize(text):
+            weights[term] += weight
+    return weights
+
+
+# -----------------------
+# Maintenance
+# -----------------------
+
+def _order_weights(order: dict, items, messages) -> Counter:
+    parts = [
+        (order["title"], WEIGHT_TITLE),
+        (order["customer__username"], WEIGHT_CUSTOMER),
+        (order["customer__phone"], WEIGHT_CUSTOMER),
+    ]
+    for i in items:
+        parts += [(i["product_type"], WEIGHT_ITEM), (i["fabric_type"], WEIGHT_ITEM), (i["notes"], WEIGHT_TEXT)]
+    parts += [(m, WEIGHT_TEXT) for m in messages]
+    return weigh(*parts)
+
+
+def reindex_orders(order_ids) -> int:
+    """Rebuild the index rows of the given orders from their source rows. Returns terms written."""
+    order_ids = list(order_ids)
+    orders = Order.objects.filter(id__in=order_ids).values("id", "title", "customer__username", "customer__phone")
+
+    items = {}
+    for i in OrderItem.objects.filter(order_id__in=order_ids).values("order_id", "product_type", "fabric_type", "notes"):
+        items.setdefault(i["order_id"], []).append(i)
+    messages = {}
+    for order_id, text in OrderMessage.objects.filter(order_id__in=order_ids).values_list("order_id", "message"):
+        messages.setdefault(order_id, []).append(text)
+
+    rows = []
+    for o in orders:
+        weights = _order_weights(o, items.get(o["id"], ()), messages.get(o["id"], ()))
+        rows += [OrderSearchTerm(order_id=o["id"], term=t, weight=min(w, MAX_WEIGHT)) for t, w in weights.items()]
+
+    with transaction.atomic():
+        OrderSearchTerm.objects.filter(order_id__in=order_ids).delete()
+        # ignore_conflicts: terms that differ only under a case/accent-insensitive collation
+        OrderSearchTerm.objects.bulk_create(rows, batch_size=1000, ignore_conflicts=True)
+    return len(rows)
+
+
+def index_text(order_id: int, text: str, weight: int = WEIGHT_TEXT) -> None:
+    """Add one new piece of text (e.g. a message) to an order's index rows."""
+    weights = weigh((text, weight))
+    if not weights:
+        return
+    rows = OrderSearchTerm.objects.filter(order_id=order_id, term__in=list(weights))
+    existing = set(rows.values_list("term", flat=True))
+    if existing:
+        delta = Case(*[When(term=t, then=Value(weights[t])) for t in existing], default=Value(0))
+        rows.update(weight=Case(
+            When(weight__gte=MAX_WEIGHT, then=F("weight")),
+            default=F("weight") + delta,
+            output_field=IntegerField(),
+        ))
+    OrderSearchTerm.objects.bulk_create(
+        [OrderSearchTerm(order_id=order_id, term=t, weight=min(w, MAX_WEIGHT)) for t, w in weights.items()
+         if t not in existing],
+        ignore_conflicts=True,
+    )
+
+
+# -----------------------
+# Querying
+# -----------------------
+
+def encode_cursor(score: int, pk: int) -> str:
+    """Encode the (score, order id) of the last result on a page."""
+    return base64.urlsafe_b64encode(json.dumps([score, pk]).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Decode a search cursor. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, pk = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor.")
+    if not isinstance(score, int) or not isinstance(pk, int):
+        raise ValueError("Invalid cursor.")
+    return score, pk
+
+
+def matching_orders(query: str):
+    """
+    Queryset of {order_id, score} rows for orders matching every query term
+    (the last term also matches as a prefix, for search-as-you-type).
+    Returns None when the query has no searchable terms.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+
+    conditions = [Q(term=t) for t in terms[:-1]] + [Q(term__startswith=terms[-1])]
+    any_term = Q()
+    for c in conditions:
+        any_term |= c
+    # One flag per query term; an order matches when all flags are set.
+    hits = [Max(Case(When(c, then=Value(1)), default=Value(0), output_field=IntegerField())) for c in conditions]
+    matched = hits[0]
+    for h in hits[1:]:
+        matched = matched + h
+
+    return (
+        OrderSearchTerm.objects.filter(any_term)
+        .values("order_id")
+        .annotate(score=Sum("weight"), matched=matched)
+        .filter(matched=len(conditions))
+    )
+
+
+def search_page(query: str, cursor: str = "", limit: int = 50, orders=None):
+    """
+    Return (rows, next_cursor): {order_id, score} best-first, ties newest-first.
+    Keyset on (score, order id), fetching limit+1 rows to detect the next page.
+    `orders` (an Order queryset, e.g. the list filters) restricts the matches.
+    """
+    qs = matching_orders(query)
+    if qs is None:
+        return [], None
+    if orders is not None:
+        qs = qs.filter(order_id__in=orders.values("id"))
+    if cursor:
+        score, pk = decode_cursor(cursor)
+        qs = qs.filter(Q(score__lt=score) | Q(score=score, order_id__lt=pk))
+
+    rows = list(qs.order_by("-score", "-order_id")[: limit + 1])
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]["score"], rows[-1]["order_id"])
+
+
+_CUSTOMER_FIELDS = ("username", "phone")
+
+
+def _user_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Note whether this save changes an indexed customer field (one lookup, skipped for unrelated updates)."""
+    instance._search_reindex = False
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(_CUSTOMER_FIELDS) & set(update_fields):
+        return  # e.g. last_login updates on every sign-in
+    stored = sender.objects.filter(pk=instance.pk).values(*_CUSTOMER_FIELDS).first()
+    instance._search_reindex = stored is not None and any(
+        stored[f] != getattr(instance, f) for f in _CUSTOMER_FIELDS
+    )
+
+
+def _reindex_customer(user_id) -> None:
+    order_ids = list(Order.objects.filter(customer_id=user_id).values_list("id", flat=True))
+    for start in range(0, len(order_ids), 500):
+        reindex_orders(order_ids[start:start + 500])
+
+
+def _user_saved(sender, instance, created, raw=False, **kwargs):
+    """Customer username/phone are indexed on their orders; refresh them after a commit that changed them."""
+    if created or raw or not getattr(instance, "_search_reindex", False):
+        return
+    instance._search_reindex = False
+    user_id = instance.pk
+    transaction.on_commit(lambda: _reindex_customer(user_id))
+
+
+def connect_signals() -> None:
+    """Keep customer fields in the index current."""
+    from django.contrib.auth import get_user_model
+    from django.db.models.signals import post_save, pre_save
+
+    User = get_user_model()
+    pre_save.connect(_user_saving, sender=User, dispatch_uid="search-user-saving")
+    post_save.connect(_user_saved, sender=User, dispatch_uid="search-user-saved")
@@ -0,0 +1,202 @@
+"""
+JSON serialization for order payloads (shared by JSON views and event streams).
+
+Everything is built from values() projections: one query per collection and
+related usernames joined in, so there are no per-row lookups. The a*()
+variants run the same queries through the async ORM (async_views.py).
+"""
+
+import os
+
+from .models import OrderFile, OrderItem, OrderMessage, OrderStatus, OrderStatusEvent, Payment
+from .pagination import athread_page, thread_page
+from .thumbnails import thumbnail_urls
+
+ORDER_STATUS_LABELS = dict(OrderStatus.choices)
+PAYMENT_STATUS_LABELS = dict(Payment.PaymentStatus.choices)
+
+ORDER_LIST_FIELDS = (
+    "id", "title", "status", "total_price", "deposit_amount", "total_qty", "item_count", "paid_total", "created_at",
+)
+# message_count includes internal notes, so thread stats are staff-only
+STAFF_ORDER_FIELDS = ORDER_LIST_FIELDS + ("customer__username", "message_count", "last_message_at")
+
+# detail payloads carry only the tail of the thread; older pages via the messages API
+DETAIL_MESSAGE_LIMIT = 50
+
+MESSAGE_FIELDS = ("id", "sender__username", "message", "is_internal", "created_at")
+PAYMENT_FIELDS = ("id", "amount", "method", "status", "created_at")
+FILE_FIELDS = ("id", "file", "original_name", "type", "size", "preview_status", "created_at")
+STATUS_EVENT_FIELDS = ("id", "from_status", "to_status", "actor__username", "created_at")
+
+FILE_TYPE_LABELS = dict(OrderFile.FileType.choices)
+_file_storage = OrderFile._meta.get_field("file").storage
+
+
+def order_row(o: dict) -> dict:
+    """Serialize an order values() row (adds staff-only fields when projected)."""
+    row = {
+        "id": o["id"],
+        "title": o["title"],
+        "status": o["status"],
+        "status_label": ORDER_STATUS_LABELS.get(o["status"], o["status"]),
+        "total_price": o["total_price"],
+        "deposit_amount": o["deposit_amount"],
+        "total_qty": o["total_qty"],
+        "item_count": o["item_count"],
+        "paid_total": o["paid_total"],
+        "created_at": o["created_at"].isoformat(),
+    }
+    if "customer__username" in o:
+        row["customer"] = o["customer__username"]
+        row["message_count"] = o["message_count"]
+        row["last_message_at"] = o["last_message_at"].isoformat() if o["last_message_at"] else None
+    return row
+
+
+def message_row(m: dict, include_internal: bool) -> dict:
+    """Serialize a message values() row (is_internal only for staff)."""
+    msg = {
+        "id": m["id"],
+        "sender": m["sender__username"] or "unknown",
+        "message": m["message"],
+        "created_at": m["created_at"].isoformat(),
+    }
+    if include_internal:
+        msg["is_internal"] = m["is_internal"]
+    return msg
+
+
+def payment_row(p: dict) -> dict:
+    """Serialize a payment values() row."""
+    return {
+        "id": p["id"],
+        "amount": p["amount"],
+        "method": p["method"],
+        "status": p["status"],
+        "status_label": PAYMENT_STATUS_LABELS.get(p["status"], p["status"]),
+        "created_at": p["created_at"].isoformat(),
+    }
+
+
+def file_row(f: dict) -> dict:
+    """Serialize an order file values() row."""
+    return {
+        "id": f["id"],
+        "name": f["original_name"] or os.path.basename(f["file"]),
+        "type": f["type"],
+        "type_label": FILE_TYPE_LABELS.get(f["type"], f["type"]),
+        "size": f["size"],
+        "url": _file_storage.url(f["file"]),
+        "preview": f["preview_status"] or None,
+        "thumbnails": thumbnail_urls(f["file"]) if f["preview_status"] == OrderFile.PreviewStatus.READY else None,
+        "created_at": f["created_at"].isoformat(),
+    }
+
+
+def status_event_row(e: dict) -> dict:
+    """Serialize a status history values() row (from_status is "" for the order's creation)."""
+    return {
+        "id": e["id"],
+        "from_status": e["from_status"] or None,
+        "to_status": e["to_status"],
+        "to_label": ORDER_STATUS_LABELS.get(e["to_status"], e["to_status"]),
+        "actor": e["actor__username"],
+        "created_at": e["created_at"].isoformat(),
+    }
+
+
+def message_queryset(order_id: int, include_internal: bool):
+    """Thread rows of one order (customers never see internal notes)."""
+    qs = OrderMessage.objects.filter(order_id=order_id)
+    if not include_internal:
+        qs = qs.filter(is_internal=False)
+    return qs
+
+
+def _items_query(order_id: int):
+    return (
+        OrderItem.objects.filter(order_id=order_id)
+        .order_by("id")
+        .values("id", "product_type", "qty", "size_range", "fabric_type", "notes")
+    )
+
+
+def order_items(order_id: int) -> list:
+    """Line items of an order (1 query)."""
+    return list(_items_query(order_id))
+
+
+async def aorder_items(order_id: int) -> list:
+    return [row async for row in _items_query(order_id)]
+
+
+def order_messages(order_id: int, include_internal: bool, before: str = "", after: str = "",
+                   limit: int = DETAIL_MESSAGE_LIMIT):
+    """
+    One page of the thread, oldest-first; sender joined in the same query (1 query).
+    Returns (messages, older_cursor, newer_cursor); see pagination.thread_page.
+    """
+    qs = message_queryset(order_id, include_internal).values(*MESSAGE_FIELDS)
+    rows, older, newer = thread_page(qs, before, after, limit)
+    return [message_row(m, include_internal) for m in rows], older, newer
+
+
+async def aorder_messages(order_id: int, include_internal: bool, before: str = "", after: str = "",
+                          limit: int = DETAIL_MESSAGE_LIMIT):
+    qs = message_queryset(order_id, include_internal).values(*MESSAGE_FIELDS)
+    rows, older, newer = await athread_page(qs, before, after, limit)
+    return [message_row(m, include_internal) for m in rows], older, newer
+
+
+def messages_since(order_id: int, include_internal: bool, since: int, limit: int):
+    """
+    Messages with id > since, oldest-first (incremental refresh, 1 query).
+    Returns (messages, has_more).
+    """
+    rows = list(
+        message_queryset(order_id, include_internal)
+        .filter(id__gt=since)
+        .order_by("id")
+        .values(*MESSAGE_FIELDS)[: limit + 1]
+    )
+    return [message_row(m, include_internal) for m in rows[:limit]], len(rows) > limit
+
+
+def _payments_query(order_id: int):
+    return Payment.objects.filter(order_id=order_id).order_by("-created_at", "-id").values(*PAYMENT_FIELDS)
+
+
+def order_payments(order_id: int) -> list:
+    """Payments newest-first (1 query)."""
+    return [payment_row(p) for p in _payments_query(order_id)]
+
+
+async def aorder_payments(order_id: int) -> list:
+    return [payment_row(p) async for p in _payments_query(order_id)]
+
+
+def _status_history_query(order_id: int):
+    return OrderStatusEvent.objects.filter(order_id=order_id).order_by("created_at", "id").values(*STATUS_EVENT_FIELDS)
+
+
+def order_status_history(order_id: int) -> list:
+    """Status transitions oldest-first (1 query)."""
+    return [status_event_row(e) for e in _status_history_query(order_id)]
+
+
+async def aorder_status_history(order_id: int) -> list:
+    return [status_event_row(e) async for e in _status_history_query(order_id)]
+
+
+def _files_query(order_id: int):
+    return OrderFile.objects.filter(order_id=order_id).order_by("created_at", "id").values(*FILE_FIELDS)
+
+
+def order_files(order_id: int) -> list:
+    """Attached files oldest-first (1 query)."""
+    return [file_row(f) for f in _files_query(order_id)]
+
+
+async def aorder_files(order_id: int) -> list:
+    return [file_row(f) async for f in _files_query(order_id)]
@@ -0,0 +1,145 @@
+"""
+Order status history (OrderStatusEvent) and lead-time analytics.
+
+Writing: every path that creates an order or changes its status calls
+record()/record_many() inside its own transaction. The history replaces the
+"Status changed to: ..." internal notes that used to go into the thread
+(migration 0010 moved them here).
+
+Reading: lead_time_report() answers time-in-stage, lead-time and throughput
+questions from one query. Window functions over each order's events
+(partition by order, ordered by time) give every stay its end (LEAD: the next
+event) and the order's start (FIRST_VALUE), so nothing is parsed or joined per
+row; medians/p90s are taken over the streamed durations.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from statistics import median
+
+from django.db.models import F, Window
+from django.db.models.functions import FirstValue, Lead
+from django.utils import timezone
+
+from .models import OrderStatus, OrderStatusEvent, RollupPeriod
+
+# stages an order leaves only by mistake; their stays are not durations
+TERMINAL = (OrderStatus.DELIVERED, OrderStatus.CANCELED)
+
+
+def record(order_id: int, from_status: str, to_status: str, actor=None) -> None:
+    """Append one transition (from_status "" for a new order); no-op when the status did not change."""
+    if from_status == to_status:
+        return
+    OrderStatusEvent.objects.create(order_id=order_id, from_status=from_status, to_status=to_status, actor=actor)
+
+
+def record_many(changes, to_status: str, actor=None) -> None:
+    """Append one transition per (order_id, from_status) pair, in one INSERT (batch edits)."""
+    now = timezone.now()
+    OrderStatusEvent.objects.bulk_create(
+        [
+            OrderStatusEvent(order_id=order_id, from_status=old, to_status=to_status, actor=actor, created_at=now)
+            for order_id, old in changes
+            if old != to_status
+        ]
+    )
+
+
+# -----------------------
+# Analytics
+# -----------------------
+
+def _window(period: str, first, last) -> tuple:
+    """Aware [start, end) datetimes covering the report's local dates."""
+    if period == RollupPeriod.MONTH:
+        last = (last.replace(day=28) + timedelta(days=4)).replace(day=1)
+    else:
+        last = last + timedelta(days=1)
+    return (
+        timezone.make_aware(datetime.combine(first, time.min)),
+        timezone.make_aware(datetime.combine(last, time.min)),
+    )
+
+
+def _bucket(period: str, at, tz):
+    day = at.astimezone(tz).date()
+    return day.replace(day=1) if period == RollupPeriod.MONTH else day
+
+
+def _hours(values: list) -> dict:
+    """count / median / p90 (nearest rank) of durations in seconds, as hours."""
+    if not values:
+        return {"count": 0, "median_hours": None, "p90_hours": None}
+    values.sort()
+    p90 = values[min(len(values) - 1, int(len(values) * 0.9))]
+    return {"count": len(values), "median_hours": round(median(values) / 3600, 1), "p90_hours": round(p90 / 3600, 1)}
+
+
+def _events(start, end):
+    """All events of the orders that have one in [start, end), with the next event's time and the order's start."""
+    touched = OrderStatusEvent.objects.filter(created_at__gte=start, created_at__lt=end).values("order_id")
+    partition = {"partition_by": [F("order_id")], "order_by": [F("created_at").asc(), F("id").asc()]}
+    return (
+        OrderStatusEvent.objects.filter(order_id__in=touched)
+        .annotate(
+            next_at=Window(Lead("created_at"), **partition),
+            started_at=Window(FirstValue("created_at"), **partition),
+        )
+        .values("order_id", "from_status", "to_status", "created_at", "next_at", "started_at")
+        .order_by()
+    )
+
+
+def lead_time_report(period: str, first, last) -> dict:
+    """
+    Stage and lead-time figures for events between first and last (local dates, inclusive):
+    - stages: per status, stays that began in the range; closed stays give
+      median/p90 hours in stage, `open` counts orders still there
+    - lead_time: created -> delivered for orders delivered in the range
+    - rows: per day/month bucket, orders created / delivered / canceled
+    """
+    start, end = _window(period, first, last)
+    tz = timezone.get_current_timezone()
+    stays = defaultdict(list)
+    open_stays = defaultdict(int)
+    lead = []
+    rows = {}
+
+    for e in _events(start, end).iterator(chunk_size=2000):
+        at = e["created_at"]
+        if not start <= at < end:
+            continue  # earlier/later history of an order, needed only for the window values
+        status = e["to_status"]
+        if e["next_at"] is not None:
+            stays[status].append((e["next_at"] - at).total_seconds())
+        elif status not in TERMINAL:
+            open_stays[status] += 1
+
+        if not e["from_status"]:
+            counter = "created"
+        elif status in TERMINAL:
+            counter = status
+            if status == OrderStatus.DELIVERED:
+                lead.append((at - e["started_at"]).total_seconds())
+        else:
+            continue
+        bucket = _bucket(period, at, tz)
+        row = rows.get(bucket)
+        if row is None:
+            row = rows[bucket] = {"start": bucket.isoformat(), "created": 0, "delivered": 0, "canceled": 0}
+        row[counter] += 1
+
+    stages = [
+        {"status": value, "label": label, **_hours(stays[value]), "open": open_stays[value]}
+        for value, label in OrderStatus.choices
+        if value not in TERMINAL
+    ]
+    return {
+        "period": period,
+        "from": first.isoformat(),
+        "to": last.isoformat(),
+        "stages": stages,
+        "lead_time": _hours(lead),
+        "rows": [rows[k] for k in sorted(rows)],
+    }
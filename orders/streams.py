@@ -0,0 +1,250 @@
+"""
+Server-Sent Events for live order threads.
+
+Served natively by asgi.py (SERVER_MODE=asgi): one long-lived async stream per
+open detail page, no thread held while idle. Events:
+- message  new OrderMessage (customers never receive is_internal rows)
+- payment  new Payment
+- status   status changed (payload = order header)
+- order    other header fields changed, e.g. pricing (payload = order header)
+
+Wakeups come from events.notify_order_changed() in this process, plus a cheap
+version-key poll (one indexed query) for writes handled by other workers.
+Under WSGI a stream can't be held open without pinning a worker, so the
+endpoint answers with one batch and a retry hint (EventSource then polls).
+
+Every pass of an ASGI stream re-checks that the viewer may still see the
+order (active user, ownership or view_all_orders), so a revoked permission or
+a deactivated account ends the stream with `gone` instead of waiting for
+MAX_STREAM_SECONDS. Each pass also closes its DB connection afterwards:
+request_finished, which would normally close it, only fires when the stream
+ends, and an idle stream should not hold a MySQL connection.
+
+Resume: event ids are "m<message_id>.p<payment_id>.<status>.<header hash>";
+the browser sends the last one back as Last-Event-ID on reconnect, so nothing
+is missed or repeated and header changes are detected across reconnects. An
+id-only line is sent even when there are no events (it still updates the
+browser's lastEventId).
+"""
+
+import asyncio
+import json
+import re
+from hashlib import md5
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.decorators import login_required
+from django.db import connection
+from django.db.models import Max
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_http_methods
+
+from .events import subscribe, unsubscribe
+from .http import arequire_staff_perm
+from .models import Order, Payment
+from .permissions import has_perm, is_staff_role
+from .serializers import (
+    MESSAGE_FIELDS,
+    ORDER_LIST_FIELDS,
+    PAYMENT_FIELDS,
+    STAFF_ORDER_FIELDS,
+    message_queryset,
+    message_row,
+    order_row,
+    payment_row,
+)
+from .versioning import order_version, version_etag
+
+POLL_SECONDS = getattr(settings, "ORDER_EVENTS_POLL_SECONDS", 2)
+KEEPALIVE_SECONDS = 15
+# Streams end periodically; the reconnect re-runs session authentication.
+MAX_STREAM_SECONDS = getattr(settings, "ORDER_EVENTS_MAX_SECONDS", 300)
+WSGI_RETRY_MS = getattr(settings, "ORDER_EVENTS_WSGI_RETRY_MS", 5000)
+BATCH_LIMIT = 200
+
+_EVENT_ID = re.compile(r"^m(\d+)\.p(\d+)(?:\.(\w+)\.([0-9a-f]{8}))?$")
+
+
+def _sse(event: str, data: dict, event_id: str) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _header_hash(header: dict) -> str:
+    return md5(json.dumps(header, sort_keys=True).encode(), usedforsecurity=False).hexdigest()[:8]
+
+
+class _Cursor:
+    """What this stream has already delivered."""
+
+    def __init__(self, message_id: int, payment_id: int, status: str = "", header_hash: str = ""):
+        self.message_id = message_id
+        self.payment_id = payment_id
+        self.status = status
+        self.header_hash = header_hash
+        self.etag = None
+
+    @property
+    def event_id(self) -> str:
+        return f"m{self.message_id}.p{self.payment_id}.{self.status or 'x'}.{self.header_hash or '0' * 8}"
+
+
+def _initial_cursor(request, order_id: int, include_internal: bool) -> _Cursor:
+    """Resume from Last-Event-ID / ?after_message=&after_payment=, else start at 'now'."""
+    m = _EVENT_ID.match(request.headers.get("Last-Event-ID", ""))
+    if m:
+        return _Cursor(int(m.group(1)), int(m.group(2)), m.group(3) or "", m.group(4) or "")
+
+    after_message = request.GET.get("after_message", "")
+    after_payment = request.GET.get("after_payment", "")
+    if after_message.isdigit() and after_payment.isdigit():
+        return _Cursor(int(after_message), int(after_payment))
+
+    last_message = message_queryset(order_id, include_internal).aggregate(m=Max("id"))["m"] or 0
+    last_payment = Payment.objects.filter(order_id=order_id).aggregate(m=Max("id"))["m"] or 0
+    return _Cursor(last_message, last_payment)
+
+
+def _changes(order_id: int, include_internal: bool, cursor: _Cursor):
+    """
+    Collect (event, data, event_id) since the cursor, advancing it; each id is the
+    cursor position right after that event. Returns None if the order is gone.
+    Costs one query when nothing changed.
+    """
+    fields = STAFF_ORDER_FIELDS if include_internal else ORDER_LIST_FIELDS
+    row = order_version(Order.objects.filter(id=order_id), *fields)
+    if row is None:
+        return None
+    etag = version_etag(row)
+    if etag == cursor.etag:
+        return []
+    cursor.etag = etag
+
+    events = []
+    header = order_row(row)
+    header_hash = _header_hash(header)
+    changed = cursor.header_hash and header_hash != cursor.header_hash
+    name = "status" if header["status"] != cursor.status else "order"
+    cursor.status, cursor.header_hash = header["status"], header_hash
+    if changed:
+        events.append((name, header, cursor.event_id))
+
+    messages = (
+        message_queryset(order_id, include_internal)
+        .filter(id__gt=cursor.message_id)
+        .order_by("id")
+        .values(*MESSAGE_FIELDS)[:BATCH_LIMIT]
+    )
+    for m in messages:
+        cursor.message_id = m["id"]
+        events.append(("message", message_row(m, include_internal), cursor.event_id))
+
+    payments = (
+        Payment.objects.filter(order_id=order_id, id__gt=cursor.payment_id)
+        .order_by("id")
+        .values(*PAYMENT_FIELDS)[:BATCH_LIMIT]
+    )
+    for p in payments:
+        cursor.payment_id = p["id"]
+        events.append(("payment", payment_row(p), cursor.event_id))
+
+    if len(messages) == BATCH_LIMIT or len(payments) == BATCH_LIMIT:
+        cursor.etag = None  # more pending: don't let the version short-circuit the next pass
+    return events
+
+
+def _may_view(user_id: int, order_id: int, include_internal: bool) -> bool:
+    """The stream's viewer may still see this order (re-read from the DB, not the request's user)."""
+    user = get_user_model().objects.filter(pk=user_id, is_active=True).first()
+    if user is None:
+        return False
+    if include_internal:
+        return is_staff_role(user) and has_perm(user, "view_all_orders")
+    return Order.objects.filter(id=order_id, customer_id=user_id).exists()
+
+
+def _poll(user_id: int, order_id: int, include_internal: bool, cursor: _Cursor):
+    """One stream pass: _changes() if access still holds (None otherwise), then release the connection."""
+    try:
+        if not _may_view(user_id, order_id, include_internal):
+            return None
+        return _changes(order_id, include_internal, cursor)
+    finally:
+        connection.close()
+
+
+async def _event_stream(user_id: int, order_id: int, include_internal: bool, cursor: _Cursor):
+    loop = asyncio.get_running_loop()
+    wakeup = subscribe(order_id)
+    started = last_sent = loop.time()
+    try:
+        yield f"retry: {int(POLL_SECONDS * 1000)}\n\n"
+        first = True
+        while True:
+            events = await sync_to_async(_poll)(user_id, order_id, include_internal, cursor)
+            if events is None:
+                yield _sse("gone", {}, cursor.event_id)
+                return
+            for name, data, event_id in events:
+                yield _sse(name, data, event_id)
+                last_sent = loop.time()
+            if first and not events:
+                yield f"id: {cursor.event_id}\n\n"
+            first = False
+
+            now = loop.time()
+            if now - started > MAX_STREAM_SECONDS:
+                return
+            if now - last_sent > KEEPALIVE_SECONDS:
+                yield ": keepalive\n\n"
+                last_sent = now
+
+            try:
+                await asyncio.wait_for(wakeup.wait(), POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+    finally:
+        unsubscribe(order_id, wakeup)
+
+
+async def _respond(request, user_id: int, order_id: int, include_internal: bool):
+    cursor = await sync_to_async(_initial_cursor)(request, order_id, include_internal)
+
+    if getattr(settings, "SERVER_MODE", "wsgi") != "asgi":
+        # One batch + reconnect hint: EventSource polls instead of pinning a sync worker.
+        events = await sync_to_async(_changes)(order_id, include_internal, cursor) or []
+        body = f"retry: {WSGI_RETRY_MS}\n\n" + "".join(_sse(*e) for e in events)
+        body += f"id: {cursor.event_id}\n\n"
+        response = HttpResponse(body, content_type="text/event-stream")
+    else:
+        response = StreamingHttpResponse(
+            _event_stream(user_id, order_id, include_internal, cursor), content_type="text/event-stream"
+        )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # Nginx: don't buffer the stream
+    return response
+
+
+@login_required
+@require_http_methods(["GET"])
+async def my_order_events(request, order_id: int):
+    """Live events for the owner's order (internal notes excluded)."""
+    user = await request.auser()
+    if not await Order.objects.filter(id=order_id, customer=user).aexists():
+        raise Http404("No Order matches the given query.")
+    return await _respond(request, user.pk, order_id, include_internal=False)
+
+
+@login_required
+@require_http_methods(["GET"])
+async def staff_order_events(request, order_id: int):
+    """Live events for staff (includes internal notes; requires view_all_orders)."""
+    user = await request.auser()
+    err, _ = await arequire_staff_perm(user, "view_all_orders")
+    if err:
+        return err
+    if not await Order.objects.filter(id=order_id).aexists():
+        raise Http404("No Order matches the given query.")
+    return await _respond(request, user.pk, order_id, include_internal=True)
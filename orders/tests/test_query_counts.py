@@ -0,0 +1,166 @@
+"""
+Guard the JSON read endpoints against N+1 query regressions.
+
+Each endpoint is called against a one-row and a ROWS-row data set; the query
+count must not grow with the rows and must stay within its budget.
+"""
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from orders.models import Order, OrderFile, OrderItem, OrderMessage, OrderStatus, OrderStatusEvent, Payment
+from orders.search import reindex_orders
+
+ROWS = 200
+
+# Max queries per request, including session + user lookups (the RBAC snapshot
+# is warmed first, as it would be for any user who has loaded a page before).
+BUDGETS = {
+    "my_orders": 3,
+    "my_order_detail": 7,
+    "staff_orders": 3,
+    "staff_order_detail": 7,
+    "my_order_messages": 4,
+    "staff_order_messages": 4,
+    "staff_financial_report": 4,
+    "staff_lead_time_report": 4,
+    "staff_search": 4,
+}
+
+STAFF_PERMS = ("view_all_orders", "change_order_status", "set_pricing", "view_financial_reports")
+
+
+def _make_order(customer, staff, n: int) -> Order:
+    """An order with n items, messages, payments, files and status events."""
+    order = Order.objects.create(customer=customer, title=f"qb order x{n}")
+    OrderItem.objects.bulk_create([OrderItem(order=order, product_type="qb", qty=1) for _ in range(n)])
+    OrderMessage.objects.bulk_create(
+        [
+            OrderMessage(order=order, sender=customer if i % 2 else staff, message="qb", is_internal=i % 3 == 0)
+            for i in range(n)
+        ]
+    )
+    Payment.objects.bulk_create([Payment(order=order, amount=1000, status="paid") for _ in range(n)])
+    OrderFile.objects.bulk_create([OrderFile(order=order, file=f"qb/{i}.pdf", size=1) for i in range(n)])
+    chain = [""] + [OrderStatus.values[i % len(OrderStatus.values)] for i in range(n)]
+    OrderStatusEvent.objects.bulk_create(
+        [OrderStatusEvent(order=order, from_status=old, to_status=new) for old, new in zip(chain, chain[1:])]
+    )
+    return order
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "query-counts"}},
+    SECURE_SSL_REDIRECT=False,
+)
+class QueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.customer = User.objects.create_user(username="qb_customer", password="x")
+        cls.staff = User.objects.create_user(username="qb_staff", password="x")
+
+        ct = ContentType.objects.get_for_model(Order)
+        group = Group.objects.create(name="qb_role")
+        for code in STAFF_PERMS:
+            perm, _ = Permission.objects.get_or_create(codename=code, content_type=ct, defaults={"name": code})
+            group.permissions.add(perm)
+        cls.staff.groups.add(group)
+
+        cls.small = _make_order(cls.customer, cls.staff, 1)
+        cls.large = _make_order(cls.customer, cls.staff, ROWS)
+        Order.objects.bulk_create([Order(customer=cls.customer, title=f"qb {i}") for i in range(ROWS)])
+        reindex_orders(Order.objects.filter(customer=cls.customer).values_list("id", flat=True))
+
+    def setUp(self):
+        self.client.force_login(self.customer)
+        self.staff_client = self.client_class()
+        self.staff_client.force_login(self.staff)
+        # warm the RBAC snapshots
+        self._count(self.client, "/api/orders/mine/?limit=1")
+        self._count(self.staff_client, "/api/orders/staff/list/?limit=1")
+
+    def _count(self, client, url: str) -> int:
+        with CaptureQueriesContext(connection) as ctx:
+            resp = client.get(url)
+        self.assertEqual(resp.status_code, 200, url)
+        return len(ctx.captured_queries)
+
+    def assertQueryBudget(self, name: str, client, small_url: str, large_url: str):
+        small = self._count(client, small_url)
+        large = self._count(client, large_url)
+        self.assertEqual(small, large, f"{name}: query count grows with rows")
+        self.assertLessEqual(large, BUDGETS[name], f"{name}: over budget")
+
+    def test_my_orders(self):
+        self.assertQueryBudget(
+            "my_orders", self.client, "/api/orders/mine/?limit=1", f"/api/orders/mine/?limit={ROWS}"
+        )
+
+    def test_my_order_detail(self):
+        self.assertQueryBudget(
+            "my_order_detail",
+            self.client,
+            f"/api/orders/{self.small.id}/detail/",
+            f"/api/orders/{self.large.id}/detail/",
+        )
+
+    def test_my_order_messages(self):
+        self.assertQueryBudget(
+            "my_order_messages",
+            self.client,
+            f"/api/orders/{self.small.id}/messages/",
+            f"/api/orders/{self.large.id}/messages/?limit={ROWS}",
+        )
+
+    def test_staff_orders(self):
+        self.assertQueryBudget(
+            "staff_orders",
+            self.staff_client,
+            "/api/orders/staff/list/?limit=1",
+            f"/api/orders/staff/list/?limit={ROWS}",
+        )
+
+    def test_staff_order_detail(self):
+        self.assertQueryBudget(
+            "staff_order_detail",
+            self.staff_client,
+            f"/api/orders/staff/{self.small.id}/detail/",
+            f"/api/orders/staff/{self.large.id}/detail/",
+        )
+
+    def test_staff_order_messages(self):
+        self.assertQueryBudget(
+            "staff_order_messages",
+            self.staff_client,
+            f"/api/orders/staff/{self.small.id}/messages/",
+            f"/api/orders/staff/{self.large.id}/messages/?limit={ROWS}",
+        )
+
+    def test_staff_search(self):
+        self.assertQueryBudget(
+            "staff_search",
+            self.staff_client,
+            "/api/orders/staff/search/?q=qb&limit=1",
+            f"/api/orders/staff/search/?q=qb&limit={ROWS}",
+        )
+
+    def test_staff_financial_report(self):
+        self.assertQueryBudget(
+            "staff_financial_report",
+            self.staff_client,
+            "/api/orders/staff/reports/financial/?period=day",
+            "/api/orders/staff/reports/financial/?period=month",
+        )
+
+    def test_staff_lead_time_report(self):
+        self.assertQueryBudget(
+            "staff_lead_time_report",
+            self.staff_client,
+            "/api/orders/staff/reports/lead-time/?period=day",
+            "/api/orders/staff/reports/lead-time/?period=month",
+        )
@@ -0,0 +1,146 @@
+"""
+Preview thumbnails for image attachments (PNG/JPEG), built off the request path.
+
+- Size buckets: THUMBNAIL_SIZES (longest side, px), each as WebP and a JPEG
+  fallback, so pages pick one via <picture>/srcset instead of the original.
+- Stored next to the original: orders/files/ab/<sha>.png -> <sha>.w160.webp,
+  <sha>.w160.jpg, ... Uploads are content-addressed, so identical files share
+  their thumbnails and a re-upload finds them already built.
+- Uploads mark the file preview_status=pending and enqueue() it after commit; a
+  small per-process thread pool (THUMBNAIL_WORKERS) does the work (Pillow
+  releases the GIL while decoding/resizing/encoding).
+- `manage.py build_thumbnails` picks up anything still pending (e.g. after a
+  restart) and backfills older files.
+
+PDFs get no raster preview (Pillow can't render PDF pages); pages show the file type instead.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import Order, OrderFile
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZES = (160, 480)
+THUMBNAIL_FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}), "jpg": ("JPEG", {"quality": 82, "progressive": True})}
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+MAX_PIXELS = 80_000_000  # refuse decompression bombs well before Pillow's own limit
+WORKERS = getattr(settings, "THUMBNAIL_WORKERS", 2)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def wants_preview(name: str) -> bool:
+    """True for stored files we can build thumbnails for."""
+    return os.path.splitext(name or "")[1].lower() in IMAGE_EXTENSIONS
+
+
+def thumbnail_name(name: str, width: int, ext: str) -> str:
+    """Storage name of one derivative: <original without extension>.w<width>.<ext>."""
+    return f"{os.path.splitext(name)[0]}.w{width}.{ext}"
+
+
+def thumbnail_urls(name: str) -> list:
+    """[{width, webp, jpeg}] for a file whose preview is ready, smallest first."""
+    storage = OrderFile._meta.get_field("file").storage
+    return [
+        {
+            "width": width,
+            "webp": storage.url(thumbnail_name(name, width, "webp")),
+            "jpeg": storage.url(thumbnail_name(name, width, "jpg")),
+        }
+        for width in THUMBNAIL_SIZES
+    ]
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def render(source: Path, name: str) -> None:
+    """Write every size/format derivative of one image file; raises on unreadable or oversized input."""
+    storage = OrderFile._meta.get_field("file").storage
+    with Image.open(source) as im:
+        if im.width * im.height > MAX_PIXELS:
+            raise ValueError(f"image too large ({im.width}x{im.height})")
+        largest = max(THUMBNAIL_SIZES)
+        im.draft("RGB", (largest, largest))  # JPEG: decode at reduced scale
+        im = ImageOps.exif_transpose(im)
+        im = im.convert("RGBA" if im.mode in ("RGBA", "LA", "P") else "RGB")
+
+        # largest bucket first; smaller ones are resized from it, not from the original
+        for width in sorted(THUMBNAIL_SIZES, reverse=True):
+            im.thumbnail((width, width), Image.Resampling.LANCZOS)
+            for ext, (fmt, options) in THUMBNAIL_FORMATS.items():
+                out = im
+                if fmt == "JPEG" and im.mode == "RGBA":
+                    out = Image.new("RGB", im.size, (255, 255, 255))
+                    out.paste(im, mask=im.getchannel("A"))
+                buf = BytesIO()
+                out.save(buf, fmt, **options)
+                target = Path(storage.path(thumbnail_name(name, width, ext)))
+                target.parent.mkdir(parents=True, exist_ok=True)
+                _write_atomic(target, buf.getvalue())
+
+
+def _all_built(name: str) -> bool:
+    storage = OrderFile._meta.get_field("file").storage
+    return all(
+        storage.exists(thumbnail_name(name, width, ext)) for width in THUMBNAIL_SIZES for ext in THUMBNAIL_FORMATS
+    )
+
+
+def build(order_file_id: int) -> str:
+    """Build one file's thumbnails (skipped if identical content already has them). Returns the new status."""
+    row = OrderFile.objects.filter(id=order_file_id).values("order_id", "file").first()
+    if row is None:
+        return ""
+    storage = OrderFile._meta.get_field("file").storage
+    status = OrderFile.PreviewStatus.READY
+    try:
+        if not _all_built(row["file"]):
+            render(Path(storage.path(row["file"])), row["file"])
+    except Exception:
+        logger.warning("thumbnail build failed for OrderFile %s", order_file_id, exc_info=True)
+        status = OrderFile.PreviewStatus.FAILED
+
+    with transaction.atomic():
+        OrderFile.objects.filter(id=order_file_id).update(preview_status=status)
+        # updated_at feeds the detail ETag, so open pages see the preview on their next load
+        Order.objects.filter(id=row["order_id"]).update(updated_at=timezone.now())
+    return status
+
+
+def _run(order_file_id: int) -> None:
+    close_old_connections()
+    try:
+        build(order_file_id)
+    finally:
+        connection.close()  # pool threads must not keep connections open
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=max(1, WORKERS), thread_name_prefix="thumbnails")
+        return _pool
+
+
+def enqueue(order_file_id: int) -> None:
+    """Build thumbnails in the background once the current transaction commits."""
+    transaction.on_commit(lambda: _executor().submit(_run, order_file_id))
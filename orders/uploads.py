@@ -0,0 +1,271 @@
+"""
+Chunked, resumable uploads for OrderFile.
+
+Protocol (see api_views):
+1. POST /api/orders/<id>/uploads/ {filename, size, type}
+   -> {upload_id, offset: 0, chunk_size}
+2. PUT /api/orders/uploads/<upload_id>/ with the raw bytes and
+   Content-Range: bytes <start>-<end>/<size>
+   -> {offset}; 409 + the server's offset when <start> is not where the upload
+   stands (resume from there); the last chunk returns the created file
+3. GET /api/orders/uploads/<upload_id>/ -> {offset, size} after a dropped connection
+
+Memory stays constant at any file size:
+- chunk bodies are copied from the request stream in COPY_BUFFER pieces
+  (request.body is never read) to a staging file, then moved into
+  <MEDIA_ROOT>/uploads/<id>.part under the upload's row lock
+- magic bytes are checked on the first chunk, before anything else is accepted
+- on the last chunk the part file is hashed in one pass (sha256 + crc32), ZIPs
+  must have a readable central directory, and the file is moved into place
+  with os.replace (atomic): orders/files/<sha[:2]>/<sha><ext>
+- identical content already stored is reused (dedupe by sha256); the part file is dropped
+- if assembly fails, the offset goes back to the last chunk so resending it retries
+- images are queued for thumbnails (thumbnails.py)
+
+Abandoned uploads: `manage.py purge_stale_uploads`.
+"""
+
+import hashlib
+import os
+import shutil
+import uuid
+import zipfile
+import zlib
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import thumbnails
+from .models import Order, OrderFile, OrderUpload
+from .validators import MAGIC_BYTES_NEEDED, MAX_UPLOAD_SIZE_BYTES, upload_extension, validate_magic
+
+COPY_BUFFER = 64 * 1024
+MAX_CHUNK_BYTES = getattr(settings, "ORDER_UPLOAD_CHUNK_MB", 8) * 1024 * 1024
+PART_DIR = Path(settings.MEDIA_ROOT) / "uploads"
+FILES_DIR = "orders/files"
+
+
+class OffsetMismatch(Exception):
+    """A chunk did not start where the upload stands; carries the server's offset."""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Expected a chunk starting at byte {offset}.")
+        self.offset = offset
+
+
+def _storage():
+    return OrderFile._meta.get_field("file").storage
+
+
+def part_path(upload) -> Path:
+    return PART_DIR / f"{upload.pk}.part"
+
+
+def start_upload(order, user, filename: str, size, file_type: str) -> OrderUpload:
+    """Validate the announced file and open an upload. Raises ValueError with a client-safe message."""
+    filename = os.path.basename((filename or "").replace("\\", "/")).strip()[:255]
+    if not filename:
+        raise ValueError("filename required")
+    try:
+        upload_extension(filename)
+    except ValidationError as e:
+        raise ValueError(e.messages[0])
+    if not isinstance(size, int) or isinstance(size, bool) or size <= 0:
+        raise ValueError("size must be a positive integer")
+    if size > MAX_UPLOAD_SIZE_BYTES:
+        raise ValueError(f"File too large (max {MAX_UPLOAD_SIZE_BYTES // (1024 * 1024)}MB).")
+    file_type = file_type or OrderFile.FileType.OTHER
+    if file_type not in OrderFile.FileType.values:
+        raise ValueError("Invalid file type.")
+    return OrderUpload.objects.create(order=order, user=user, filename=filename, type=file_type, size=size)
+
+
+def parse_content_range(header: str, size: int):
+    """(start, length) from 'bytes <start>-<end>/<size>'. Raises ValueError."""
+    try:
+        unit, _, spec = (header or "").partition(" ")
+        span, _, total = spec.partition("/")
+        first, _, last = span.partition("-")
+        start, end, total = int(first), int(last), int(total)
+    except ValueError:
+        raise ValueError("Content-Range must be 'bytes <start>-<end>/<size>'.")
+    if unit != "bytes" or total != size or not 0 <= start <= end < size:
+        raise ValueError("Content-Range does not fit this upload.")
+    if end - start + 1 > MAX_CHUNK_BYTES:
+        raise ValueError(f"Chunk too large (max {MAX_CHUNK_BYTES} bytes).")
+    return start, end - start + 1
+
+
+def append_chunk(upload_id, stream, start: int, length: int):
+    """
+    Write one chunk at `start` from a file-like stream.
+    Returns (upload, order_file); order_file is set once the last byte is in.
+    Raises OffsetMismatch, ValueError (bad content / short body), OrderUpload.DoesNotExist.
+
+    The body is read into a staging file with no transaction open, so a slow
+    client holds no row lock; the lock only covers the offset check and moving
+    the staged bytes into the part file.
+    """
+    upload = OrderUpload.objects.get(pk=upload_id)
+    if start != upload.received:
+        raise OffsetMismatch(upload.received)  # early out; re-checked under the lock
+    if start == 0 and length < min(MAGIC_BYTES_NEEDED, upload.size):
+        raise ValueError(f"First chunk must be at least {MAGIC_BYTES_NEEDED} bytes.")
+
+    staged = _stage(upload, stream, start, length)
+    try:
+        with transaction.atomic():
+            # Row lock: concurrent retries of the same chunk can't both land
+            upload = OrderUpload.objects.select_for_update().get(pk=upload_id)
+            if start != upload.received:
+                raise OffsetMismatch(upload.received)
+            _place(staged, part_path(upload), start)
+            upload.received = start + length
+            upload.save(update_fields=["received", "updated_at"])
+    finally:
+        staged.unlink(missing_ok=True)
+
+    if upload.received < upload.size:
+        return upload, None
+    try:
+        return upload, _assemble(upload.pk)
+    except Exception:
+        # Reopen the last chunk so a retry of it runs assembly again (the part
+        # file is untouched on failure); a damaged ZIP is already discarded.
+        OrderUpload.objects.filter(pk=upload.pk, received=upload.size).update(
+            received=start, updated_at=timezone.now()
+        )
+        raise
+
+
+def _stage(upload, stream, start: int, length: int) -> Path:
+    """Copy one chunk body from the stream into its own staging file, checking magic bytes on the first chunk."""
+    PART_DIR.mkdir(parents=True, exist_ok=True)
+    staged = PART_DIR / f"{upload.pk}.{uuid.uuid4().hex}.chunk"
+    try:
+        with open(staged, "wb") as out:
+            remaining = length
+            head = b""
+            while remaining:
+                piece = stream.read(min(COPY_BUFFER, remaining))
+                if not piece:
+                    raise ValueError("Chunk body is shorter than its Content-Range.")
+                if start == 0 and len(head) < MAGIC_BYTES_NEEDED:
+                    head += piece[:MAGIC_BYTES_NEEDED]
+                    if len(head) >= min(MAGIC_BYTES_NEEDED, length):
+                        _check_magic(upload, head)
+                out.write(piece)
+                remaining -= len(piece)
+    except BaseException:
+        staged.unlink(missing_ok=True)
+        raise
+    return staged
+
+
+def _place(staged: Path, path: Path, start: int) -> None:
+    """Put a staged chunk at `start` of the part file, dropping bytes of any earlier failed attempt."""
+    if start == 0:
+        os.replace(staged, path)
+        return
+    with open(path, "r+b") as out, open(staged, "rb") as src:
+        out.seek(start)
+        out.truncate()
+        shutil.copyfileobj(src, out, COPY_BUFFER)
+
+
+def _check_magic(upload, head: bytes) -> None:
+    try:
+        validate_magic(upload_extension(upload.filename), head)
+    except ValidationError as e:
+        raise ValueError(e.messages[0])
+
+
+def digest(f):
+    """(sha256 hex, crc32, size) of an open binary file, in one streaming pass."""
+    sha = hashlib.sha256()
+    crc = size = 0
+    while piece := f.read(COPY_BUFFER):
+        sha.update(piece)
+        crc = zlib.crc32(piece, crc)
+        size += len(piece)
+    return sha.hexdigest(), crc, size
+
+
+def describe_stored(order_file) -> None:
+    """Fill size/sha256/crc32 (and original_name) of a file stored outside the upload API, e.g. admin."""
+    with order_file.file.open("rb") as f:
+        order_file.sha256, order_file.crc32, order_file.size = digest(f)
+    if not order_file.original_name:
+        order_file.original_name = os.path.basename(order_file.file.name)[:255]
+    order_file.preview_status = OrderFile.PreviewStatus.PENDING if thumbnails.wants_preview(order_file.file.name) else ""
+    order_file.save(update_fields=["sha256", "crc32", "size", "original_name", "preview_status"])
+    if order_file.preview_status:
+        thumbnails.enqueue(order_file.id)
+
+
+def _assemble(upload_id):
+    """
+    Hash, verify and move the completed part file into place; create the OrderFile.
+    Returns None when a concurrent request already did. Raises ValueError for a damaged ZIP.
+    """
+    with transaction.atomic():
+        upload = OrderUpload.objects.select_for_update().filter(pk=upload_id).first()
+        if upload is None or upload.received < upload.size:
+            return None
+
+        path = part_path(upload)
+        ext = upload_extension(upload.filename)
+        damaged = ext == ".zip" and not zipfile.is_zipfile(path)
+        if damaged:
+            discard(upload)
+        else:
+            order_file = _store(upload, path, ext)
+    if damaged:
+        raise ValueError("ZIP archive is damaged or incomplete.")
+    return order_file
+
+
+def _store(upload, path: Path, ext: str) -> OrderFile:
+    with open(path, "rb") as f:
+        sha256, crc32, _ = digest(f)
+    storage = _storage()
+    name = OrderFile.objects.filter(sha256=sha256).exclude(file="").values_list("file", flat=True).first()
+    reuse = bool(name) and storage.exists(name)
+    if not reuse:
+        name = f"{FILES_DIR}/{sha256[:2]}/{sha256}{ext}"
+
+    order_file = OrderFile.objects.create(
+        order_id=upload.order_id,
+        uploaded_by_id=upload.user_id,
+        file=name,
+        type=upload.type,
+        original_name=upload.filename,
+        size=upload.size,
+        sha256=sha256,
+        crc32=crc32,
+        preview_status=OrderFile.PreviewStatus.PENDING if thumbnails.wants_preview(name) else "",
+    )
+    # updated_at feeds the detail ETag, so cached detail responses pick up the new file
+    Order.objects.filter(id=upload.order_id).update(updated_at=timezone.now())
+    upload.delete()
+
+    # The part file is moved last: if anything above fails, the transaction
+    # rolls back and the completed part file is still there to assemble again.
+    if reuse:
+        path.unlink()  # same bytes already stored
+    else:
+        target = Path(storage.path(name))
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, target)
+    if order_file.preview_status:
+        thumbnails.enqueue(order_file.id)
+    return order_file
+
+
+def discard(upload) -> None:
+    """Delete an unfinished upload and its part file."""
+    part_path(upload).unlink(missing_ok=True)
+    upload.delete()
@@ -2,10 +2,38 @@
 Validation helpers for security and data quality.
 """
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
 
 ALLOWED_UPLOAD_EXTENSIONS = {".pdf", ".png", ".jpg", ".jpeg", ".zip"}
-MAX_UPLOAD_SIZE_BYTES = 10 * 1024 * 1024  # 10MB
+# Pattern ZIPs run large; chunked uploads (orders/uploads.py) keep memory flat at any size.
+MAX_UPLOAD_SIZE_BYTES = getattr(settings, "ORDER_UPLOAD_MAX_MB", 200) * 1024 * 1024
+
+# Leading bytes every file of that type must start with.
+MAGIC_SIGNATURES = {
+    ".pdf": (b"%PDF-",),
+    ".png": (b"\x89PNG\r\n\x1a\n",),
+    ".jpg": (b"\xff\xd8\xff",),
+    ".jpeg": (b"\xff\xd8\xff",),
+    ".zip": (b"PK\x03\x04", b"PK\x05\x06"),  # local file header / empty archive
+}
+MAGIC_BYTES_NEEDED = max(len(sig) for sigs in MAGIC_SIGNATURES.values() for sig in sigs)
+
+
+def upload_extension(name: str) -> str:
+    """Lower-case extension (with dot) of a file name; raises ValidationError if not allowed."""
+    name = (name or "").lower()
+    dot = name.rfind(".")
+    ext = name[dot:] if dot != -1 else ""
+    if ext not in ALLOWED_UPLOAD_EXTENSIONS:
+        raise ValidationError("Unsupported file type.")
+    return ext
+
+
+def validate_magic(ext: str, head: bytes) -> None:
+    """Check the file's first bytes match its extension (a renamed .exe is not a .pdf)."""
+    if not any(head.startswith(sig) for sig in MAGIC_SIGNATURES[ext]):
+        raise ValidationError("File content does not match its type.")
 
 
 def validate_upload(file_obj) -> None:
@@ -13,14 +41,17 @@ def validate_upload(file_obj) -> None:
     Validate uploaded file:
     - size limit
     - allowed extension
+    - magic bytes (when the content is readable, e.g. admin uploads)
     """
-    name = (file_obj.name or "").lower()
     size = getattr(file_obj, "size", 0)
 
     if size and size > MAX_UPLOAD_SIZE_BYTES:
-        raise ValidationError("File too large (max 10MB).")
+        raise ValidationError(f"File too large (max {MAX_UPLOAD_SIZE_BYTES // (1024 * 1024)}MB).")
 
-    dot = name.rfind(".")
-    ext = name[dot:] if dot != -1 else ""
-    if ext not in ALLOWED_UPLOAD_EXTENSIONS:
-        raise ValidationError("Unsupported file type.")
\ No newline at end of file
+    ext = upload_extension(file_obj.name)
+
+    if not getattr(file_obj, "_committed", False):  # new content, not an already-stored file
+        file_obj.seek(0)
+        head = file_obj.read(MAGIC_BYTES_NEEDED)
+        file_obj.seek(0)
+        validate_magic(ext, head)
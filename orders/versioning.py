@@ -0,0 +1,58 @@
+"""
+Cheap order version keys for conditional GET (ETag / Last-Modified).
+
+The version of an order's detail payload is derived from one indexed query:
+- Order.updated_at (header edits) + denormalized aggregates
+  (item_count, message_count, last_message_at, paid_total)
+- latest payment created_at + payment count (pending/failed payments don't move
+  paid_total), via correlated subqueries on the (order, created_at) index
+
+If nothing in that tuple moved, the full payload is identical and the view can
+answer 304 without loading items, messages or payments.
+"""
+
+from hashlib import md5
+
+from django.db.models import Count, Max, OuterRef, Subquery
+
+from .models import Payment
+
+VERSION_FIELDS = ("id", "updated_at", "item_count", "message_count", "last_message_at", "paid_total")
+
+
+def _payments(expr):
+    return Subquery(
+        Payment.objects.filter(order=OuterRef("pk")).order_by().values("order").annotate(v=expr).values("v")[:1]
+    )
+
+
+def order_version(qs, *fields):
+    """
+    Version dict for the single order matched by qs, or None if it doesn't exist.
+    Extra `fields` are selected in the same query so callers can serialize from the row.
+    """
+    return _version_query(qs, fields).first()
+
+
+async def aorder_version(qs, *fields):
+    """order_version for async views."""
+    return await _version_query(qs, fields).afirst()
+
+
+def _version_query(qs, fields):
+    return qs.values(*dict.fromkeys((*VERSION_FIELDS, *fields))).annotate(
+        payment_count=_payments(Count("id")), payment_last_at=_payments(Max("created_at"))
+    )
+
+
+def version_etag(version: dict, *extra) -> str:
+    """Strong ETag over the version tuple plus view-specific inputs (audience, permissions)."""
+    parts = [str(version[k]) for k in (*VERSION_FIELDS, "payment_count", "payment_last_at")]
+    parts.extend(str(x) for x in extra)
+    return '"%s"' % md5("|".join(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def version_last_modified(version: dict):
+    """Most recent timestamp that feeds the payload (for Last-Modified)."""
+    stamps = [version["updated_at"], version["last_message_at"], version["payment_last_at"]]
+    return max(t for t in stamps if t is not None)
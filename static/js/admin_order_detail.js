@@ -1,9 +1,88 @@
+/**
+ * Render helpers (data-key lets live events skip rows already on the page).
+ */
+function staffHeaderHtml(o, caps) {
+  return `
+      <div><b>${esc(o.title)}</b></div>
+      <div class="small">Customer: ${esc(o.customer)}</div>
+      <div class="small">Status: <span class="badge">${esc(o.status_label)}</span></div>
+      <div class="small">Total: ${o.total_price} | Deposit: ${o.deposit_amount}</div>
+      <div class="small">Capabilities:
+        status=${caps.can_change_status} |
+        pricing=${caps.can_set_pricing} |
+        financial=${caps.can_view_financial}
+      </div>
+    `;
+}
+
+function staffMessageHtml(m) {
+  return `
+      <div data-key="msg-${m.id}" style="margin:8px 0; padding:10px; border:1px solid #2a2f3d; border-radius:10px;">
+        <div class="small">
+          <b>${esc(m.sender)}</b> - ${new Date(m.created_at).toLocaleString("fa-IR")}
+          ${m.is_internal ? "<span class='badge'>Internal</span>" : "<span class='badge'>Customer</span>"}
+        </div>
+        <div>${esc(m.message)}</div>
+      </div>
+    `;
+}
+
+function staffPaymentHtml(p) {
+  return `
+      <div data-key="pay-${p.id}" style="margin:8px 0; padding:10px; border:1px solid #2a2f3d; border-radius:10px;">
+        <div><b>${p.amount}</b> - <span class="badge">${esc(p.status_label)}</span></div>
+        <div class="small">${new Date(p.created_at).toLocaleString("fa-IR")}</div>
+      </div>
+    `;
+}
+
+function staffStatusEventHtml(e) {
+  return `
+      <div data-key="status-${e.id}" class="small">
+        ${new Date(e.created_at).toLocaleString("fa-IR")} - <span class="badge">${esc(e.to_label)}</span>
+        ${e.actor ? `(${esc(e.actor)})` : ""}
+      </div>
+    `;
+}
+
+function fileSize(bytes) {
+  if (bytes >= 1024 * 1024) return `${(bytes / (1024 * 1024)).toFixed(1)} MB`;
+  return `${Math.max(1, Math.round(bytes / 1024))} KB`;
+}
+
+function staffFileHtml(f) {
+  // Thumbnails: WebP with a JPEG fallback; srcset lets high-DPI screens take the larger bucket.
+  const t = f.thumbnails;
+  const preview = t
+    ? `<picture>
+          <source type="image/webp" srcset="${t.map((x) => `${esc(x.webp)} ${x.width}w`).join(", ")}" sizes="${t[0].width}px">
+          <img src="${esc(t[0].jpeg)}" srcset="${t.map((x) => `${esc(x.jpeg)} ${x.width}w`).join(", ")}"
+               sizes="${t[0].width}px" alt="${esc(f.name)}" loading="lazy" style="max-width:${t[0].width}px; border-radius:8px;">
+        </picture>`
+    : `<span class="badge">${f.preview === "pending" ? "…" : esc(f.name.split(".").pop().toUpperCase())}</span>`;
+  return `
+      <div data-key="file-${f.id}" style="margin:8px 0; padding:10px; border:1px solid #2a2f3d; border-radius:10px;">
+        <a href="${esc(f.url)}" target="_blank" rel="noopener">${preview}</a>
+        <div><a href="${esc(f.url)}" target="_blank" rel="noopener">${esc(f.name)}</a> <span class="badge">${esc(f.type_label)}</span></div>
+        <div class="small">${fileSize(f.size)} - ${new Date(f.created_at).toLocaleString("fa-IR")}</div>
+      </div>
+    `;
+}
+
+let staffCaps = {};
+let liveStream = null;
+let olderCursor = null;
+let previewPolls = 0;
+
 /**
  * Load full order details for staff and render:
  * - order header
  * - status/pricing controls (UI may still show; API enforces permissions)
  * - internal notes/messages
+ * - status history
  * - payments
+ * - attached files (image previews once their thumbnails are built)
+ * Then subscribe to live updates from other staff and the customer.
  */
 async function loadStaffDetail() {
   const box = document.querySelector("#orderBox");
@@ -13,54 +92,76 @@ async function loadStaffDetail() {
   try {
     const data = await apiFetch(`/api/orders/staff/${window.ORDER_ID}/detail/`);
     const o = data.order;
+    staffCaps = data;
 
-    box.innerHTML = `
-      <div><b>${esc(o.title)}</b></div>
-      <div class="small">Customer: ${esc(o.customer)}</div>
-      <div class="small">Status: <span class="badge">${esc(o.status_label)}</span></div>
-      <div class="small">Total: ${o.total_price} | Deposit: ${o.deposit_amount}</div>
-      <div class="small">Capabilities:
-        status=${data.can_change_status} |
-        pricing=${data.can_set_pricing} |
-        financial=${data.can_view_financial}
-      </div>
-    `;
+    box.innerHTML = staffHeaderHtml(o, staffCaps);
 
     document.querySelector("#statusSelect").value = o.status;
     document.querySelector("#total_price").value = o.total_price;
     document.querySelector("#deposit_amount").value = o.deposit_amount;
 
     msgs.innerHTML =
-      data.messages
-        .map(
-          (m) => `
-      <div style="margin:8px 0; padding:10px; border:1px solid #2a2f3d; border-radius:10px;">
-        <div class="small">
-          <b>${esc(m.sender)}</b> - ${new Date(m.created_at).toLocaleString("fa-IR")}
-          ${m.is_internal ? "<span class='badge'>Internal</span>" : "<span class='badge'>Customer</span>"}
-        </div>
-        <div>${esc(m.message)}</div>
-      </div>
-    `
-        )
-        .join("") || "<div class='small'>No messages.</div>";
-
+      data.messages.map(staffMessageHtml).join("") || "<div class='small' data-empty>No messages.</div>";
+    document.querySelector("#statusHistory").innerHTML = data.status_history.map(staffStatusEventHtml).join("");
     pays.innerHTML =
-      data.payments
-        .map(
-          (p) => `
-      <div style="margin:8px 0; padding:10px; border:1px solid #2a2f3d; border-radius:10px;">
-        <div><b>${p.amount}</b> - <span class="badge">${esc(p.status_label)}</span></div>
-        <div class="small">${new Date(p.created_at).toLocaleString("fa-IR")}</div>
-      </div>
-    `
-        )
-        .join("") || "<div class='small'>No payments.</div>";
+      data.payments.map(staffPaymentHtml).join("") || "<div class='small' data-empty>No payments.</div>";
+    document.querySelector("#files").innerHTML =
+      data.files.map(staffFileHtml).join("") || "<div class='small' data-empty>No files.</div>";
+    const zip = document.querySelector("#filesZip");
+    zip.href = `/api/orders/${window.ORDER_ID}/files/archive/`;
+    zip.hidden = !data.files.length;
+
+    // Thumbnails are built in the background; re-check a few times (ETag makes repeats cheap).
+    if (data.files.some((f) => f.preview === "pending") && previewPolls < 5) {
+      previewPolls += 1;
+      setTimeout(loadStaffDetail, 3000);
+    }
+
+    olderCursor = data.messages_cursor;
+    document.querySelector("#olderMsgs").hidden = !olderCursor;
+
+    if (!liveStream) startStaffLive(data);
   } catch (e) {
     box.innerHTML = `<div class="error">${esc(e.message)}</div>`;
   }
 }
 
+/**
+ * Load the previous page of the thread (detail only carries the latest messages).
+ */
+async function loadOlderMessages() {
+  try {
+    const msgs = document.querySelector("#msgs");
+    olderCursor = await prependOlderMessages(`/api/orders/staff/${window.ORDER_ID}/messages/`, olderCursor, msgs, staffMessageHtml);
+    document.querySelector("#olderMsgs").hidden = !olderCursor;
+  } catch (e) {
+    alert(e.message);
+  }
+}
+
+/**
+ * Apply live events incrementally instead of re-fetching the whole detail.
+ */
+function startStaffLive(data) {
+  const box = document.querySelector("#orderBox");
+  const msgs = document.querySelector("#msgs");
+  const pays = document.querySelector("#payments");
+
+  const afterMessage = Math.max(0, ...data.messages.map((m) => m.id));
+  const afterPayment = Math.max(0, ...data.payments.map((p) => p.id));
+  const header = (o) => (box.innerHTML = staffHeaderHtml(o, staffCaps));
+
+  liveStream = liveOrderEvents(
+    `/api/orders/staff/${window.ORDER_ID}/events/?after_message=${afterMessage}&after_payment=${afterPayment}`,
+    {
+      message: (m) => insertOnce(msgs, `msg-${m.id}`, staffMessageHtml(m)),
+      payment: (p) => insertOnce(pays, `pay-${p.id}`, staffPaymentHtml(p), "afterbegin"),
+      status: loadStaffDetail, // header + status history (ETag keeps it cheap)
+      order: header,
+    }
+  );
+}
+
 /**
  * Change order status (API enforces permission).
  */
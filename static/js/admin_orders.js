@@ -1,31 +1,53 @@
 /**
- * Load all orders for staff and render list.
+ * Render one staff order row.
  */
-async function loadStaffOrders() {
-  const box = document.querySelector("#ordersList");
-  try {
-    const data = await apiFetch("/api/orders/staff/list/");
-    box.innerHTML =
-      data.orders
-        .map(
-          (o) => `
+function staffOrderRow(o) {
+  return `
       <div class="card" style="margin-bottom:10px">
         <div><b>#${o.id}</b> - ${esc(o.title)}</div>
         <div class="small">
           Customer: ${esc(o.customer)} |
           Status: <span class="badge">${esc(o.status_label)}</span> |
-          Total: ${o.total_price}
+          Total: ${o.total_price} |
+          Paid: ${o.paid_total} |
+          Qty: ${o.total_qty} |
+          Messages: ${o.message_count}
         </div>
         <div style="margin-top:10px">
           <a class="btn secondary" href="/panel/orders/${o.id}/">Manage</a>
         </div>
       </div>
-    `
-        )
-        .join("") || "<div class='small'>No orders.</div>";
-  } catch (e) {
-    box.innerHTML = `<div class="error">${esc(e.message)}</div>`;
-  }
+    `;
 }
 
-loadStaffOrders();
\ No newline at end of file
+/**
+ * List endpoint for the current form: ranked search when ?q is set, else the list
+ * (both apply the status/customer/assignee/date filters).
+ */
+function staffOrdersUrl(params) {
+  return params.q ? "/api/orders/staff/search/" : "/api/orders/staff/list/";
+}
+
+/**
+ * Load orders for staff page by page (infinite scroll) with server-side filters or search.
+ */
+function loadStaffOrders() {
+  const form = document.querySelector("#orderFilters");
+  const params = formParams(form);
+  const list = infiniteList({
+    url: staffOrdersUrl(params),
+    key: "orders",
+    box: document.querySelector("#ordersList"),
+    render: staffOrderRow,
+    params,
+    emptyHtml: "<div class='small'>No orders.</div>",
+  });
+
+  form.addEventListener("submit", (e) => {
+    e.preventDefault();
+    const params = formParams(form);
+    list.reload(params, staffOrdersUrl(params));
+  });
+}
+
+loadStaffOrders();
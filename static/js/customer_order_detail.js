@@ -1,8 +1,41 @@
+/**
+ * Render helpers (data-key lets live events skip rows already on the page).
+ */
+function orderHeaderHtml(o) {
+  return `
+      <div><b>${esc(o.title)}</b></div>
+      <div class="small">Status: <span class="badge">${esc(o.status_label)}</span></div>
+      <div class="small">Total: ${o.total_price} | Deposit: ${o.deposit_amount}</div>
+    `;
+}
+
+function messageHtml(m) {
+  return `
+      <div data-key="msg-${m.id}" style="margin:8px 0; padding:10px; border:1px solid #2a2f3d; border-radius:10px;">
+        <div class="small"><b>${esc(m.sender)}</b> - ${new Date(m.created_at).toLocaleString("fa-IR")}</div>
+        <div>${esc(m.message)}</div>
+      </div>
+    `;
+}
+
+function paymentHtml(p) {
+  return `
+      <div data-key="pay-${p.id}" style="margin:8px 0; padding:10px; border:1px solid #2a2f3d; border-radius:10px;">
+        <div><b>${p.amount}</b> - <span class="badge">${esc(p.status_label)}</span></div>
+        <div class="small">${new Date(p.created_at).toLocaleString("fa-IR")}</div>
+      </div>
+    `;
+}
+
+let liveStream = null;
+let olderCursor = null;
+
 /**
  * Load a single order detail for the customer and render:
  * - order header
  * - messages (non-internal)
  * - payments
+ * Then subscribe to live updates (new messages, payments, status changes).
  */
 async function loadDetail() {
   const box = document.querySelector("#orderBox");
@@ -11,44 +44,59 @@ async function loadDetail() {
 
   try {
     const data = await apiFetch(`/api/orders/${window.ORDER_ID}/detail/`);
-    const o = data.order;
-
-    box.innerHTML = `
-      <div><b>${esc(o.title)}</b></div>
-      <div class="small">Status: <span class="badge">${esc(o.status_label)}</span></div>
-      <div class="small">Total: ${o.total_price} | Deposit: ${o.deposit_amount}</div>
-    `;
 
+    box.innerHTML = orderHeaderHtml(data.order);
     msgs.innerHTML =
-      data.messages
-        .map(
-          (m) => `
-      <div style="margin:8px 0; padding:10px; border:1px solid #2a2f3d; border-radius:10px;">
-        <div class="small"><b>${esc(m.sender)}</b> - ${new Date(m.created_at).toLocaleString("fa-IR")}</div>
-        <div>${esc(m.message)}</div>
-      </div>
-    `
-        )
-        .join("") || "<div class='small'>No messages.</div>";
-
+      data.messages.map(messageHtml).join("") || "<div class='small' data-empty>No messages.</div>";
     payments.innerHTML =
-      data.payments
-        .map(
-          (p) => `
-      <div style="margin:8px 0; padding:10px; border:1px solid #2a2f3d; border-radius:10px;">
-        <div><b>${p.amount}</b> - <span class="badge">${esc(p.status_label)}</span></div>
-        <div class="small">${new Date(p.created_at).toLocaleString("fa-IR")}</div>
-      </div>
-    `
-        )
-        .join("") || "<div class='small'>No payments.</div>";
+      data.payments.map(paymentHtml).join("") || "<div class='small' data-empty>No payments.</div>";
+
+    olderCursor = data.messages_cursor;
+    document.querySelector("#olderMsgs").hidden = !olderCursor;
+
+    if (!liveStream) startLive(data);
   } catch (e) {
     box.innerHTML = `<div class="error">${esc(e.message)}</div>`;
   }
 }
 
 /**
- * Send a customer message to the order thread.
+ * Load the previous page of the thread (detail only carries the latest messages).
+ */
+async function loadOlderMessages() {
+  try {
+    const msgs = document.querySelector("#msgs");
+    olderCursor = await prependOlderMessages(`/api/orders/${window.ORDER_ID}/messages/`, olderCursor, msgs, messageHtml);
+    document.querySelector("#olderMsgs").hidden = !olderCursor;
+  } catch (e) {
+    alert(e.message);
+  }
+}
+
+/**
+ * Apply live events incrementally instead of re-fetching the whole detail.
+ */
+function startLive(data) {
+  const box = document.querySelector("#orderBox");
+  const msgs = document.querySelector("#msgs");
+  const payments = document.querySelector("#payments");
+
+  const afterMessage = Math.max(0, ...data.messages.map((m) => m.id));
+  const afterPayment = Math.max(0, ...data.payments.map((p) => p.id));
+
+  liveStream = liveOrderEvents(
+    `/api/orders/${window.ORDER_ID}/events/?after_message=${afterMessage}&after_payment=${afterPayment}`,
+    {
+      message: (m) => insertOnce(msgs, `msg-${m.id}`, messageHtml(m)),
+      payment: (p) => insertOnce(payments, `pay-${p.id}`, paymentHtml(p), "afterbegin"),
+      status: (o) => (box.innerHTML = orderHeaderHtml(o)),
+      order: (o) => (box.innerHTML = orderHeaderHtml(o)),
+    }
+  );
+}
+
+/**
+ * Send a customer message to the order thread (it shows up via the live stream).
  */
 async function sendMsg() {
   const text = document.querySelector("#msgText").value.trim();
@@ -60,10 +108,10 @@ async function sendMsg() {
       body: { message: text },
     });
     document.querySelector("#msgText").value = "";
-    await loadDetail();
+    if (!liveStream) await loadDetail();
   } catch (e) {
     alert(e.message);
   }
 }
 
-loadDetail();
\ No newline at end of file
+loadDetail();
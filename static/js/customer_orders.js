@@ -1,19 +1,13 @@
 /**
- * Load current user's orders and render them into the page.
+ * Load current user's orders page by page (infinite scroll).
  */
-async function loadOrders() {
-  const box = document.querySelector("#ordersList");
-  try {
-    const data = await apiFetch("/api/orders/mine/");
-
-    if (!data.orders.length) {
-      box.innerHTML = "<div class='small'>No orders yet.</div>";
-      return;
-    }
-
-    box.innerHTML = data.orders
-      .map(
-        (o) => `
+function loadOrders() {
+  infiniteList({
+    url: "/api/orders/mine/",
+    key: "orders",
+    box: document.querySelector("#ordersList"),
+    emptyHtml: "<div class='small'>No orders yet.</div>",
+    render: (o) => `
       <div class="card" style="margin-bottom:10px">
         <div><b>#${o.id}</b> - ${esc(o.title)}</div>
         <div class="small">
@@ -25,12 +19,8 @@ async function loadOrders() {
           <a class="btn secondary" href="/orders/${o.id}/">Details</a>
         </div>
       </div>
-    `
-      )
-      .join("");
-  } catch (e) {
-    box.innerHTML = `<div class="error">${esc(e.message)}</div>`;
-  }
+    `,
+  });
 }
 
 /**
@@ -46,10 +36,19 @@ async function createOrder() {
     notes: document.querySelector("#notes").value.trim(),
   };
 
+  // One key per filled-in form: a retried/double-clicked submit returns the same order.
+  const body = { title, items: [item] };
+  const fingerprint = JSON.stringify(body);
+  if (createOrder.fingerprint !== fingerprint) {
+    createOrder.fingerprint = fingerprint;
+    createOrder.key = crypto.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random()}`;
+  }
+
   try {
     const data = await apiFetch("/api/orders/create/", {
       method: "POST",
-      body: { title, items: [item] },
+      body,
+      headers: { "Idempotency-Key": createOrder.key },
     });
 
     alert("Order created. ID: " + data.order_id);
@@ -6,21 +6,34 @@ function getCookie(name) {
   return m ? decodeURIComponent(m[2]) : "";
 }
 
+// ETag -> parsed body of previous GETs, for conditional requests (per page load)
+const _etagCache = new Map();
+
 /**
  * Lightweight wrapper over fetch() for JSON APIs.
  * - Adds CSRF token automatically for non-GET requests
+ * - Extra request headers via { headers } (e.g. Idempotency-Key)
+ * - GETs send If-None-Match when a previous response had an ETag; a 304
+ *   returns the cached body (repeat views/polls transfer almost nothing)
  * - Throws Error with a human-readable message on non-2xx
  */
-async function apiFetch(url, { method = "GET", body = null } = {}) {
-  const headers = { "Content-Type": "application/json" };
+async function apiFetch(url, { method = "GET", body = null, headers: extraHeaders = {} } = {}) {
+  const headers = { "Content-Type": "application/json", ...extraHeaders };
   if (method !== "GET") headers["X-CSRFToken"] = getCookie("csrftoken");
 
+  const cached = method === "GET" ? _etagCache.get(url) : null;
+  if (cached) headers["If-None-Match"] = cached.etag;
+
   const res = await fetch(url, {
     method,
     headers,
     body: body ? JSON.stringify(body) : null,
+    // We revalidate ourselves; keep the browser cache from answering first.
+    cache: method === "GET" ? "no-store" : "default",
   });
 
+  if (res.status === 304 && cached) return cached.data;
+
   let data = null;
   try {
     data = await res.json();
@@ -32,9 +45,49 @@ async function apiFetch(url, { method = "GET", body = null } = {}) {
     const msg = data && data.error ? data.error : "Server request failed";
     throw new Error(msg);
   }
+
+  const etag = method === "GET" ? res.headers.get("ETag") : null;
+  if (etag) _etagCache.set(url, { etag, data });
   return data;
 }
 
+/**
+ * Subscribe to an order's Server-Sent Events stream.
+ * - handlers: { message, payment, status, order } each receive the parsed JSON payload
+ * - EventSource reconnects by itself and the server resumes from Last-Event-ID
+ */
+function liveOrderEvents(url, handlers) {
+  if (!window.EventSource) return null;
+  const es = new EventSource(url);
+  for (const [name, fn] of Object.entries(handlers)) {
+    es.addEventListener(name, (e) => fn(JSON.parse(e.data)));
+  }
+  es.addEventListener("gone", () => es.close());
+  return es;
+}
+
+/**
+ * Insert an HTML fragment unless an element with the same data-key is already rendered
+ * (live events can race a full reload). Removes the "empty" placeholder if present.
+ */
+function insertOnce(container, key, html, where = "beforeend") {
+  if (container.querySelector(`[data-key="${key}"]`)) return;
+  container.querySelector("[data-empty]")?.remove();
+  container.insertAdjacentHTML(where, html);
+}
+
+/**
+ * Prepend the page of messages older than `cursor` (thread is oldest-first).
+ * Returns the next older cursor, or null when the start of the thread is reached.
+ */
+async function prependOlderMessages(url, cursor, container, render) {
+  const data = await apiFetch(`${url}?before=${encodeURIComponent(cursor)}`);
+  for (const m of data.messages.slice().reverse()) {
+    insertOnce(container, `msg-${m.id}`, render(m), "afterbegin");
+  }
+  return data.older_cursor;
+}
+
 /**
  * Basic HTML escape to prevent injection when rendering strings into innerHTML.
  */
@@ -48,6 +101,82 @@ function esc(s) {
     .replaceAll("'", "&#039;");
 }
 
+/**
+ * Cursor-paginated list that loads the next page when the user scrolls near the end.
+ * - url: list endpoint returning { <key>: [...], next_cursor }
+ * - params: filter query params (URLSearchParams-compatible object)
+ * - render(row) -> HTML string; rows are appended, never re-rendered
+ * Returns { reload(params) } so filter forms can restart from page one.
+ */
+function infiniteList({ url, key, box, render, params = {}, limit = 50, emptyHtml = "" }) {
+  const list = document.createElement("div");
+  const sentinel = document.createElement("div");
+  sentinel.className = "small";
+  box.replaceChildren(list, sentinel);
+
+  let cursor = null;
+  let done = false;
+  let loading = false;
+  let generation = 0;
+
+  async function loadMore() {
+    if (loading || done) return;
+    loading = true;
+    const gen = generation;
+    sentinel.textContent = "...";
+
+    try {
+      const qs = new URLSearchParams({ ...params, limit });
+      if (cursor) qs.set("cursor", cursor);
+      const data = await apiFetch(`${url}?${qs}`);
+      if (gen !== generation) return; // filters changed while in flight
+
+      list.insertAdjacentHTML("beforeend", data[key].map(render).join(""));
+      cursor = data.next_cursor;
+      done = !cursor;
+      sentinel.innerHTML = done && !list.children.length ? emptyHtml : "";
+    } catch (e) {
+      sentinel.innerHTML = `<div class="error">${esc(e.message)}</div>`;
+      done = true;
+    } finally {
+      if (gen === generation) loading = false;
+    }
+
+    // Short pages may not fill the viewport, so keep going until they do.
+    if (!done && sentinel.getBoundingClientRect().top < window.innerHeight) loadMore();
+  }
+
+  new IntersectionObserver((entries) => {
+    if (entries.some((e) => e.isIntersecting)) loadMore();
+  }, { rootMargin: "400px" }).observe(sentinel);
+
+  loadMore();
+
+  return {
+    reload(newParams = {}, newUrl = url) {
+      generation += 1;
+      params = newParams;
+      url = newUrl;
+      cursor = null;
+      done = false;
+      loading = false;
+      list.innerHTML = "";
+      loadMore();
+    },
+  };
+}
+
+/**
+ * Collect non-empty values of form controls into a params object (by element name).
+ */
+function formParams(form) {
+  const out = {};
+  for (const [k, v] of new FormData(form).entries()) {
+    if (String(v).trim()) out[k] = String(v).trim();
+  }
+  return out;
+}
+
 document.addEventListener("DOMContentLoaded", () => {
   const track = document.getElementById("latestOrdersTrack");
   if (!track) return;
@@ -54,6 +54,12 @@ MIDDLEWARE = [
     # Whitenoise serves static files in production without extra setup
     "whitenoise.middleware.WhiteNoiseMiddleware",
 
+    # Per-view timing / DB query metrics (/metrics) + slow-request log
+    "core.middleware.RequestMetricsMiddleware",
+
+    # Full-page cache for anonymous visitors of public pages (before sessions/auth)
+    "core.pagecache.AnonymousPageCacheMiddleware",
+
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
 
@@ -84,6 +90,9 @@ TEMPLATES = [
 
                 # SEO defaults available in all templates
                 "core.context_processors.seo_defaults",
+
+                # Cached RBAC snapshot (rbac.is_staff) instead of user.groups.exists
+                "orders.context_processors.rbac",
             ],
         },
     }
@@ -92,9 +101,21 @@ TEMPLATES = [
 WSGI_APPLICATION = "workshop_tailoring.wsgi.application"
 ASGI_APPLICATION = "workshop_tailoring.asgi.application"
 
+# How this deployment is served: "wsgi" (gunicorn/uWSGI workers) or "asgi" (uvicorn/daphne)
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi")
+
 # ----------------------------
 # Database (MySQL)
 # ----------------------------
+# Persistent connections skip the TCP + auth handshake on every request.
+# - WSGI: each worker thread keeps its connection for DB_CONN_MAX_AGE seconds
+# - ASGI: sync ORM calls hop between executor threads, so persistent connections
+#   multiply per thread and are never reused predictably; default to 0 there
+# Health checks ping a reused connection before the request's first query, so a
+# MySQL-side timeout (wait_timeout) or restart doesn't surface as a 500.
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60" if SERVER_MODE == "wsgi" else "0"))
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "1") == "1"
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.mysql",
@@ -104,9 +125,75 @@ DATABASES = {
         "HOST": os.getenv("DB_HOST", "127.0.0.1"),
         "PORT": os.getenv("DB_PORT", "3306"),
         "OPTIONS": {"charset": "utf8mb4"},
+        "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+        "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+    }
+}
+
+# ----------------------------
+# Cache (shared across workers: rate limits, sessions, view caches)
+# ----------------------------
+# CACHE_BACKEND:
+# - db        (default) table in the main database (run `python manage.py createcachetable`);
+#             shared across hosts, add()/incr() atomic (core/cache.py)
+# - redis     CACHE_LOCATION=redis://host:6379/1 (needs the `redis` package); native atomic incr
+# - memcached CACHE_LOCATION=host:11211 (needs `pymemcache`); native atomic incr
+# - file      flock-guarded files on local disk, one host only. Django globs and
+#             culls the whole directory on every set(), so writes slow down as it fills
+# - locmem    per-process memory; development only (rate limits are NOT shared between workers)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "db")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+_CACHE_BACKENDS = {
+    "db": {
+        "BACKEND": "core.cache.AtomicDatabaseCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", "django_cache"),
+        "OPTIONS": {"MAX_ENTRIES": CACHE_MAX_ENTRIES},
+    },
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", "redis://127.0.0.1:6379/1"),
+    },
+    "memcached": {
+        "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", "127.0.0.1:11211"),
+    },
+    "file": {
+        "BACKEND": "core.cache.LockingFileBasedCache",
+        "LOCATION": os.getenv("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+        "OPTIONS": {"MAX_ENTRIES": CACHE_MAX_ENTRIES},
+    },
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "workshop",
+        "OPTIONS": {"MAX_ENTRIES": CACHE_MAX_ENTRIES},
+    },
+}
+CACHES = {
+    "default": {
+        **_CACHE_BACKENDS[CACHE_BACKEND],
+        "KEY_PREFIX": "workshop",
+        "TIMEOUT": int(os.getenv("CACHE_TIMEOUT", "300")),
     }
 }
 
+# django_ratelimit counters live in the shared cache (atomic add/incr, see core/cache.py)
+RATELIMIT_USE_CACHE = "default"
+
+# Sessions: read from cache, written through to DB (survive cache clears)
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+SESSION_CACHE_ALIAS = "default"
+
+# Per-view / page caching uses the same shared cache
+CACHE_MIDDLEWARE_ALIAS = "default"
+CACHE_MIDDLEWARE_KEY_PREFIX = "page"
+
+# Anonymous full-page cache (core/pagecache.py): path -> seconds (also the Cache-Control max-age)
+PAGE_CACHE_SECONDS = {
+    "/": int(os.getenv("PAGE_CACHE_HOME_SECONDS", "60")),
+    "/robots.txt": int(os.getenv("PAGE_CACHE_ROBOTS_SECONDS", "86400")),
+    "/sitemap.xml": int(os.getenv("PAGE_CACHE_SITEMAP_SECONDS", "86400")),
+}
+
 # ----------------------------
 # Auth
 # ----------------------------
@@ -143,6 +230,12 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Order file uploads (chunked, see orders/uploads.py)
+ORDER_UPLOAD_MAX_MB = int(os.getenv("ORDER_UPLOAD_MAX_MB", "200"))
+ORDER_UPLOAD_CHUNK_MB = int(os.getenv("ORDER_UPLOAD_CHUNK_MB", "8"))
+# Background threads per process building image thumbnails (orders/thumbnails.py)
+THUMBNAIL_WORKERS = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # ----------------------------
@@ -229,4 +322,15 @@ LOGGING = {
         "console": {"class": "logging.StreamHandler"},
     },
     "root": {"handlers": ["console"], "level": "INFO"},
-}
\ No newline at end of file
+    "loggers": {
+        # one JSON line per request slower than SLOW_REQUEST_MS
+        "core.metrics": {"handlers": ["console"], "level": "WARNING", "propagate": False},
+    },
+}
+
+# ----------------------------
+# Request metrics (see core/middleware.py)
+# ----------------------------
+SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", "1000"))  # 0 disables the slow-request log
+# Optional bearer token so Prometheus can scrape /metrics without a staff session
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
\ No newline at end of file
@@ -13,8 +13,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
-from django.contrib.sitemaps.views import sitemap
-from core.sitemaps import StaticViewSitemap
+from core.views import sitemap_xml
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -27,7 +26,7 @@ urlpatterns = [
     path("api/orders/", include("orders.api_urls")),
 
     # SEO endpoints
-    path("sitemap.xml", sitemap, {"sitemaps": {"static": StaticViewSitemap}}, name="sitemap"),
+    path("sitemap.xml", sitemap_xml, name="sitemap"),
     path("robots.txt", include("core.urls_robots")),  # dedicated urls module for robots
 ]
 